@@ -0,0 +1,182 @@
+import { afterAll, beforeAll, bench, describe } from "vitest";
+import { existsSync } from "node:fs";
+import { fileURLToPath } from "node:url";
+import { chromium } from "playwright-core";
+import type { Browser, BrowserContext } from "playwright-core";
+import { SITES } from "@tenderwatch/shared";
+import type { SiteKey } from "@tenderwatch/shared";
+import {
+  getAdapter,
+  getHttpAdapter,
+  HttpClient,
+  Recording,
+  ReplayServer,
+  recordContext,
+  recordingFetch,
+} from "../src";
+import type { SearchParams, TenderSource } from "../src";
+
+/**
+ * Offline adapter benchmark. Each adapter runs a search and a few detail
+ * fetches against portal traffic recorded in bench/recordings/, served by
+ * a local ReplayServer, and reports listings parsed per second and round
+ * trips per page.
+ *
+ *   pnpm --filter @tenderwatch/agent bench          replay the recordings
+ *   pnpm --filter @tenderwatch/agent bench:record   re-record from the live portals first
+ */
+
+const RECORD = process.env.REPLAY_RECORD === "1";
+const DETAILS_PER_RUN = 10;
+const SEARCH_DAYS = 7;
+
+interface Target {
+  name: string;
+  site: SiteKey;
+  tier: "browser" | "http";
+  recording: string;
+}
+
+interface Totals {
+  runs: number;
+  listings: number;
+  searchMs: number;
+  details: number;
+  detailMs: number;
+  requests: number;
+  pages: number;
+  misses: number;
+}
+
+const targets: Target[] = (Object.keys(SITES) as SiteKey[]).flatMap((site) => {
+  const path = (name: string) => fileURLToPath(new URL(`./recordings/${name}.har`, import.meta.url));
+  const browser: Target = { name: site, site, tier: "browser", recording: path(site) };
+  if (!getHttpAdapter(site)) return [browser];
+  return [browser, { name: `${site}-http`, site, tier: "http", recording: path(`${site}-http`) }];
+});
+
+// Search relative to when the recording was made, so replayed searches ask
+// for the same URLs the live one did
+function searchParams(at: Date): SearchParams {
+  return { publishedAfter: new Date(at.getTime() - SEARCH_DAYS * 24 * 60 * 60 * 1000) };
+}
+
+async function openSource(
+  target: Target,
+  browser: Browser,
+  route: (context: BrowserContext) => Promise<void>,
+  transport: typeof fetch
+): Promise<{ source: TenderSource; close: () => Promise<void> }> {
+  if (target.tier === "http") {
+    return { source: getHttpAdapter(target.site, new HttpClient({ fetch: transport }))!, close: async () => {} };
+  }
+  const context = await browser.newContext();
+  await route(context);
+  const adapter = getAdapter(target.site, browser, await context.newPage());
+  return {
+    source: adapter,
+    close: async () => {
+      await adapter.dispose();
+      await context.close();
+    },
+  };
+}
+
+async function record(target: Target, browser: Browser): Promise<void> {
+  const recording = new Recording();
+  const { source, close } = await openSource(
+    target,
+    browser,
+    (context) => recordContext(context, recording),
+    recordingFetch(recording)
+  );
+  try {
+    const listings = await source.search(searchParams(new Date()));
+    for (const listing of listings.slice(0, DETAILS_PER_RUN)) {
+      await source.fetchTenderDetail(listing.sourceId);
+    }
+  } finally {
+    await close();
+  }
+  await recording.save(target.recording);
+}
+
+const results = new Map<string, Totals>();
+let browser: Browser;
+
+beforeAll(async () => {
+  browser = await chromium.launch();
+  if (RECORD) {
+    for (const target of targets) {
+      // Portals that need a login for search can't be recorded anonymously
+      await record(target, browser).catch((error) => console.warn(`Not recorded: ${target.name}: ${error}`));
+    }
+  }
+});
+
+afterAll(async () => {
+  await browser?.close();
+  console.table(
+    Object.fromEntries(
+      [...results].map(([name, t]) => [
+        name,
+        {
+          "listings/run": t.listings / t.runs,
+          "listings/s": Math.round((t.listings / t.searchMs) * 1000),
+          "details/s": Math.round((t.details / t.detailMs) * 1000 * 10) / 10,
+          "round trips/page": t.pages ? Math.round((t.requests / t.pages) * 10) / 10 : 0,
+          misses: t.misses,
+        },
+      ])
+    )
+  );
+});
+
+for (const target of targets) {
+  describe.skipIf(!RECORD && !existsSync(target.recording))(target.name, () => {
+    const totals: Totals = { runs: 0, listings: 0, searchMs: 0, details: 0, detailMs: 0, requests: 0, pages: 0, misses: 0 };
+    let server: ReplayServer;
+    let source: TenderSource;
+    let close: () => Promise<void>;
+    let params: SearchParams;
+
+    beforeAll(async () => {
+      const recording = await Recording.load(target.recording);
+      params = searchParams(recording.recordedAt ?? new Date());
+      server = new ReplayServer(recording);
+      await server.start();
+      ({ source, close } = await openSource(target, browser, (context) => server.replayContext(context), server.fetch));
+      results.set(target.name, totals);
+    });
+
+    afterAll(async () => {
+      await close?.();
+      await server?.close();
+    });
+
+    bench(
+      "search + details",
+      async () => {
+        server.reset();
+        let started = performance.now();
+        const listings = await source.search(params);
+        totals.searchMs += performance.now() - started;
+        totals.listings += listings.length;
+
+        started = performance.now();
+        for (const listing of listings.slice(0, DETAILS_PER_RUN)) {
+          await source.fetchTenderDetail(listing.sourceId);
+          totals.details++;
+        }
+        totals.detailMs += performance.now() - started;
+
+        const stats = server.stats();
+        totals.runs++;
+        totals.requests += stats.requests;
+        totals.pages += stats.pages;
+        totals.misses += stats.misses;
+      },
+      { iterations: 5, time: 0 }
+    );
+  });
+}
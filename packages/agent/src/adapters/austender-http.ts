@@ -0,0 +1,79 @@
+import { crawlPages } from "./base";
+import type { SearchParams, TenderDetail, TenderListing } from "./base";
+import { HttpSiteAdapter } from "./http-base";
+import type { HttpResponse } from "../http/client";
+import { ausTenderSourceId } from "./austender";
+import { innerHtml, links, textContent, xmlElements, xmlField } from "../http/markup";
+
+// RSS feed of current Approaches to Market, newest first
+const FEED_PATH = "/public_data/rss/rss.xml";
+
+/**
+ * AusTender over plain HTTP: listings from the public ATM feed, details
+ * from the public ATM pages. Same source IDs as AusTenderAdapter, so both
+ * transports upsert the same rows.
+ */
+export class AusTenderHttpAdapter extends HttpSiteAdapter {
+  get siteName() {
+    return "AusTender";
+  }
+
+  get siteUrl() {
+    return "https://www.tenders.gov.au";
+  }
+
+  async search(params: SearchParams): Promise<TenderListing[]> {
+    const response = await this.getPublic(`${this.siteUrl}${FEED_PATH}`, {
+      accept: "application/rss+xml, application/xml;q=0.9",
+    });
+    const keywords = params.keywords?.map((k) => k.toLowerCase()) ?? [];
+
+    const listings: TenderListing[] = [];
+    for (const item of xmlElements(response.body.toString("utf8"), "item")) {
+      const url = xmlField(item, "link") ?? "";
+      const sourceId = ausTenderSourceId(url);
+      const title = xmlField(item, "title") ?? "";
+      if (!sourceId) continue;
+      // The feed can't be searched server-side, so apply keywords here
+      if (keywords.length && !keywords.some((k) => title.toLowerCase().includes(k))) continue;
+
+      const published = new Date(xmlField(item, "pubDate") ?? "");
+      listings.push({
+        sourceId,
+        title,
+        buyerOrg: xmlField(item, "author") || xmlField(item, "category") || undefined,
+        publishedAt: isNaN(published.getTime()) ? undefined : published,
+        url,
+      });
+    }
+    listings.sort((a, b) => (b.publishedAt?.getTime() ?? 0) - (a.publishedAt?.getTime() ?? 0));
+
+    // The feed is a single page
+    return crawlPages(params, async () => listings, async () => false);
+  }
+
+  protected detailRequest(sourceId: string) {
+    return { url: `${this.siteUrl}/ATM/Show/${sourceId}` };
+  }
+
+  protected parseDetail(sourceId: string, response: HttpResponse): TenderDetail {
+    const html = response.body.toString("utf8");
+    const text = (selector: string) => textContent(innerHtml(html, selector) ?? "");
+
+    const documentUrls = links(innerHtml(html, ".documents") ?? "")
+      .filter((href) => href.toLowerCase().includes("download"))
+      .map((href) => new URL(href, this.siteUrl).href);
+
+    return {
+      sourceId,
+      title: text("h1"),
+      description: text(".description"),
+      buyerOrg: text(".agency-name"),
+      regions: [],
+      categories: [],
+      certificationsRequired: [],
+      documentUrls,
+      sourceUrl: response.url,
+    };
+  }
+}
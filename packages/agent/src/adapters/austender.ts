@@ -1,4 +1,9 @@
-import { BaseSiteAdapter, LoginResult, RegistrationParams, RegistrationResult, TenderListing, TenderDetail, SearchParams } from "./base";
+import { BaseSiteAdapter, CAPTCHA_SELECTOR, LoginResult, RegistrationParams, RegistrationResult, TenderListing, TenderDetail, SearchParams, ReadinessProfile } from "./base";
+
+/** AusTender's ID for a tender, from a link to its ATM page. */
+export function ausTenderSourceId(href: string): string {
+  return href.match(/ATM(\d+)/)?.[1] || "";
+}
 
 export class AusTenderAdapter extends BaseSiteAdapter {
   get siteName() {
@@ -9,6 +14,24 @@ export class AusTenderAdapter extends BaseSiteAdapter {
     return "https://www.tenders.gov.au";
   }
 
+  protected get readiness(): ReadinessProfile {
+    return {
+      navigation: [{ loadState: "domcontentloaded" }],
+      login: [
+        { selector: 'a[href*="Logout"], .validation-summary-errors' },
+        { selector: CAPTCHA_SELECTOR },
+      ],
+      register: [
+        { selector: '.validation-summary-errors, .error-message, a[href*="Logout"]' },
+        { selector: "text=/verify|confirmation|check your email/i" },
+        { selector: CAPTCHA_SELECTOR },
+      ],
+      search: [{ selector: ".search-results" }],
+      logout: [{ selector: 'a[href*="Logout"]', state: "detached" }],
+      timeout: 30000,
+    };
+  }
+
   async login(username: string, password: string): Promise<LoginResult> {
     try {
       await this.navigateTo(`${this.siteUrl}/RegisteredUser/Login`);
@@ -39,8 +62,7 @@ export class AusTenderAdapter extends BaseSiteAdapter {
         return { success: false, requiresManualStep: { type: "captcha" } };
       }
 
-      await this.page.click('button[type="submit"], input[type="submit"]');
-      await this.page.waitForTimeout(5000);
+      await this.clickAndWait('button[type="submit"], input[type="submit"]', "login");
 
       if (await this.isLoggedIn()) {
         const cookies = await this.page.context().cookies();
@@ -68,8 +90,6 @@ export class AusTenderAdapter extends BaseSiteAdapter {
     try {
       await this.navigateTo(`${this.siteUrl}/RegisteredUser/Register`);
 
-      // Wait for any form content to load
-      await this.page.waitForTimeout(3000);
       try {
         await this.page.waitForSelector('input:not([type="hidden"])', { timeout: 20000 });
       } catch {
@@ -94,10 +114,13 @@ export class AusTenderAdapter extends BaseSiteAdapter {
 
       // Submit the form
       const submitBtn = await this.page.$('#mainContent button[type="submit"], form[action*="Register"] button[type="submit"], form[action*="Register"] input[type="submit"], button[type="submit"]');
-      if (submitBtn) {
-        await submitBtn.click();
-      }
-      await this.page.waitForTimeout(5000);
+      await this.actAndWait(
+        "register",
+        async () => {
+          if (submitBtn) await submitBtn.click();
+        },
+        this.readiness.register
+      );
 
       // Check for CAPTCHA after submit attempt
       if (await this.detectCaptcha()) {
@@ -127,38 +150,55 @@ export class AusTenderAdapter extends BaseSiteAdapter {
   }
 
   async search(params: SearchParams): Promise<TenderListing[]> {
-    const listings: TenderListing[] = [];
     await this.navigateTo(`${this.siteUrl}/Search/TenderSearch`);
     if (params.keywords?.length) {
       await this.page.fill("#Keywords", params.keywords.join(" "));
     }
-    await this.page.click("#SearchButton");
-    await this.page.waitForSelector(".search-results", { timeout: 30000 });
-    const rows = await this.page.$$(".search-results tbody tr");
-    for (const row of rows) {
-      const titleEl = await row.$("td:nth-child(1) a");
-      const buyerEl = await row.$("td:nth-child(2)");
-      const closesEl = await row.$("td:nth-child(4)");
-      const valueEl = await row.$("td:nth-child(5)");
-      if (titleEl) {
-        const title = await titleEl.textContent();
-        const href = await titleEl.getAttribute("href");
-        const sourceId = href?.match(/ATM(\d+)/)?.[1] || "";
-        listings.push({
-          sourceId,
-          title: title?.trim() || "",
-          buyerOrg: (await buyerEl?.textContent())?.trim(),
-          closesAt: closesEl ? new Date((await closesEl.textContent())?.trim() || "") : undefined,
-          valueRange: (await valueEl?.textContent())?.trim(),
-          url: `${this.siteUrl}${href}`
-        });
-      }
+    if (!(await this.clickAndWait("#SearchButton", "search"))) {
+      throw new Error("AusTender search results did not load");
     }
-    return listings;
+
+    return this.crawlListings(
+      params,
+      () => this.readResultsPage(),
+      () => this.nextResultsPage()
+    );
+  }
+
+  private readResultsPage(): Promise<TenderListing[]> {
+    return this.extractListings({
+      rows: ".search-results tbody tr",
+      link: "td:nth-child(1) a",
+      buyerOrg: "td:nth-child(2)",
+      closesAt: "td:nth-child(4)",
+      valueRange: "td:nth-child(5)",
+      sourceId: ausTenderSourceId,
+    });
+  }
+
+  private async nextResultsPage(): Promise<boolean> {
+    const next = await this.page.$('.pagination a[rel="next"], .pagination li.next a, .pagination a:has-text("Next")');
+    if (!next) return false;
+
+    const firstHref = await this.page
+      .$eval(".search-results tbody tr td:nth-child(1) a", el => el.getAttribute("href"))
+      .catch(() => null);
+    await next.click();
+    // Results are replaced in place, so wait for the first row to change
+    await this.page.waitForFunction(
+      (prev) => document.querySelector(".search-results tbody tr td:nth-child(1) a")?.getAttribute("href") !== prev,
+      firstHref,
+      { timeout: 30000 }
+    );
+    return true;
+  }
+
+  protected detailPageUrl(sourceId: string): string {
+    return `${this.siteUrl}/ATM/Show/${sourceId}`;
   }
 
   async fetchTenderDetail(sourceId: string): Promise<TenderDetail> {
-    await this.navigateTo(`${this.siteUrl}/ATM/Show/${sourceId}`);
+    await this.navigateTo(this.detailPageUrl(sourceId));
     const title = await this.page.$eval("h1", el => el.textContent?.trim() || "").catch(() => "");
     const description = await this.page.$eval(".description", el => el.textContent?.trim() || "").catch(() => "");
     const buyerOrg = await this.page.$eval(".agency-name", el => el.textContent?.trim() || "").catch(() => "");
@@ -177,6 +217,6 @@ export class AusTenderAdapter extends BaseSiteAdapter {
   }
 
   async logout(): Promise<void> {
-    try { await this.page.click('a[href*="Logout"]'); await this.page.waitForTimeout(1000); } catch {}
+    try { await this.clickAndWait('a[href*="Logout"]', "logout"); } catch {}
   }
 }
@@ -1,4 +1,13 @@
-import type { Page, Browser } from "playwright-core";
+import type { APIResponse, Page, Browser, Response as PageResponse, Route } from "playwright-core";
+import { streamDocument } from "../documents/download";
+import type { StoredDocument, StreamDocumentOptions } from "../documents/download";
+import type { DocumentStorage } from "../documents/storage";
+import { sessionCookies, sessionChanged } from "../session";
+import { portalLimiter, isThrottleError, statusOutcome } from "../rate-limit";
+import type { PortalLimits, PortalOutcome } from "../rate-limit";
+import { settleDetail, validatorHeaders } from "../detail-cache";
+import type { CachedDetail } from "../detail-cache";
+import type { StoredSession } from "../session";
 
 export interface ManualStepRequired {
   type: "captcha" | "email_verification";
@@ -11,15 +20,229 @@ export interface LoginResult {
   sessionData?: Record<string, unknown>;
 }
 
+/**
+ * Outcome of ensureSession(). sessionData holds the session now in use.
+ */
+export interface SessionResult extends LoginResult {
+  // How the page came to be signed in
+  via: "warm" | "restored" | "login";
+  // sessionData differs from the stored session and should be saved
+  changed: boolean;
+}
+
 export interface TenderListing {
   sourceId: string;
   title: string;
   buyerOrg?: string;
+  publishedAt?: Date;
   closesAt?: Date;
   valueRange?: string;
   url: string;
 }
 
+/**
+ * Per-site high-water mark of a previous search: the newest publish date
+ * seen and the most recent source IDs. Searches stop paging once they reach
+ * listings covered by it, but still return those, so a re-listed tender's
+ * changes can be noticed.
+ */
+export interface SearchWatermark {
+  publishedAt?: Date;
+  sourceIds: string[];
+}
+
+/**
+ * Declarative description of a search results table. Every field is a CSS
+ * selector evaluated relative to a row; extractListings() reads all rows in
+ * one browser round trip.
+ */
+export interface ListingColumns {
+  rows: string;
+  // Link whose text is the title and whose href is the detail page
+  link: string;
+  buyerOrg?: string;
+  publishedAt?: string;
+  closesAt?: string;
+  valueRange?: string;
+  // Derives the portal's tender ID from the link href
+  sourceId: (href: string) => string;
+}
+
+interface RawListingRow {
+  title: string | null;
+  href: string | null;
+  buyerOrg: string | null;
+  publishedAt: string | null;
+  closesAt: string | null;
+  valueRange: string | null;
+}
+
+function parseListingDate(text: string | null): Date | undefined {
+  if (!text) return undefined;
+  const date = new Date(text);
+  return isNaN(date.getTime()) ? undefined : date;
+}
+
+// Source IDs kept in a watermark; comfortably more than one results page
+const WATERMARK_ID_LIMIT = 500;
+
+const DEFAULT_MAX_SEARCH_PAGES = 10;
+
+/**
+ * Fold the listings a sync actually processed into the previous watermark.
+ * Listings are expected newest first, as search() returns them.
+ */
+export function advanceWatermark(previous: SearchWatermark | undefined, processed: TenderListing[]): SearchWatermark {
+  const sourceIds = [...new Set([...processed.map(l => l.sourceId), ...(previous?.sourceIds ?? [])])];
+  let publishedAt = previous?.publishedAt;
+  for (const listing of processed) {
+    if (listing.publishedAt && !isNaN(listing.publishedAt.getTime()) && (!publishedAt || listing.publishedAt > publishedAt)) {
+      publishedAt = listing.publishedAt;
+    }
+  }
+  return { publishedAt, sourceIds: sourceIds.slice(0, WATERMARK_ID_LIMIT) };
+}
+
+/**
+ * Page through search results newest first. Stops after the first page that
+ * reaches listings covered by params.watermark (a known source ID or one
+ * published before it), when there is no next page, or after
+ * params.maxPages. Listings on the pages read are all returned, known ones
+ * included, except those published before params.publishedAfter; telling
+ * new and changed listings apart is up to the caller.
+ */
+export async function crawlPages(
+  params: SearchParams,
+  readPage: () => Promise<TenderListing[]>,
+  nextPage: () => Promise<boolean>
+): Promise<TenderListing[]> {
+  const known = new Set(params.watermark?.sourceIds ?? []);
+  const seenThrough = params.watermark?.publishedAt;
+  const maxPages = params.maxPages ?? DEFAULT_MAX_SEARCH_PAGES;
+
+  const collected = new Set<string>();
+  const found: TenderListing[] = [];
+
+  for (let pageNumber = 1; pageNumber <= maxPages; pageNumber++) {
+    const listings = await readPage();
+    let reachedKnown = false;
+
+    for (const listing of listings) {
+      if (params.publishedAfter && listing.publishedAt && listing.publishedAt < params.publishedAfter) {
+        reachedKnown = true;
+        continue;
+      }
+      if (known.has(listing.sourceId) || (seenThrough && listing.publishedAt && listing.publishedAt < seenThrough)) {
+        reachedKnown = true;
+      }
+      if (collected.has(listing.sourceId)) continue;
+      collected.add(listing.sourceId);
+      found.push(listing);
+    }
+
+    if (reachedKnown || listings.length === 0) break;
+    if (!(await nextPage())) break;
+  }
+
+  return found;
+}
+
+// Detail pages fetched at once when the caller and the site don't say
+const DEFAULT_DETAIL_CONCURRENCY = 4;
+
+// A fetched detail, or null if it hasn't changed since `cache` was taken
+export interface DetailFetch {
+  detail: TenderDetail | null;
+  cache?: CachedDetail;
+}
+
+/**
+ * One settled detail fetch. `cache` is the entry to store for next time;
+ * unchanged results carry no detail and need no re-ingestion.
+ */
+export type DetailResult =
+  | { sourceId: string; detail: TenderDetail; cache?: CachedDetail; unchanged?: false; error?: undefined }
+  | { sourceId: string; detail?: undefined; cache: CachedDetail; unchanged: true; error?: undefined }
+  | { sourceId: string; detail?: undefined; cache?: undefined; unchanged?: false; error: unknown };
+
+export interface DetailFetchOptions {
+  concurrency?: number;
+  // What earlier syncs cached, by sourceId; enables conditional fetches
+  cached?: Map<string, CachedDetail>;
+}
+
+export interface DetailLane {
+  fetch: (sourceId: string) => Promise<DetailFetch>;
+  close?: () => Promise<void>;
+}
+
+/**
+ * Fetch details over `lanes` concurrent lanes, yielding each result as it
+ * settles rather than in input order. A failed fetch is yielded as an error
+ * and doesn't stop the others. A lane that fails to open is dropped and
+ * the lanes that did open drain the queue; iteration throws only if none
+ * opened. Stopping iteration early lets in-flight fetches finish but starts
+ * no new ones.
+ */
+export async function* settleDetails(
+  sourceIds: string[],
+  lanes: number,
+  openLane: (lane: number) => Promise<DetailLane>
+): AsyncGenerator<DetailResult> {
+  const queue = [...sourceIds];
+  const settled: DetailResult[] = [];
+  let wake: (() => void) | null = null;
+  let finished = false;
+  const openErrors: unknown[] = [];
+
+  const runLane = async (lane: number) => {
+    let opened: DetailLane;
+    try {
+      opened = await openLane(lane);
+    } catch (error) {
+      // The other lanes drain the queue; only fail if none could open
+      openErrors.push(error);
+      return;
+    }
+    try {
+      for (let sourceId = queue.shift(); sourceId !== undefined; sourceId = queue.shift()) {
+        try {
+          const { detail, cache } = await opened.fetch(sourceId);
+          settled.push(detail ? { sourceId, detail, cache } : { sourceId, cache: cache!, unchanged: true });
+        } catch (error) {
+          settled.push({ sourceId, error });
+        }
+        wake?.();
+      }
+    } finally {
+      await opened.close?.();
+    }
+  };
+
+  const count = Math.max(1, Math.min(lanes, sourceIds.length));
+  const all = Promise.all(Array.from({ length: count }, (_, lane) => runLane(lane))).finally(() => {
+    finished = true;
+    wake?.();
+  });
+
+  try {
+    for (;;) {
+      if (settled.length) {
+        yield settled.shift()!;
+      } else if (finished) {
+        break;
+      } else {
+        await new Promise<void>((resolve) => (wake = resolve));
+        wake = null;
+      }
+    }
+    if (openErrors.length === count) throw openErrors[0];
+  } finally {
+    queue.length = 0;
+    await all;
+  }
+}
+
 export interface TenderDetail {
   sourceId: string;
   title: string;
@@ -39,6 +262,20 @@ export interface TenderDetail {
   sourceUrl: string;
 }
 
+/**
+ * The read side of a portal adapter: what a crawl needs, whether it drives
+ * a browser (BaseSiteAdapter) or plain HTTP (HttpSiteAdapter).
+ */
+export interface TenderSource {
+  readonly siteName: string;
+  readonly siteUrl: string;
+  search(params: SearchParams): Promise<TenderListing[]>;
+  fetchTenderDetail(sourceId: string): Promise<TenderDetail>;
+  fetchTenderDetails(sourceIds: string[], options?: DetailFetchOptions): AsyncGenerator<DetailResult>;
+  downloadDocument(url: string, filename: string): Promise<Buffer>;
+  downloadDocumentTo(url: string, storage: DocumentStorage, options: StreamDocumentOptions): Promise<StoredDocument | null>;
+}
+
 export interface RegistrationParams {
   email: string;
   password: string;
@@ -68,15 +305,199 @@ export interface RegistrationResult {
   sessionData?: Record<string, unknown>;
 }
 
-export abstract class BaseSiteAdapter {
+/**
+ * Something that shows a page is usable. Conditions are raced, so an
+ * adapter can wait for "logged in OR error message OR captcha" at once.
+ */
+export type ReadyCondition =
+  | { selector: string; state?: "attached" | "detached" | "visible" | "hidden" }
+  | { url: string | RegExp }
+  | { urlChanged: true }
+  | { response: string | RegExp }
+  | { loadState: "load" | "domcontentloaded" | "networkidle" };
+
+/**
+ * Per-site waits for the phases adapters go through. Adapters override
+ * `readiness` to describe what "ready" looks like on their portal.
+ */
+export interface ReadinessProfile {
+  navigation: ReadyCondition[];
+  login: ReadyCondition[];
+  // After submitting a registration form: an error, a verification notice,
+  // a signed-in page or a CAPTCHA
+  register: ReadyCondition[];
+  search: ReadyCondition[];
+  logout: ReadyCondition[];
+  // Upper bound for any phase before carrying on regardless
+  timeout: number;
+}
+
+export interface ReadinessTiming {
+  label: string;
+  ms: number;
+  // Index into the conditions that fired first, or null on timeout
+  matched: number | null;
+}
+
+export const CAPTCHA_SELECTOR =
+  'iframe[src*="recaptcha"], iframe[src*="hcaptcha"], .g-recaptcha, .h-captcha, #captcha, [class*="captcha" i], iframe[title*="captcha" i]';
+
+const DEFAULT_READINESS: ReadinessProfile = {
+  navigation: [{ loadState: "domcontentloaded" }],
+  login: [
+    { selector: 'a[href*="logout" i], a[href*="signout" i], a[href*="sign-out" i], button:has-text("Sign out"), button:has-text("Log out")' },
+    { selector: '.validation-summary-errors, .error, .alert-danger, .message-error, [role="alert"]' },
+    { selector: CAPTCHA_SELECTOR },
+  ],
+  register: [
+    { selector: '.validation-summary-errors, .error, .alert-danger, .message-error, [role="alert"]' },
+    { selector: "text=/verify|confirmation|check your email/i" },
+    { selector: 'a[href*="logout" i], a[href*="signout" i], a[href*="sign-out" i], button:has-text("Sign out"), button:has-text("Log out")' },
+    { selector: CAPTCHA_SELECTOR },
+  ],
+  search: [
+    { selector: "table tbody tr, .search-results tr, .search-result, .tender-item, .notice-item" },
+    { selector: "text=/no (results|tenders|notices|opportunities) (found|match)/i" },
+  ],
+  logout: [
+    { selector: 'a[href*="logout" i], a[href*="signout" i], a[href*="sign-out" i]', state: "detached" },
+    { urlChanged: true },
+  ],
+  timeout: 15000,
+};
+
+/**
+ * Which requests a crawl lets through. Scraping only needs the document,
+ * its scripts and XHR, so other resource types are aborted unless they
+ * match `allow`.
+ */
+export interface ResourcePolicy {
+  // Playwright resource types to abort, e.g. "image", "font", "stylesheet"
+  blockTypes: string[];
+  // Hostnames (and their subdomains) aborted whatever the resource type
+  blockHosts: string[];
+  // URL substrings or patterns always let through, for portals that break
+  // without e.g. their stylesheets
+  allow: (string | RegExp)[];
+}
+
+export interface ResourceReport {
+  allowedRequests: number;
+  // From content-length, so chunked responses count as nothing
+  allowedBytes: number;
+  blockedRequests: number;
+  blockedByType: Record<string, number>;
+  // Blocked requests are never downloaded, so this uses typical sizes
+  estimatedBytesSaved: number;
+}
+
+// Rough median transfer size per resource type, from HTTP Archive
+const TYPICAL_BYTES: Record<string, number> = {
+  image: 15_000,
+  media: 250_000,
+  font: 30_000,
+  stylesheet: 10_000,
+  script: 20_000,
+};
+const TYPICAL_OTHER_BYTES = 2_000;
+
+const DEFAULT_RESOURCE_POLICY: ResourcePolicy = {
+  blockTypes: ["image", "media", "font", "stylesheet", "texttrack", "manifest"],
+  blockHosts: [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+    "nr-data.net",
+    "siteimproveanalytics.com",
+  ],
+  allow: [],
+};
+
+function hostOf(url: string): string {
+  try {
+    return new URL(url).hostname;
+  } catch {
+    return "";
+  }
+}
+
+function shouldBlock(policy: ResourcePolicy, url: string, type: string): boolean {
+  if (policy.allow.some((a) => (typeof a === "string" ? url.includes(a) : a.test(url)))) {
+    return false;
+  }
+  if (policy.blockTypes.includes(type)) return true;
+  const host = hostOf(url);
+  return policy.blockHosts.some((h) => host === h || host.endsWith(`.${h}`));
+}
+
+export abstract class BaseSiteAdapter implements TenderSource {
   protected page: Page;
   protected browser: Browser;
 
+  private timings: ReadinessTiming[] = [];
+  private routed = false;
+  // Validators from the most recent navigation's response
+  private lastValidators: { etag?: string; lastModified?: string } = {};
+  private resources: ResourceReport = {
+    allowedRequests: 0,
+    allowedBytes: 0,
+    blockedRequests: 0,
+    blockedByType: {},
+    estimatedBytesSaved: 0,
+  };
+
   constructor(browser: Browser, page: Page) {
     this.browser = browser;
     this.page = page;
   }
 
+  /**
+   * What each phase waits for on this portal. Override per site.
+   */
+  protected get readiness(): ReadinessProfile {
+    return DEFAULT_READINESS;
+  }
+
+  /**
+   * Most detail pages this portal should be asked for at once. Override
+   * per site.
+   */
+  protected get detailConcurrency(): number {
+    return DEFAULT_DETAIL_CONCURRENCY;
+  }
+
+  /**
+   * Overrides of the shared portal limiter's defaults for this site.
+   */
+  protected get portalLimits(): Partial<PortalLimits> {
+    return {};
+  }
+
+  /**
+   * How long each readiness wait took, for telemetry.
+   */
+  get readinessTimings(): ReadinessTiming[] {
+    return [...this.timings];
+  }
+
+  /**
+   * Requests to abort while crawling. Override per site, e.g. to allow a
+   * portal's stylesheets if its forms misbehave without them.
+   */
+  protected get resourcePolicy(): ResourcePolicy {
+    return DEFAULT_RESOURCE_POLICY;
+  }
+
+  /**
+   * What the resource policy let through and blocked so far.
+   */
+  get resourceReport(): ResourceReport {
+    return { ...this.resources, blockedByType: { ...this.resources.blockedByType } };
+  }
+
   abstract get siteName(): string;
   abstract get siteUrl(): string;
 
@@ -88,8 +509,406 @@ export abstract class BaseSiteAdapter {
   abstract downloadDocument(url: string, filename: string): Promise<Buffer>;
   abstract logout(): Promise<void>;
 
+  /**
+   * Page loaded to check whether a session is still signed in. Override per
+   * site with the lightest page that shows the logged-in state.
+   */
+  protected get sessionProbeUrl(): string {
+    return this.siteUrl;
+  }
+
+  /**
+   * Load a saved session's cookies into this page's context. Returns false
+   * if there was nothing usable to restore.
+   */
+  async restoreSession(sessionData: unknown): Promise<boolean> {
+    const cookies = sessionCookies(sessionData);
+    if (cookies.length === 0) return false;
+    await this.page.context().addCookies(cookies);
+    return true;
+  }
+
+  /**
+   * Cheap check that the context's session is still signed in: one page
+   * load instead of the login flow.
+   */
+  async probeSession(): Promise<boolean> {
+    try {
+      await this.navigateTo(this.sessionProbeUrl);
+      return await this.isLoggedIn();
+    } catch {
+      return false;
+    }
+  }
+
+  /**
+   * The context's current session, in the shape stored on the account.
+   */
+  async captureSession(): Promise<StoredSession> {
+    return { cookies: await this.page.context().cookies() };
+  }
+
+  /**
+   * Sign this page in as cheaply as possible: keep a warm context's
+   * session, else restore the stored one, and only run the login form when
+   * neither passes the probe. The password is only asked for then, so
+   * healthy sessions never decrypt it.
+   */
+  async ensureSession(sessionData: unknown, username: string, password: () => Promise<string>): Promise<SessionResult> {
+    const warm = await this.captureSession();
+    let via: SessionResult["via"];
+
+    if (warm.cookies.length > 0 && (await this.probeSession())) {
+      via = "warm";
+    } else if (
+      sessionChanged(sessionData, warm) &&
+      (await this.restoreSession(sessionData)) &&
+      (await this.probeSession())
+    ) {
+      via = "restored";
+    } else {
+      const result = await this.login(username, await password());
+      if (!result.success) return { ...result, via: "login", changed: false };
+      via = "login";
+    }
+
+    const session = await this.captureSession();
+    return {
+      success: true,
+      sessionData: { ...session },
+      via,
+      changed: sessionChanged(sessionData, session),
+    };
+  }
+
+  /**
+   * Fetch many detail pages at once, each in its own tab of this page's
+   * (already authenticated) browser context, and yield results as they
+   * complete. Concurrency is capped by the site's detailConcurrency.
+   * Tenders in options.cached are re-checked conditionally.
+   */
+  fetchTenderDetails(sourceIds: string[], options: DetailFetchOptions = {}): AsyncGenerator<DetailResult> {
+    const lanes = Math.min(options.concurrency ?? this.detailConcurrency, this.detailConcurrency);
+    const cached = options.cached ?? new Map<string, CachedDetail>();
+
+    return settleDetails(sourceIds, lanes, async (lane) => {
+      // The first lane keeps using this adapter's own page
+      if (lane === 0) {
+        return { fetch: (sourceId) => this.fetchDetailIfChanged(sourceId, cached.get(sourceId)) };
+      }
+      const tab = await this.page.context().newPage();
+      const worker = new (this.constructor as new (browser: Browser, page: Page) => BaseSiteAdapter)(this.browser, tab);
+      return {
+        fetch: (sourceId) => worker.fetchDetailIfChanged(sourceId, cached.get(sourceId)),
+        close: async () => {
+          this.absorb(worker);
+          await worker.dispose();
+          await tab.close().catch(() => {});
+        },
+      };
+    });
+  }
+
+  /**
+   * URL of a tender's detail page, or null if the portal has none that can
+   * be requested on its own. Enables conditional re-checks.
+   */
+  protected detailPageUrl(_sourceId: string): string | null {
+    return null;
+  }
+
+  /**
+   * Fetch a detail unless it's unchanged since `cached`. When the portal
+   * gave validators last time, a conditional request in this context
+   * settles it before any page load; a changed page is then served to the
+   * navigation from that same response, so it is requested only once.
+   * Without validators the page is loaded and parsed, and an identical
+   * parse still counts as unchanged.
+   */
+  protected async fetchDetailIfChanged(sourceId: string, cached?: CachedDetail): Promise<DetailFetch> {
+    const url = this.detailPageUrl(sourceId);
+    const conditional = validatorHeaders(cached);
+
+    if (url && cached && Object.keys(conditional).length > 0) {
+      const probe = await portalLimiter.request(this.siteName, async () => {
+        const response = await this.page.context().request.get(url, { headers: conditional });
+        return { status: response.status(), response };
+      }, this.portalLimits);
+      if (probe.status === 304) {
+        await probe.response.dispose();
+        return { detail: null, cache: cached };
+      }
+      if (probe.response.ok()) {
+        return this.parseDetailFrom(sourceId, url, probe.response, cached);
+      }
+      await probe.response.dispose();
+    }
+
+    this.lastValidators = {};
+    const detail = await this.fetchTenderDetail(sourceId);
+    return settleDetail(detail, cached, this.lastValidators);
+  }
+
+  // Parse a detail page whose navigation is answered with `response`
+  // instead of going back to the portal
+  private async parseDetailFrom(
+    sourceId: string,
+    url: string,
+    response: APIResponse,
+    cached: CachedDetail
+  ): Promise<DetailFetch> {
+    const serve = (route: Route) => route.fulfill({ response });
+    // Installed after the resource policy's route, so this one runs first
+    await this.applyResourcePolicy();
+    await this.page.route(url, serve, { times: 1 });
+    try {
+      this.lastValidators = {};
+      const detail = await this.fetchTenderDetail(sourceId);
+      return settleDetail(detail, cached, this.lastValidators);
+    } finally {
+      await this.page.unroute(url, serve).catch(() => {});
+      await response.dispose();
+    }
+  }
+
+  /**
+   * Stream a document into storage instead of buffering it like
+   * downloadDocument. The request is made outside the browser, carrying
+   * this context's cookies and user agent so gated documents still work.
+   */
+  async downloadDocumentTo(url: string, storage: DocumentStorage, options: StreamDocumentOptions): Promise<StoredDocument | null> {
+    const userAgent = await this.page.evaluate(() => navigator.userAgent).catch(() => undefined);
+    const open = async (target: string, headers: Record<string, string>) => {
+      const cookies = await this.page.context().cookies(target);
+      return portalLimiter.request(this.siteName, () => fetch(target, {
+        headers: {
+          ...headers,
+          ...(userAgent ? { "user-agent": userAgent } : {}),
+          ...(cookies.length ? { cookie: cookies.map((c) => `${c.name}=${c.value}`).join("; ") } : {}),
+        },
+        redirect: "follow",
+      }), this.portalLimits);
+    };
+    return streamDocument(open, url, storage, options);
+  }
+
+  // Fold a tab worker's telemetry into this adapter's
+  private absorb(worker: BaseSiteAdapter): void {
+    this.timings.push(...worker.timings);
+    const from = worker.resources;
+    this.resources.allowedRequests += from.allowedRequests;
+    this.resources.allowedBytes += from.allowedBytes;
+    this.resources.blockedRequests += from.blockedRequests;
+    this.resources.estimatedBytesSaved += from.estimatedBytesSaved;
+    for (const [type, count] of Object.entries(from.blockedByType)) {
+      this.resources.blockedByType[type] = (this.resources.blockedByType[type] ?? 0) + count;
+    }
+  }
+
+  /**
+   * Page through search results newest first, up to the listings covered
+   * by params.watermark. See crawlPages().
+   */
+  protected crawlListings(
+    params: SearchParams,
+    readPage: () => Promise<TenderListing[]>,
+    nextPage: () => Promise<boolean>
+  ): Promise<TenderListing[]> {
+    return crawlPages(params, readPage, nextPage);
+  }
+
+  /**
+   * Extract every listing on the current results page with a single
+   * $$eval, instead of several element handle round trips per row.
+   */
+  protected async extractListings(columns: ListingColumns): Promise<TenderListing[]> {
+    const { rows, sourceId, ...selectors } = columns;
+
+    const raw: RawListingRow[] = await this.page.$$eval(
+      rows,
+      (els, sel) =>
+        els.map((row) => {
+          const text = (selector?: string) =>
+            selector ? row.querySelector(selector)?.textContent?.trim() ?? null : null;
+          const link = row.querySelector(sel.link);
+          return {
+            title: link ? link.textContent?.trim() ?? "" : null,
+            href: link?.getAttribute("href") ?? null,
+            buyerOrg: text(sel.buyerOrg),
+            publishedAt: text(sel.publishedAt),
+            closesAt: text(sel.closesAt),
+            valueRange: text(sel.valueRange),
+          };
+        }),
+      selectors
+    );
+
+    return raw
+      .filter((row) => row.title !== null)
+      .map((row) => ({
+        sourceId: sourceId(row.href ?? ""),
+        title: row.title ?? "",
+        buyerOrg: row.buyerOrg ?? undefined,
+        publishedAt: parseListingDate(row.publishedAt),
+        closesAt: parseListingDate(row.closesAt),
+        valueRange: row.valueRange ?? undefined,
+        url: row.href?.startsWith("http") ? row.href : `${this.siteUrl}${row.href ?? ""}`,
+      }));
+  }
+
+  /**
+   * Run `action` and wait until any of `conditions` holds. URL and response
+   * waiters are armed before the action so fast redirects are not missed;
+   * selector and load-state waiters after it, so they only see the page the
+   * action led to. Resolves to false on timeout rather than throwing, so
+   * callers can go on to inspect the page just as they did after a fixed
+   * sleep.
+   */
+  protected async actAndWait(
+    label: string,
+    action: () => Promise<unknown>,
+    conditions: ReadyCondition[],
+    timeout = this.readiness.timeout
+  ): Promise<boolean> {
+    const started = Date.now();
+    const startUrl = this.page.url();
+    const armEarly = (c: ReadyCondition) => "url" in c || "urlChanged" in c || "response" in c;
+
+    const waiters: Promise<number>[] = [];
+    conditions.forEach((condition, i) => {
+      if (armEarly(condition)) {
+        waiters.push(this.waitForCondition(condition, startUrl, timeout).then(() => i));
+      }
+    });
+    // Losing waiters reject on timeout; nothing is listening for them
+    waiters.forEach((w) => w.catch(() => {}));
+
+    await action();
+
+    const remaining = Math.max(0, timeout - (Date.now() - started));
+    conditions.forEach((condition, i) => {
+      if (!armEarly(condition)) {
+        const waiter = this.waitForCondition(condition, startUrl, remaining).then(() => i);
+        waiter.catch(() => {});
+        waiters.push(waiter);
+      }
+    });
+
+    const matched = await Promise.any(waiters).catch(() => null);
+    this.timings.push({ label, ms: Date.now() - started, matched });
+    return matched !== null;
+  }
+
+  protected waitUntilReady(label: string, conditions: ReadyCondition[], timeout?: number): Promise<boolean> {
+    return this.actAndWait(label, async () => {}, conditions, timeout);
+  }
+
+  private async waitForCondition(condition: ReadyCondition, startUrl: string, timeout: number): Promise<void> {
+    if ("selector" in condition) {
+      await this.page.waitForSelector(condition.selector, { state: condition.state ?? "attached", timeout });
+    } else if ("urlChanged" in condition) {
+      await this.page.waitForURL((url) => url.href !== startUrl, { timeout, waitUntil: "commit" });
+    } else if ("url" in condition) {
+      await this.page.waitForURL(condition.url, { timeout });
+    } else if ("response" in condition) {
+      await this.page.waitForResponse(condition.response, { timeout });
+    } else {
+      await this.page.waitForLoadState(condition.loadState, { timeout });
+    }
+  }
+
+  /**
+   * Install the resource policy on the page. Runs once, before the first
+   * navigation. Document downloads go through page.request, which routes
+   * don't intercept.
+   */
+  protected async applyResourcePolicy(): Promise<void> {
+    if (this.routed) return;
+    this.routed = true;
+    await this.page.route("**/*", this.routeRequest);
+    this.page.on("response", this.countResponse);
+  }
+
+  /**
+   * Detach this adapter's route and listeners from the page, for when the
+   * page outlives the adapter (e.g. a BrowserPool lease).
+   */
+  async dispose(): Promise<void> {
+    if (!this.routed) return;
+    this.routed = false;
+    this.page.off("response", this.countResponse);
+    await this.page.unroute("**/*", this.routeRequest).catch(() => {});
+  }
+
+  private routeRequest = (route: Route) => {
+    const request = route.request();
+    const type = request.resourceType();
+    if (!shouldBlock(this.resourcePolicy, request.url(), type)) {
+      // Fall through to any context-level routes (e.g. replay)
+      return route.fallback();
+    }
+    this.resources.blockedRequests++;
+    this.resources.blockedByType[type] = (this.resources.blockedByType[type] ?? 0) + 1;
+    this.resources.estimatedBytesSaved += TYPICAL_BYTES[type] ?? TYPICAL_OTHER_BYTES;
+    return route.abort("blockedbyclient");
+  };
+
+  // Synchronous on purpose: request.sizes() would cost a browser round trip
+  // for every response, eating into what blocking saves
+  private countResponse = (response: PageResponse) => {
+    this.resources.allowedRequests++;
+    const length = Number(response.headers()["content-length"]);
+    if (Number.isFinite(length)) this.resources.allowedBytes += length;
+  };
+
   async navigateTo(url: string): Promise<void> {
-    await this.page.goto(url, { waitUntil: "networkidle" });
+    await this.applyResourcePolicy();
+    await this.limited(async (report) => {
+      const ready = await this.actAndWait(
+        `navigate ${new URL(url, this.siteUrl).pathname}`,
+        async () => {
+          const response = await this.page.goto(url, { waitUntil: "commit" });
+          if (response) {
+            report(statusOutcome(response.status()));
+            const headers = response.headers();
+            this.lastValidators = { etag: headers["etag"], lastModified: headers["last-modified"] };
+          }
+        },
+        this.readiness.navigation
+      );
+      if (!ready) report("error");
+      return ready;
+    });
+  }
+
+  /**
+   * Submit a form or click something, then wait for the given phase's
+   * readiness conditions.
+   */
+  protected clickAndWait(selector: string, phase: "login" | "register" | "search" | "logout"): Promise<boolean> {
+    return this.limited(async (report) => {
+      const ready = await this.actAndWait(phase, () => this.page.click(selector), this.readiness[phase]);
+      if (!ready) report("error");
+      return ready;
+    });
+  }
+
+  // Run a page operation in a slot of this portal's shared limiter. The
+  // operation can report a worse outcome than "ok"; the worst one counts.
+  private async limited<T>(operation: (report: (outcome: PortalOutcome) => void) => Promise<T>): Promise<T> {
+    const slot = await portalLimiter.acquire(this.siteName, this.portalLimits);
+    let outcome: PortalOutcome = "ok";
+    const report = (next: PortalOutcome) => {
+      if (next === "throttled" || outcome === "ok") outcome = next;
+    };
+    try {
+      return await operation(report);
+    } catch (error) {
+      report(isThrottleError(error) ? "throttled" : "error");
+      throw error;
+    } finally {
+      slot.release(outcome);
+    }
   }
 
   async screenshot(path: string): Promise<void> {
@@ -97,9 +916,7 @@ export abstract class BaseSiteAdapter {
   }
 
   async detectCaptcha(): Promise<boolean> {
-    const captcha = await this.page.$(
-      'iframe[src*="recaptcha"], iframe[src*="hcaptcha"], .g-recaptcha, .h-captcha, #captcha, [class*="captcha" i], iframe[title*="captcha" i]'
-    );
+    const captcha = await this.page.$(CAPTCHA_SELECTOR);
     return captcha !== null;
   }
 
@@ -227,4 +1044,7 @@ export interface SearchParams {
   valueMax?: number;
   publishedAfter?: Date;
   closingAfter?: Date;
+  // Where the previous search left off; paging stops once it is reached
+  watermark?: SearchWatermark;
+  maxPages?: number;
 }
@@ -0,0 +1,135 @@
+import { HttpClient, ensureOk } from "../http/client";
+import type { HttpResponse } from "../http/client";
+import { settleDetails } from "./base";
+import { portalLimiter } from "../rate-limit";
+import type { PortalLimits } from "../rate-limit";
+import { streamDocument } from "../documents/download";
+import type { StoredDocument, StreamDocumentOptions } from "../documents/download";
+import type { DocumentStorage } from "../documents/storage";
+import { pageHash, settleDetail, validatorHeaders } from "../detail-cache";
+import type { CachedDetail } from "../detail-cache";
+import type { DetailFetch, DetailFetchOptions, DetailResult, SearchParams, TenderDetail, TenderListing, TenderSource } from "./base";
+
+/**
+ * Thrown when a page is only available to a logged-in user. Callers hand
+ * those source IDs to the browser adapter of a linked account instead.
+ */
+export class RequiresBrowserError extends Error {
+  constructor(public readonly url: string) {
+    super(`${url} requires a logged-in browser session`);
+    this.name = "RequiresBrowserError";
+  }
+}
+
+function isLoginUrl(url: string): boolean {
+  return /\/(login|signin|sign-in)\b/i.test(new URL(url).pathname);
+}
+
+// One client per process, so keep-alive connections and conditional
+// request validators are shared by every crawl
+const sharedClient = new HttpClient();
+
+/**
+ * Adapter tier for portals with public feeds or APIs (hasApi in SITES).
+ * Reads listings and public detail pages over plain HTTP and returns the
+ * same TenderListing/TenderDetail shapes as the browser adapters.
+ */
+export abstract class HttpSiteAdapter implements TenderSource {
+  protected http: HttpClient;
+
+  constructor(http: HttpClient = sharedClient) {
+    this.http = http;
+  }
+
+  abstract get siteName(): string;
+  abstract get siteUrl(): string;
+
+  abstract search(params: SearchParams): Promise<TenderListing[]>;
+
+  /** The request that fetches a tender's detail page. */
+  protected abstract detailRequest(sourceId: string): { url: string; headers?: Record<string, string> };
+  /** Parse a fetched detail page. */
+  protected abstract parseDetail(sourceId: string, response: HttpResponse): TenderDetail;
+
+  async fetchTenderDetail(sourceId: string): Promise<TenderDetail> {
+    const { url, headers } = this.detailRequest(sourceId);
+    return this.parseDetail(sourceId, await this.getPublic(url, headers));
+  }
+
+  /**
+   * Fetch many detail pages at once over the shared keep-alive pool,
+   * yielding results as they complete. Tenders in options.cached are
+   * re-checked conditionally.
+   */
+  fetchTenderDetails(sourceIds: string[], options: DetailFetchOptions = {}): AsyncGenerator<DetailResult> {
+    const lanes = Math.min(options.concurrency ?? this.detailConcurrency, this.detailConcurrency);
+    return settleDetails(sourceIds, lanes, async () => ({
+      fetch: (sourceId) => this.fetchDetailIfChanged(sourceId, options.cached?.get(sourceId)),
+    }));
+  }
+
+  /**
+   * Fetch a detail unless it's unchanged since `cached`: the stored
+   * validators make the request conditional, and a body that hashes the
+   * same as last time isn't parsed again.
+   */
+  protected async fetchDetailIfChanged(sourceId: string, cached?: CachedDetail): Promise<DetailFetch> {
+    const { url, headers } = this.detailRequest(sourceId);
+    const response = await this.getPublic(url, { ...headers, ...validatorHeaders(cached) });
+    if (response.status === 304 && cached) {
+      return { detail: null, cache: cached };
+    }
+
+    const page = {
+      etag: response.etag,
+      lastModified: response.lastModified,
+      pageHash: pageHash(response.body),
+    };
+    if (cached && cached.pageHash === page.pageHash) {
+      return { detail: null, cache: { ...cached, ...page } };
+    }
+    return settleDetail(this.parseDetail(sourceId, response), cached, page);
+  }
+
+  /**
+   * Overrides of the shared portal limiter's defaults for this site.
+   */
+  protected get portalLimits(): Partial<PortalLimits> {
+    return {};
+  }
+
+  // Requests are cheap, but the portal is still someone else's server
+  protected get detailConcurrency(): number {
+    return 8;
+  }
+
+  async downloadDocument(url: string, _filename: string): Promise<Buffer> {
+    const response = await this.getPublic(url);
+    return response.body;
+  }
+
+  downloadDocumentTo(url: string, storage: DocumentStorage, options: StreamDocumentOptions): Promise<StoredDocument | null> {
+    const open = async (target: string, headers: Record<string, string>) => {
+      const response = await portalLimiter.request(this.siteName, () => this.http.open(target, headers), this.portalLimits);
+      if (response.status === 401 || response.status === 403 || isLoginUrl(response.url)) {
+        await response.body?.cancel();
+        throw new RequiresBrowserError(response.url);
+      }
+      return response;
+    };
+    return streamDocument(open, url, storage, options);
+  }
+
+  /**
+   * GET a page that should be public. Throws RequiresBrowserError if it
+   * turns out to be behind a login (401/403, or a redirect that ends on a
+   * login page), and HttpStatusError for other failures.
+   */
+  protected async getPublic(url: string, headers?: Record<string, string>): Promise<HttpResponse> {
+    const response = await portalLimiter.request(this.siteName, () => this.http.get(url, headers), this.portalLimits);
+    if (response.status === 401 || response.status === 403 || isLoginUrl(response.url)) {
+      throw new RequiresBrowserError(response.url);
+    }
+    return ensureOk(response);
+  }
+}
@@ -0,0 +1,116 @@
+import { crawlPages } from "./base";
+import type { SearchParams, TenderDetail, TenderListing } from "./base";
+import { HttpSiteAdapter } from "./http-base";
+import type { HttpResponse } from "../http/client";
+
+// NSW eTendering's public OCDS API; tender IDs are the RFT UUIDs the
+// buy.nsw notice pages use
+const API_URL = "https://tenders.nsw.gov.au/";
+const PAGE_SIZE = 100;
+
+interface OcdsValue {
+  amount?: number;
+}
+
+interface OcdsRelease {
+  date?: string;
+  buyer?: { name?: string };
+  tender?: {
+    id?: string;
+    title?: string;
+    description?: string;
+    procurementMethodDetails?: string;
+    tenderPeriod?: { startDate?: string; endDate?: string };
+    value?: OcdsValue;
+    minValue?: OcdsValue;
+    items?: { classification?: { description?: string } }[];
+    documents?: { url?: string }[];
+  };
+}
+
+interface OcdsReleasePackage {
+  releases?: OcdsRelease[];
+  links?: { next?: string };
+}
+
+function toDate(text: string | undefined): Date | undefined {
+  if (!text) return undefined;
+  const date = new Date(text);
+  return isNaN(date.getTime()) ? undefined : date;
+}
+
+/**
+ * NSW eTendering over plain HTTP, reading OCDS release packages (JSON)
+ * instead of rendering buy.nsw notice pages.
+ */
+export class NSWeTenderHttpAdapter extends HttpSiteAdapter {
+  get siteName() {
+    return "NSW eTendering";
+  }
+
+  get siteUrl() {
+    return "https://buy.nsw.gov.au";
+  }
+
+  async search(params: SearchParams): Promise<TenderListing[]> {
+    const query = new URLSearchParams({ event: "public.api.tender.search", ResultsPerPage: String(PAGE_SIZE) });
+    if (params.keywords?.length) query.set("keyword", params.keywords.join(" "));
+    let next: string | undefined = `${API_URL}?${query}`;
+
+    return crawlPages(
+      params,
+      async () => {
+        const response = await this.getPublic(next!, { accept: "application/json" });
+        const body = JSON.parse(response.body.toString("utf8")) as OcdsReleasePackage;
+        next = body.links?.next;
+        return (body.releases ?? []).filter((r) => r.tender?.id).map((r) => this.toListing(r));
+      },
+      async () => !!next
+    );
+  }
+
+  protected detailRequest(sourceId: string) {
+    const query = new URLSearchParams({ event: "public.api.tender.view", RFTUUID: sourceId });
+    return { url: `${API_URL}?${query}`, headers: { accept: "application/json" } };
+  }
+
+  protected parseDetail(sourceId: string, response: HttpResponse): TenderDetail {
+    const body = JSON.parse(response.body.toString("utf8")) as OcdsReleasePackage;
+    const release = body.releases?.[0];
+    if (!release?.tender) {
+      throw new Error(`NSW eTendering has no tender ${sourceId}`);
+    }
+    const { tender } = release;
+
+    return {
+      sourceId,
+      title: tender.title ?? "",
+      description: tender.description ?? "",
+      buyerOrg: release.buyer?.name ?? "",
+      regions: ["New South Wales"],
+      categories: [...new Set((tender.items ?? []).map((i) => i.classification?.description).filter((d): d is string => !!d))],
+      tenderType: tender.procurementMethodDetails,
+      valueLow: tender.minValue?.amount ?? tender.value?.amount,
+      valueHigh: tender.value?.amount,
+      publishedAt: toDate(tender.tenderPeriod?.startDate ?? release.date),
+      closesAt: toDate(tender.tenderPeriod?.endDate),
+      certificationsRequired: [],
+      documentUrls: (tender.documents ?? []).map((d) => d.url).filter((u): u is string => !!u),
+      sourceUrl: `${this.siteUrl}/notices/${sourceId}`,
+    };
+  }
+
+  private toListing(release: OcdsRelease): TenderListing {
+    const tender = release.tender!;
+    const value = tender.value?.amount;
+    return {
+      sourceId: tender.id!,
+      title: tender.title ?? "",
+      buyerOrg: release.buyer?.name,
+      publishedAt: toDate(tender.tenderPeriod?.startDate ?? release.date),
+      closesAt: toDate(tender.tenderPeriod?.endDate),
+      valueRange: value !== undefined ? `$${value.toLocaleString("en-AU")}` : undefined,
+      url: `${this.siteUrl}/notices/${tender.id}`,
+    };
+  }
+}
@@ -35,8 +35,7 @@ export class NSWeTenderAdapter extends BaseSiteAdapter {
       await emailField.fill(username);
       await passwordField.fill(password);
 
-      await this.page.click('button[type="submit"], input[type="submit"]');
-      await this.page.waitForTimeout(3000);
+      await this.clickAndWait('button[type="submit"], input[type="submit"]', "login");
 
       const loggedIn = await this.isLoggedIn();
 
@@ -84,8 +83,7 @@ export class NSWeTenderAdapter extends BaseSiteAdapter {
         return { success: false, requiresManualStep: { type: "captcha" } };
       }
 
-      await this.page.click('button[type="submit"], input[type="submit"]').catch(() => {});
-      await this.page.waitForTimeout(5000);
+      await this.clickAndWait('button[type="submit"], input[type="submit"]', "register").catch(() => {});
 
       if (await this.detectCaptcha()) {
         return { success: false, requiresManualStep: { type: "captcha" } };
@@ -114,8 +112,6 @@ export class NSWeTenderAdapter extends BaseSiteAdapter {
   }
 
   async search(params: SearchParams): Promise<TenderListing[]> {
-    const listings: TenderListing[] = [];
-
     await this.navigateTo(`${this.siteUrl}/notices`);
 
     if (params.keywords?.length) {
@@ -123,36 +119,23 @@ export class NSWeTenderAdapter extends BaseSiteAdapter {
       if (keywordField) await keywordField.fill(params.keywords.join(" "));
     }
 
-    await this.page.click('button:has-text("Search"), input[type="submit"]');
-    await this.page.waitForTimeout(5000);
-
-    const rows = await this.page.$$("table.listing-table tbody tr, .search-results tr, .notice-item, [data-testid='notice']");
-
-    for (const row of rows) {
-      const titleEl = await row.$("td a, a.notice-title, a");
-      const buyerEl = await row.$("td:nth-child(2), .buyer, .agency");
-      const closesEl = await row.$("td:nth-child(3), .closing-date");
+    await this.clickAndWait('button:has-text("Search"), input[type="submit"]', "search");
 
-      if (titleEl) {
-        const title = await titleEl.textContent();
-        const href = await titleEl.getAttribute("href");
-        const sourceId = href?.match(/RFTUUID=([^&]+)/i)?.[1] || href?.match(/\/notices\/([^/]+)/)?.[1] || href || "";
-
-        listings.push({
-          sourceId,
-          title: title?.trim() || "",
-          buyerOrg: (await buyerEl?.textContent())?.trim(),
-          closesAt: closesEl ? new Date((await closesEl.textContent())?.trim() || "") : undefined,
-          url: href?.startsWith("http") ? href : `${this.siteUrl}${href}`,
-        });
-      }
-    }
+    return this.extractListings({
+      rows: "table.listing-table tbody tr, .search-results tr, .notice-item, [data-testid='notice']",
+      link: "td a, a.notice-title, a",
+      buyerOrg: "td:nth-child(2), .buyer, .agency",
+      closesAt: "td:nth-child(3), .closing-date",
+      sourceId: (href) => href.match(/RFTUUID=([^&]+)/i)?.[1] || href.match(/\/notices\/([^/]+)/)?.[1] || href,
+    });
+  }
 
-    return listings;
+  protected detailPageUrl(sourceId: string): string {
+    return `${this.siteUrl}/notices/${sourceId}`;
   }
 
   async fetchTenderDetail(sourceId: string): Promise<TenderDetail> {
-    await this.navigateTo(`${this.siteUrl}/notices/${sourceId}`);
+    await this.navigateTo(this.detailPageUrl(sourceId));
 
     const title = await this.page.$eval("h1, h2, .notice-title", (el) => el.textContent?.trim() || "").catch(() => "");
     const description = await this.page.$eval(".notice-description, .description", (el) => el.textContent?.trim() || "").catch(() => "");
@@ -185,8 +168,7 @@ export class NSWeTenderAdapter extends BaseSiteAdapter {
 
   async logout(): Promise<void> {
     try {
-      await this.page.click('a[href*="logout"], a[href*="signout"], button:has-text("Sign out")');
-      await this.page.waitForTimeout(1000);
+      await this.clickAndWait('a[href*="logout"], a[href*="signout"], button:has-text("Sign out")', "logout");
     } catch {
       // Ignore logout errors
     }
@@ -34,8 +34,7 @@ export class QLDQTendersAdapter extends BaseSiteAdapter {
       await usernameField.fill(username);
       await passwordField.fill(password);
 
-      await this.page.click('input[type="submit"], button[type="submit"]');
-      await this.page.waitForTimeout(3000);
+      await this.clickAndWait('input[type="submit"], button[type="submit"]', "login");
 
       const loggedIn = await this.isLoggedIn();
 
@@ -90,8 +89,7 @@ export class QLDQTendersAdapter extends BaseSiteAdapter {
         return { success: false, requiresManualStep: { type: "captcha" } };
       }
 
-      await this.page.click('button[type="submit"], input[type="submit"]').catch(() => {});
-      await this.page.waitForTimeout(5000);
+      await this.clickAndWait('button[type="submit"], input[type="submit"]', "register").catch(() => {});
 
       if (await this.detectCaptcha()) {
         return { success: false, requiresManualStep: { type: "captcha" } };
@@ -120,8 +118,6 @@ export class QLDQTendersAdapter extends BaseSiteAdapter {
   }
 
   async search(params: SearchParams): Promise<TenderListing[]> {
-    const listings: TenderListing[] = [];
-
     await this.navigateTo(`${this.siteUrl}/qtenders/search`);
 
     if (params.keywords?.length) {
@@ -129,38 +125,24 @@ export class QLDQTendersAdapter extends BaseSiteAdapter {
       if (keywordField) await keywordField.fill(params.keywords.join(" "));
     }
 
-    await this.page.click('input[type="submit"], button:has-text("Search")');
-    await this.page.waitForTimeout(5000);
-
-    const rows = await this.page.$$("table tbody tr, .search-results tr");
-
-    for (const row of rows) {
-      const titleEl = await row.$("td a");
-      const buyerEl = await row.$("td:nth-child(2)");
-      const closesEl = await row.$("td:nth-child(3)");
-      const valueEl = await row.$("td:nth-child(4)");
-
-      if (titleEl) {
-        const title = await titleEl.textContent();
-        const href = await titleEl.getAttribute("href");
-        const sourceId = href?.match(/id=(\d+)/)?.[1] || href || "";
-
-        listings.push({
-          sourceId,
-          title: title?.trim() || "",
-          buyerOrg: (await buyerEl?.textContent())?.trim(),
-          closesAt: closesEl ? new Date((await closesEl.textContent())?.trim() || "") : undefined,
-          valueRange: (await valueEl?.textContent())?.trim(),
-          url: href?.startsWith("http") ? href : `${this.siteUrl}${href}`,
-        });
-      }
-    }
+    await this.clickAndWait('input[type="submit"], button:has-text("Search")', "search");
+
+    return this.extractListings({
+      rows: "table tbody tr, .search-results tr",
+      link: "td a",
+      buyerOrg: "td:nth-child(2)",
+      closesAt: "td:nth-child(3)",
+      valueRange: "td:nth-child(4)",
+      sourceId: (href) => href.match(/id=(\d+)/)?.[1] || href,
+    });
+  }
 
-    return listings;
+  protected detailPageUrl(sourceId: string): string {
+    return `${this.siteUrl}/qtenders/tender/display?id=${sourceId}`;
   }
 
   async fetchTenderDetail(sourceId: string): Promise<TenderDetail> {
-    await this.navigateTo(`${this.siteUrl}/qtenders/tender/display?id=${sourceId}`);
+    await this.navigateTo(this.detailPageUrl(sourceId));
 
     const title = await this.page.$eval("h1, h2, .tender-title", (el) => el.textContent?.trim() || "").catch(() => "");
     const description = await this.page.$eval(".tender-description, .description, .details", (el) => el.textContent?.trim() || "").catch(() => "");
@@ -193,8 +175,7 @@ export class QLDQTendersAdapter extends BaseSiteAdapter {
 
   async logout(): Promise<void> {
     try {
-      await this.page.click('a[href*="logout"], a[href*="Logout"]');
-      await this.page.waitForTimeout(1000);
+      await this.clickAndWait('a[href*="logout"], a[href*="Logout"]', "logout");
     } catch {
       // Ignore logout errors
     }
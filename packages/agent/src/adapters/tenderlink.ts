@@ -35,8 +35,7 @@ export class TenderLinkAdapter extends BaseSiteAdapter {
       await emailField.fill(username);
       await passwordField.fill(password);
 
-      await this.page.click('button[type="submit"], input[type="submit"]');
-      await this.page.waitForTimeout(3000);
+      await this.clickAndWait('button[type="submit"], input[type="submit"]', "login");
 
       const loggedIn = await this.isLoggedIn();
 
@@ -92,8 +91,7 @@ export class TenderLinkAdapter extends BaseSiteAdapter {
         return { success: false, requiresManualStep: { type: "captcha" } };
       }
 
-      await this.page.click('button[type="submit"], input[type="submit"]').catch(() => {});
-      await this.page.waitForTimeout(5000);
+      await this.clickAndWait('button[type="submit"], input[type="submit"]', "register").catch(() => {});
 
       if (await this.detectCaptcha()) {
         return { success: false, requiresManualStep: { type: "captcha" } };
@@ -125,8 +123,6 @@ export class TenderLinkAdapter extends BaseSiteAdapter {
   }
 
   async search(params: SearchParams): Promise<TenderListing[]> {
-    const listings: TenderListing[] = [];
-
     await this.navigateTo(`${this.siteUrl}/search`);
 
     if (params.keywords?.length) {
@@ -134,36 +130,23 @@ export class TenderLinkAdapter extends BaseSiteAdapter {
       if (keywordField) await keywordField.fill(params.keywords.join(" "));
     }
 
-    await this.page.click('button:has-text("Search"), input[type="submit"]');
-    await this.page.waitForTimeout(5000);
-
-    const items = await this.page.$$(".tender-item, .search-result, table tbody tr");
-
-    for (const item of items) {
-      const titleEl = await item.$("a, .tender-title a, .title");
-      const buyerEl = await item.$(".buyer, .organisation, td:nth-child(2)");
-      const closesEl = await item.$(".closing-date, .close-date, td:nth-child(3)");
+    await this.clickAndWait('button:has-text("Search"), input[type="submit"]', "search");
 
-      if (titleEl) {
-        const title = await titleEl.textContent();
-        const href = await titleEl.getAttribute("href");
-        const sourceId = href?.match(/\/tender\/([^/]+)/)?.[1] || href || "";
-
-        listings.push({
-          sourceId,
-          title: title?.trim() || "",
-          buyerOrg: (await buyerEl?.textContent())?.trim(),
-          closesAt: closesEl ? new Date((await closesEl.textContent())?.trim() || "") : undefined,
-          url: href?.startsWith("http") ? href : `${this.siteUrl}${href}`,
-        });
-      }
-    }
+    return this.extractListings({
+      rows: ".tender-item, .search-result, table tbody tr",
+      link: "a, .tender-title a, .title",
+      buyerOrg: ".buyer, .organisation, td:nth-child(2)",
+      closesAt: ".closing-date, .close-date, td:nth-child(3)",
+      sourceId: (href) => href.match(/\/tender\/([^/]+)/)?.[1] || href,
+    });
+  }
 
-    return listings;
+  protected detailPageUrl(sourceId: string): string {
+    return `${this.siteUrl}/tender/${sourceId}`;
   }
 
   async fetchTenderDetail(sourceId: string): Promise<TenderDetail> {
-    await this.navigateTo(`${this.siteUrl}/tender/${sourceId}`);
+    await this.navigateTo(this.detailPageUrl(sourceId));
 
     const title = await this.page.$eval("h1, .tender-title", (el) => el.textContent?.trim() || "").catch(() => "");
     const description = await this.page.$eval(".tender-description, .description", (el) => el.textContent?.trim() || "").catch(() => "");
@@ -196,8 +179,7 @@ export class TenderLinkAdapter extends BaseSiteAdapter {
 
   async logout(): Promise<void> {
     try {
-      await this.page.click('a[href*="logout"], a[href*="sign-out"]');
-      await this.page.waitForTimeout(1000);
+      await this.clickAndWait('a[href*="logout"], a[href*="sign-out"]', "logout");
     } catch {
       // Ignore logout errors
     }
@@ -37,8 +37,7 @@ export class VICTendersAdapter extends BaseSiteAdapter {
       await emailField.fill(username);
       await passwordField.fill(password);
 
-      await this.page.click('button[type="submit"], input[type="submit"]');
-      await this.page.waitForTimeout(3000);
+      await this.clickAndWait('button[type="submit"], input[type="submit"]', "login");
 
       const loggedIn = await this.isLoggedIn();
 
@@ -155,8 +154,6 @@ export class VICTendersAdapter extends BaseSiteAdapter {
   }
 
   async search(params: SearchParams): Promise<TenderListing[]> {
-    const listings: TenderListing[] = [];
-
     await this.navigateTo(`${this.siteUrl}/search`);
 
     if (params.keywords?.length) {
@@ -164,36 +161,23 @@ export class VICTendersAdapter extends BaseSiteAdapter {
       if (keywordField) await keywordField.fill(params.keywords.join(" "));
     }
 
-    await this.page.click('button:has-text("Search"), input[type="submit"]');
-    await this.page.waitForTimeout(5000);
-
-    const rows = await this.page.$$("table tbody tr, .search-results-item, .tender-item");
-
-    for (const row of rows) {
-      const titleEl = await row.$("a, .tender-title a");
-      const buyerEl = await row.$(".buyer, .agency, td:nth-child(2)");
-      const closesEl = await row.$(".closing-date, td:nth-child(3)");
-
-      if (titleEl) {
-        const title = await titleEl.textContent();
-        const href = await titleEl.getAttribute("href");
-        const sourceId = href?.match(/\/tender\/(\d+)/)?.[1] || href || "";
+    await this.clickAndWait('button:has-text("Search"), input[type="submit"]', "search");
 
-        listings.push({
-          sourceId,
-          title: title?.trim() || "",
-          buyerOrg: (await buyerEl?.textContent())?.trim(),
-          closesAt: closesEl ? new Date((await closesEl.textContent())?.trim() || "") : undefined,
-          url: href?.startsWith("http") ? href : `${this.siteUrl}${href}`,
-        });
-      }
-    }
+    return this.extractListings({
+      rows: "table tbody tr, .search-results-item, .tender-item",
+      link: "a, .tender-title a",
+      buyerOrg: ".buyer, .agency, td:nth-child(2)",
+      closesAt: ".closing-date, td:nth-child(3)",
+      sourceId: (href) => href.match(/\/tender\/(\d+)/)?.[1] || href,
+    });
+  }
 
-    return listings;
+  protected detailPageUrl(sourceId: string): string {
+    return `${this.siteUrl}/tender/${sourceId}`;
   }
 
   async fetchTenderDetail(sourceId: string): Promise<TenderDetail> {
-    await this.navigateTo(`${this.siteUrl}/tender/${sourceId}`);
+    await this.navigateTo(this.detailPageUrl(sourceId));
 
     const title = await this.page.$eval("h1, h2, .tender-title", (el) => el.textContent?.trim() || "").catch(() => "");
     const description = await this.page.$eval(".tender-description, .description", (el) => el.textContent?.trim() || "").catch(() => "");
@@ -226,8 +210,7 @@ export class VICTendersAdapter extends BaseSiteAdapter {
 
   async logout(): Promise<void> {
     try {
-      await this.page.click('a[href*="logout"], a[href*="signout"]');
-      await this.page.waitForTimeout(1000);
+      await this.clickAndWait('a[href*="logout"], a[href*="signout"]', "logout");
     } catch {
       // Ignore logout errors
     }
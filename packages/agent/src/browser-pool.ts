@@ -0,0 +1,333 @@
+import type { Browser, BrowserContext, BrowserContextOptions, Page } from "playwright-core";
+
+export interface BrowserPoolOptions {
+  // Starts one browser: a Browserbase session over CDP in production, or a
+  // local chromium.launch() in tests
+  launch: () => Promise<Browser>;
+  maxBrowsers?: number;
+  maxContextsPerBrowser?: number;
+  // Recycle a context once its page has navigated this many times
+  maxPagesPerContext?: number;
+  // Recycle a context once its page's JS heap grows past this
+  maxHeapBytes?: number;
+  // Close a browser after it has had no leased contexts for this long
+  idleTimeoutMs?: number;
+  contextOptions?: BrowserContextOptions;
+}
+
+export interface BrowserLease {
+  key: string;
+  browser: Browser;
+  context: BrowserContext;
+  page: Page;
+  // Hand the context back. Pass discard when the page is in an unknown
+  // state (e.g. after an error) so the next lease gets a fresh context.
+  release(options?: { discard?: boolean }): Promise<void>;
+}
+
+export interface LatencyStats {
+  count: number;
+  meanMs: number;
+  p95Ms: number;
+  maxMs: number;
+}
+
+export interface BrowserPoolMetrics {
+  browsers: number;
+  contexts: number;
+  leased: number;
+  waiting: number;
+  launched: number;
+  recycled: number;
+  acquire: LatencyStats;
+  release: LatencyStats;
+}
+
+interface PooledBrowser {
+  browser: Browser;
+  contexts: Set<PooledContext>;
+  // Slots promised to acquire() calls still opening their context
+  reserved: number;
+  idleTimer?: ReturnType<typeof setTimeout>;
+}
+
+interface PooledContext {
+  key: string;
+  owner: PooledBrowser;
+  context: BrowserContext;
+  page: Page;
+  navigations: number;
+  leased: boolean;
+  lastUsed: number;
+}
+
+const LATENCY_SAMPLES = 200;
+
+class LatencyWindow {
+  private samples: number[] = [];
+  private count = 0;
+  private total = 0;
+  private max = 0;
+
+  record(ms: number): void {
+    this.count++;
+    this.total += ms;
+    this.max = Math.max(this.max, ms);
+    this.samples.push(ms);
+    if (this.samples.length > LATENCY_SAMPLES) this.samples.shift();
+  }
+
+  stats(): LatencyStats {
+    const sorted = [...this.samples].sort((a, b) => a - b);
+    const p95 = sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * 0.95))] : 0;
+    return {
+      count: this.count,
+      meanMs: this.count ? this.total / this.count : 0,
+      p95Ms: p95,
+      maxMs: this.max,
+    };
+  }
+}
+
+/**
+ * Keeps browsers warm between syncs and hands out one isolated context per
+ * key (a linked account, or a portal for anonymous crawls). A key's context
+ * is reused, cookies and all, until it has served maxPagesPerContext
+ * navigations or its heap passes maxHeapBytes, then it is closed and the
+ * next acquire() opens a new one.
+ *
+ * Only one lease per key is out at a time; a second acquire() for the same
+ * key waits for the first to be released. The key and a context slot are
+ * claimed before acquire() first awaits, so concurrent calls never open two
+ * contexts for one key or more contexts than a browser has room for.
+ */
+export class BrowserPool {
+  private readonly options: Required<Omit<BrowserPoolOptions, "contextOptions">> & {
+    contextOptions?: BrowserContextOptions;
+  };
+  private browsers = new Set<PooledBrowser>();
+  private launching = 0;
+  private byKey = new Map<string, PooledContext>();
+  // Keys whose context is being opened
+  private opening = new Set<string>();
+  private waiters: (() => void)[] = [];
+  // Bumped on every notify(), so acquire() can tell if it missed one
+  private changes = 0;
+  private launched = 0;
+  private recycled = 0;
+  private acquireLatency = new LatencyWindow();
+  private releaseLatency = new LatencyWindow();
+  private closed = false;
+
+  constructor(options: BrowserPoolOptions) {
+    this.options = {
+      maxBrowsers: 2,
+      maxContextsPerBrowser: 4,
+      maxPagesPerContext: 200,
+      maxHeapBytes: 256 * 1024 * 1024,
+      idleTimeoutMs: 5 * 60 * 1000,
+      ...options,
+    };
+  }
+
+  async acquire(key: string): Promise<BrowserLease> {
+    const started = Date.now();
+    for (;;) {
+      if (this.closed) throw new Error("BrowserPool is closed");
+      const seen = this.changes;
+
+      const existing = this.byKey.get(key);
+      if (existing && !existing.leased) {
+        return this.lease(existing, started);
+      }
+      if (!existing && !this.opening.has(key)) {
+        this.opening.add(key);
+        let owner: PooledBrowser | null = null;
+        let noRoom = false;
+        try {
+          owner = await this.reserveSlot();
+          if (owner) return this.lease(await this.openContext(key, owner), started);
+          noRoom = true;
+        } finally {
+          if (owner) owner.reserved--;
+          this.opening.delete(key);
+          // Others waiting on this key need another look, unless there was
+          // simply no room (waking them then would only spin)
+          if (!noRoom) this.notify();
+        }
+      }
+      // Something may have changed while this call was awaiting
+      if (this.changes === seen) await this.nextChange();
+    }
+  }
+
+  metrics(): BrowserPoolMetrics {
+    let leased = 0;
+    for (const entry of this.byKey.values()) {
+      if (entry.leased) leased++;
+    }
+    return {
+      browsers: this.browsers.size,
+      contexts: this.byKey.size,
+      leased,
+      waiting: this.waiters.length,
+      launched: this.launched,
+      recycled: this.recycled,
+      acquire: this.acquireLatency.stats(),
+      release: this.releaseLatency.stats(),
+    };
+  }
+
+  async close(): Promise<void> {
+    this.closed = true;
+    const browsers = [...this.browsers];
+    this.browsers.clear();
+    this.byKey.clear();
+    this.notify();
+    await Promise.all(browsers.map((b) => this.closeBrowser(b)));
+  }
+
+  private lease(entry: PooledContext, started: number): BrowserLease {
+    entry.leased = true;
+    if (entry.owner.idleTimer) {
+      clearTimeout(entry.owner.idleTimer);
+      entry.owner.idleTimer = undefined;
+    }
+    this.acquireLatency.record(Date.now() - started);
+
+    let released = false;
+    return {
+      key: entry.key,
+      browser: entry.owner.browser,
+      context: entry.context,
+      page: entry.page,
+      release: async (options) => {
+        if (released) return;
+        released = true;
+        await this.release(entry, options?.discard ?? false);
+      },
+    };
+  }
+
+  private async release(entry: PooledContext, discard: boolean): Promise<void> {
+    const started = Date.now();
+    entry.lastUsed = Date.now();
+
+    // Still leased while deciding, so nobody acquires a context about to close
+    if (discard || entry.page.isClosed() || entry.navigations >= this.options.maxPagesPerContext
+      || (await this.heapBytes(entry.page)) > this.options.maxHeapBytes) {
+      this.recycled++;
+      await this.closeContext(entry);
+    }
+    entry.leased = false;
+
+    this.scheduleIdleClose(entry.owner);
+    this.releaseLatency.record(Date.now() - started);
+    this.notify();
+  }
+
+  /**
+   * Reserve a context slot in a connected browser, launching one if
+   * allowed. The caller releases the reservation once its context is open.
+   */
+  private async reserveSlot(): Promise<PooledBrowser | null> {
+    for (const owner of this.browsers) {
+      if (owner.browser.isConnected() && owner.contexts.size + owner.reserved < this.options.maxContextsPerBrowser) {
+        owner.reserved++;
+        return owner;
+      }
+    }
+
+    if (this.browsers.size + this.launching < this.options.maxBrowsers) {
+      this.launching++;
+      try {
+        const browser = await this.options.launch();
+        const owner: PooledBrowser = { browser, contexts: new Set(), reserved: 1 };
+        browser.on("disconnected", () => this.dropBrowser(owner));
+        this.browsers.add(owner);
+        this.launched++;
+        return owner;
+      } finally {
+        this.launching--;
+      }
+    }
+
+    // Every slot is taken: make room by closing the least recently used
+    // context that nobody is holding
+    let oldest: PooledContext | null = null;
+    for (const entry of this.byKey.values()) {
+      if (!entry.leased && (!oldest || entry.lastUsed < oldest.lastUsed)) oldest = entry;
+    }
+    if (oldest) {
+      // closeContext() frees the slot synchronously; take it before awaiting
+      const owner = oldest.owner;
+      owner.reserved++;
+      await this.closeContext(oldest);
+      if (owner.browser.isConnected()) return owner;
+      owner.reserved--;
+    }
+    return null;
+  }
+
+  private async openContext(key: string, owner: PooledBrowser): Promise<PooledContext> {
+    const context = await owner.browser.newContext(this.options.contextOptions);
+    const page = await context.newPage();
+    const entry: PooledContext = { key, owner, context, page, navigations: 0, leased: false, lastUsed: Date.now() };
+    page.on("framenavigated", (frame) => {
+      if (frame === page.mainFrame()) entry.navigations++;
+    });
+    owner.contexts.add(entry);
+    this.byKey.set(key, entry);
+    return entry;
+  }
+
+  private async closeContext(entry: PooledContext): Promise<void> {
+    entry.owner.contexts.delete(entry);
+    if (this.byKey.get(entry.key) === entry) this.byKey.delete(entry.key);
+    await entry.context.close().catch(() => {});
+  }
+
+  private scheduleIdleClose(owner: PooledBrowser): void {
+    if (owner.idleTimer || [...owner.contexts].some((c) => c.leased)) return;
+    owner.idleTimer = setTimeout(() => {
+      owner.idleTimer = undefined;
+      if (owner.reserved === 0 && ![...owner.contexts].some((c) => c.leased)) {
+        this.dropBrowser(owner);
+        void this.closeBrowser(owner);
+      }
+    }, this.options.idleTimeoutMs);
+    // Don't keep a finished job's process alive just to close the browser
+    owner.idleTimer.unref?.();
+  }
+
+  private dropBrowser(owner: PooledBrowser): void {
+    if (!this.browsers.delete(owner)) return;
+    for (const entry of owner.contexts) {
+      if (this.byKey.get(entry.key) === entry) this.byKey.delete(entry.key);
+    }
+    owner.contexts.clear();
+    this.notify();
+  }
+
+  private async closeBrowser(owner: PooledBrowser): Promise<void> {
+    if (owner.idleTimer) clearTimeout(owner.idleTimer);
+    await owner.browser.close().catch(() => {});
+  }
+
+  private async heapBytes(page: Page): Promise<number> {
+    return page
+      .evaluate(() => (performance as any).memory?.usedJSHeapSize ?? 0)
+      .catch(() => 0);
+  }
+
+  private nextChange(): Promise<void> {
+    return new Promise((resolve) => this.waiters.push(resolve));
+  }
+
+  private notify(): void {
+    this.changes++;
+    const waiters = this.waiters;
+    this.waiters = [];
+    for (const resolve of waiters) resolve();
+  }
+}
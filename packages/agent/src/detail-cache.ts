@@ -0,0 +1,53 @@
+import { createHash } from "node:crypto";
+import type { TenderDetail } from "./adapters/base";
+
+/**
+ * What was learned from a tender's detail page last time, so the next sync
+ * can ask the portal whether it changed instead of fetching and parsing it
+ * again. Stored per (source, sourceId) by the caller.
+ */
+export interface CachedDetail {
+  // Validators from the portal's last response, sent back conditionally
+  etag?: string;
+  lastModified?: string;
+  // Hash of the raw page as fetched (HTTP tier only)
+  pageHash?: string;
+  // Hash of the TenderDetail parsed from it
+  detailHash: string;
+}
+
+/** Hash of a parsed detail, stable across key order. */
+export function detailHash(detail: TenderDetail): string {
+  const json = JSON.stringify(detail, (_key, value) =>
+    value && typeof value === "object" && !Array.isArray(value)
+      ? Object.fromEntries(Object.entries(value).sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0)))
+      : value
+  );
+  return createHash("sha256").update(json).digest("hex");
+}
+
+export function pageHash(body: Buffer | string): string {
+  return createHash("sha256").update(body).digest("hex");
+}
+
+/** Conditional request headers for a cached page, if it had validators. */
+export function validatorHeaders(cached: CachedDetail | undefined): Record<string, string> {
+  const headers: Record<string, string> = {};
+  if (cached?.etag) headers["if-none-match"] = cached.etag;
+  if (cached?.lastModified) headers["if-modified-since"] = cached.lastModified;
+  return headers;
+}
+
+/**
+ * The cache entry for a freshly parsed detail, and whether it differs from
+ * the cached one. A page whose validators or markup changed can still parse
+ * to the same detail, which needs no re-ingestion.
+ */
+export function settleDetail(
+  detail: TenderDetail,
+  cached: CachedDetail | undefined,
+  page: Omit<CachedDetail, "detailHash">
+): { detail: TenderDetail | null; cache: CachedDetail } {
+  const cache = { ...page, detailHash: detailHash(detail) };
+  return { detail: cached?.detailHash === cache.detailHash ? null : detail, cache };
+}
@@ -0,0 +1,216 @@
+import { createHash, randomUUID } from "node:crypto";
+import { Readable, Transform } from "node:stream";
+import { pipeline } from "node:stream/promises";
+import { HttpStatusError } from "../http/client";
+import type { DocumentStorage } from "./storage";
+
+// Tender packs are routinely 50-200 MB; anything far past that is unlikely
+// to be a real document
+const DEFAULT_MAX_DOCUMENT_BYTES = 500 * 1024 * 1024;
+
+/** Opens a document URL, optionally from a byte offset (HTTP Range). */
+export type OpenDocument = (url: string, headers: Record<string, string>) => Promise<Response>;
+
+export interface StreamDocumentOptions {
+  // Where the finished document is stored. A function gets the content
+  // hash, for content-addressed layouts; an object already stored there is
+  // assumed identical and kept.
+  objectPath: string | ((sha256: string) => string);
+  maxBytes?: number;
+  // Validators of a copy already stored; the download is skipped (and
+  // null returned) if the server says the document hasn't changed since
+  ifChanged?: DocumentValidators;
+}
+
+export interface DocumentValidators {
+  etag: string | null;
+  lastModified: string | null;
+}
+
+export interface StoredDocument extends DocumentValidators {
+  objectPath: string;
+  sha256: string;
+  bytes: number;
+  contentType: string;
+  // Bytes reused from an interrupted earlier attempt
+  resumedFrom: number;
+}
+
+export class DocumentTooLargeError extends Error {
+  constructor(public readonly url: string, public readonly maxBytes: number) {
+    super(`${url} is larger than ${maxBytes} bytes`);
+    this.name = "DocumentTooLargeError";
+  }
+}
+
+/** Stable upload ID for a URL, so a retry resumes the same partial upload. */
+export function uploadIdFor(url: string): string {
+  return createHash("sha256").update(url).digest("hex");
+}
+
+/**
+ * The response's validator, for If-Range on a later resume. Weak ETags
+ * can't be used there, so fall back to Last-Modified.
+ */
+function rangeValidator(response: Response): string | null {
+  const etag = response.headers.get("etag");
+  if (etag && !etag.startsWith("W/")) return etag;
+  return response.headers.get("last-modified");
+}
+
+/** Conditional request headers for a stored copy's validators. */
+function conditionalHeaders(validators: DocumentValidators | undefined): Record<string, string> {
+  const headers: Record<string, string> = {};
+  if (validators?.etag) headers["if-none-match"] = validators.etag;
+  if (validators?.lastModified) headers["if-modified-since"] = validators.lastModified;
+  return headers;
+}
+
+/**
+ * Download a document straight into storage without holding it in memory.
+ *
+ * Bytes are hashed (SHA-256) and counted as they stream through; the
+ * download is aborted once it passes maxBytes. If a previous attempt left a
+ * partial upload, the download resumes with a Range request and the hash is
+ * re-seeded from the stored bytes. The request carries If-Range with the
+ * partial's ETag or Last-Modified, so a document that changed since comes
+ * back whole and the download starts over; a partial with neither, or a
+ * server that ignores Range, also gets a fresh download. On failure the
+ * partial upload is kept for the next attempt, except when the size limit
+ * was hit.
+ *
+ * With ifChanged, a fresh download is made conditional on the stored copy's
+ * ETag and Last-Modified; a 304 returns null and nothing is written.
+ *
+ * A URL's partial upload is claimed for the length of the download. A
+ * concurrent download of the same URL (two tenders linking one file)
+ * writes to its own partial instead, which isn't kept for resuming.
+ */
+export async function streamDocument(
+  open: OpenDocument,
+  url: string,
+  storage: DocumentStorage,
+  options: StreamDocumentOptions
+): Promise<StoredDocument | null> {
+  const resumable = uploadIdFor(url);
+  if (!(await storage.claimPartial(resumable))) {
+    const uploadId = `${resumable}-${randomUUID()}`;
+    try {
+      return await downloadTo(open, url, storage, uploadId, options);
+    } catch (error) {
+      await storage.discardPartial(uploadId);
+      throw error;
+    }
+  }
+
+  try {
+    return await downloadTo(open, url, storage, resumable, options);
+  } finally {
+    await storage.releasePartial(resumable);
+  }
+}
+
+async function downloadTo(
+  open: OpenDocument,
+  url: string,
+  storage: DocumentStorage,
+  uploadId: string,
+  options: StreamDocumentOptions
+): Promise<StoredDocument | null> {
+  const maxBytes = options.maxBytes ?? DEFAULT_MAX_DOCUMENT_BYTES;
+
+  let offset = await storage.partialSize(uploadId);
+  const resumeFrom = offset > 0 ? await storage.partialValidator(uploadId) : null;
+  if (offset > 0 && !resumeFrom) {
+    // Nothing to tell whether the document changed since; start over
+    await storage.discardPartial(uploadId);
+    offset = 0;
+  }
+  const response = await open(
+    url,
+    resumeFrom ? { range: `bytes=${offset}-`, "if-range": resumeFrom } : conditionalHeaders(options.ifChanged)
+  );
+
+  if (response.status === 304 && !resumeFrom) {
+    await response.body?.cancel();
+    return null;
+  }
+
+  if (response.status === 416 && offset > 0) {
+    // The partial upload is already the whole file (or is garbage); start over
+    await response.body?.cancel();
+    await storage.discardPartial(uploadId);
+    return downloadTo(open, url, storage, uploadId, options);
+  }
+  if (!response.ok || !response.body) {
+    await response.body?.cancel();
+    throw new HttpStatusError(response.status, url);
+  }
+  if (offset > 0 && response.status !== 206) {
+    // Range ignored, or If-Range found the document changed: this is all of it
+    await storage.discardPartial(uploadId);
+    offset = 0;
+  }
+
+  const declared = Number(response.headers.get("content-length"));
+  if (declared && offset + declared > maxBytes) {
+    await response.body.cancel();
+    await storage.discardPartial(uploadId);
+    throw new DocumentTooLargeError(url, maxBytes);
+  }
+
+  const hash = createHash("sha256");
+  if (offset > 0) {
+    for await (const chunk of storage.readPartial(uploadId)) hash.update(chunk as Buffer);
+  }
+
+  let bytes = offset;
+  const meter = new Transform({
+    transform(chunk: Buffer, _encoding, callback) {
+      bytes += chunk.length;
+      if (bytes > maxBytes) {
+        callback(new DocumentTooLargeError(url, maxBytes));
+        return;
+      }
+      hash.update(chunk);
+      callback(null, chunk);
+    },
+  });
+
+  try {
+    await pipeline(
+      Readable.fromWeb(response.body as import("node:stream/web").ReadableStream),
+      meter,
+      await storage.appendPartial(uploadId, offset > 0 ? resumeFrom : rangeValidator(response))
+    );
+  } catch (error) {
+    if (error instanceof DocumentTooLargeError) {
+      await storage.discardPartial(uploadId);
+    }
+    throw error;
+  }
+
+  const sha256 = hash.digest("hex");
+  let objectPath: string;
+  if (typeof options.objectPath === "function") {
+    objectPath = options.objectPath(sha256);
+    if (await storage.exists(objectPath)) {
+      await storage.discardPartial(uploadId);
+    } else {
+      await storage.commitPartial(uploadId, objectPath);
+    }
+  } else {
+    objectPath = options.objectPath;
+    await storage.commitPartial(uploadId, objectPath);
+  }
+
+  return {
+    objectPath,
+    sha256,
+    bytes,
+    contentType: response.headers.get("content-type") ?? "application/octet-stream",
+    resumedFrom: offset,
+    etag: response.headers.get("etag"),
+    lastModified: response.headers.get("last-modified"),
+  };
+}
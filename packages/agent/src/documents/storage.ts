@@ -0,0 +1,133 @@
+import { createReadStream, createWriteStream } from "node:fs";
+import { mkdir, readFile, rename, rm, stat, writeFile } from "node:fs/promises";
+import path from "node:path";
+import type { Readable, Writable } from "node:stream";
+
+/**
+ * Where downloaded tender documents end up. Uploads are written as a
+ * partial object first and committed under their final path once complete,
+ * so an interrupted download can be resumed from the bytes already stored.
+ */
+export interface DocumentStorage {
+  /**
+   * Claim a partial upload so no one else appends to it until released.
+   * False if another download holds it. Claims older than an hour are
+   * assumed abandoned and taken over.
+   */
+  claimPartial(uploadId: string): Promise<boolean>;
+  releasePartial(uploadId: string): Promise<void>;
+  /** Bytes stored so far for an interrupted upload, or 0. */
+  partialSize(uploadId: string): Promise<number>;
+  /** The validator (ETag or Last-Modified) the partial upload was started under. */
+  partialValidator(uploadId: string): Promise<string | null>;
+  /** Read back a partial upload, e.g. to re-seed a hash before resuming. */
+  readPartial(uploadId: string): Readable;
+  /** Append to a partial upload, creating it if needed, and record its validator. */
+  appendPartial(uploadId: string, validator: string | null): Promise<Writable>;
+  /** Store a finished partial upload under `objectPath`. */
+  commitPartial(uploadId: string, objectPath: string): Promise<void>;
+  discardPartial(uploadId: string): Promise<void>;
+  exists(objectPath: string): Promise<boolean>;
+  read(objectPath: string): Readable;
+  delete(objectPath: string): Promise<void>;
+}
+
+// A download holding its claim this long is assumed to have died
+const PARTIAL_CLAIM_STALE_MS = 60 * 60 * 1000;
+
+/**
+ * DocumentStorage on the local filesystem, for dev, tests and workers with
+ * a mounted volume.
+ */
+export class LocalDocumentStorage implements DocumentStorage {
+  constructor(private readonly root: string) {}
+
+  async claimPartial(uploadId: string): Promise<boolean> {
+    const lock = this.partialPath(uploadId, ".lock");
+    await mkdir(path.dirname(lock), { recursive: true });
+    for (let attempt = 0; attempt < 2; attempt++) {
+      try {
+        await writeFile(lock, String(process.pid), { flag: "wx" });
+        return true;
+      } catch (error) {
+        if ((error as NodeJS.ErrnoException).code !== "EEXIST") throw error;
+        const held = await stat(lock).catch(() => null);
+        if (held && Date.now() - held.mtimeMs < PARTIAL_CLAIM_STALE_MS) return false;
+        await rm(lock, { force: true });
+      }
+    }
+    return false;
+  }
+
+  async releasePartial(uploadId: string): Promise<void> {
+    await rm(this.partialPath(uploadId, ".lock"), { force: true });
+  }
+
+  async partialSize(uploadId: string): Promise<number> {
+    try {
+      return (await stat(this.partialPath(uploadId))).size;
+    } catch {
+      return 0;
+    }
+  }
+
+  async partialValidator(uploadId: string): Promise<string | null> {
+    return readFile(this.partialPath(uploadId, ".validator"), "utf8").catch(() => null);
+  }
+
+  readPartial(uploadId: string): Readable {
+    return createReadStream(this.partialPath(uploadId));
+  }
+
+  async appendPartial(uploadId: string, validator: string | null): Promise<Writable> {
+    const file = this.partialPath(uploadId);
+    await mkdir(path.dirname(file), { recursive: true });
+    if (validator) {
+      await writeFile(this.partialPath(uploadId, ".validator"), validator);
+    } else {
+      await rm(this.partialPath(uploadId, ".validator"), { force: true });
+    }
+    return createWriteStream(file, { flags: "a" });
+  }
+
+  async commitPartial(uploadId: string, objectPath: string): Promise<void> {
+    const target = this.objectPath(objectPath);
+    await mkdir(path.dirname(target), { recursive: true });
+    await rename(this.partialPath(uploadId), target);
+    await rm(this.partialPath(uploadId, ".validator"), { force: true });
+  }
+
+  async discardPartial(uploadId: string): Promise<void> {
+    await rm(this.partialPath(uploadId), { force: true });
+    await rm(this.partialPath(uploadId, ".validator"), { force: true });
+  }
+
+  async exists(objectPath: string): Promise<boolean> {
+    try {
+      await stat(this.objectPath(objectPath));
+      return true;
+    } catch {
+      return false;
+    }
+  }
+
+  read(objectPath: string): Readable {
+    return createReadStream(this.objectPath(objectPath));
+  }
+
+  async delete(objectPath: string): Promise<void> {
+    await rm(this.objectPath(objectPath), { force: true });
+  }
+
+  private partialPath(uploadId: string, suffix = ""): string {
+    return path.join(this.root, ".partial", uploadId.replace(/[^\w-]/g, "_") + suffix);
+  }
+
+  private objectPath(objectPath: string): string {
+    const resolved = path.resolve(this.root, objectPath);
+    if (!resolved.startsWith(path.resolve(this.root) + path.sep)) {
+      throw new Error(`Storage path escapes the storage root: ${objectPath}`);
+    }
+    return resolved;
+  }
+}
@@ -0,0 +1,128 @@
+export interface HttpResponse {
+  status: number;
+  // Final URL after redirects
+  url: string;
+  body: Buffer;
+  contentType: string;
+  // True when the server answered 304 and the body came from the cache
+  notModified: boolean;
+  // Validators for conditional requests, when the server gave them
+  etag?: string;
+  lastModified?: string;
+}
+
+export interface HttpClientOptions {
+  userAgent?: string;
+  timeoutMs?: number;
+  // Responses kept for conditional requests; oldest are evicted first
+  maxCachedResponses?: number;
+  // Transport; swapped out to record or replay portal traffic
+  fetch?: typeof fetch;
+}
+
+interface CachedResponse {
+  etag?: string;
+  lastModified?: string;
+  response: HttpResponse;
+}
+
+/**
+ * Small HTTP client for portals with public feeds or APIs.
+ *
+ * Requests go through Node's fetch, whose connection pool keeps sockets to
+ * each origin alive between requests. GETs are conditional: ETag and
+ * Last-Modified validators from earlier responses are sent back, and a 304
+ * is answered from the cached body.
+ */
+export class HttpClient {
+  private readonly options: Required<HttpClientOptions>;
+  private cache = new Map<string, CachedResponse>();
+
+  constructor(options: HttpClientOptions = {}) {
+    this.options = {
+      userAgent: "TenderWatch/0.1 (+https://tenderwatch.com.au)",
+      timeoutMs: 30000,
+      maxCachedResponses: 1000,
+      fetch: (input, init) => fetch(input, init),
+      ...options,
+    };
+  }
+
+  async get(url: string, headers: Record<string, string> = {}): Promise<HttpResponse> {
+    const cached = this.cache.get(url);
+    const requestHeaders: Record<string, string> = {
+      "user-agent": this.options.userAgent,
+      ...headers,
+    };
+    if (cached?.etag) requestHeaders["if-none-match"] = cached.etag;
+    if (cached?.lastModified) requestHeaders["if-modified-since"] = cached.lastModified;
+
+    const res = await this.options.fetch(url, {
+      headers: requestHeaders,
+      redirect: "follow",
+      signal: AbortSignal.timeout(this.options.timeoutMs),
+    });
+
+    if (res.status === 304 && cached) {
+      // Refresh recency so frequently polled URLs stay cached
+      this.cache.delete(url);
+      this.cache.set(url, cached);
+      return { ...cached.response, notModified: true };
+    }
+
+    const etag = res.headers.get("etag") ?? undefined;
+    const lastModified = res.headers.get("last-modified") ?? undefined;
+    const response: HttpResponse = {
+      status: res.status,
+      url: res.url || url,
+      body: Buffer.from(await res.arrayBuffer()),
+      contentType: res.headers.get("content-type") ?? "",
+      notModified: false,
+      etag,
+      lastModified,
+    };
+    this.cache.delete(url);
+    if (res.ok && (etag || lastModified)) {
+      this.cache.set(url, { etag, lastModified, response });
+      if (this.cache.size > this.options.maxCachedResponses) {
+        this.cache.delete(this.cache.keys().next().value!);
+      }
+    }
+
+    return response;
+  }
+
+  /**
+   * Unbuffered, uncached GET for large bodies such as tender documents.
+   */
+  open(url: string, headers: Record<string, string> = {}): Promise<Response> {
+    return this.options.fetch(url, {
+      headers: { "user-agent": this.options.userAgent, ...headers },
+      redirect: "follow",
+    });
+  }
+
+  async getText(url: string, headers?: Record<string, string>): Promise<HttpResponse & { text: string }> {
+    const response = ensureOk(await this.get(url, headers));
+    return { ...response, text: response.body.toString("utf8") };
+  }
+
+  async getJson<T>(url: string): Promise<HttpResponse & { json: T }> {
+    const response = ensureOk(await this.get(url, { accept: "application/json" }));
+    return { ...response, json: JSON.parse(response.body.toString("utf8")) as T };
+  }
+}
+
+export class HttpStatusError extends Error {
+  constructor(public readonly status: number, public readonly url: string) {
+    super(`HTTP ${status} from ${url}`);
+    this.name = "HttpStatusError";
+  }
+}
+
+export function ensureOk(response: HttpResponse): HttpResponse {
+  if (response.status >= 400) {
+    throw new HttpStatusError(response.status, response.url);
+  }
+  return response;
+}
@@ -0,0 +1,96 @@
+// Just enough RSS and HTML reading for the HTTP adapters, which scrape a few
+// known fields and don't warrant a full DOM.
+
+const NAMED_ENTITIES: Record<string, string> = {
+  amp: "&",
+  lt: "<",
+  gt: ">",
+  quot: '"',
+  apos: "'",
+  nbsp: " ",
+};
+
+export function decodeEntities(text: string): string {
+  return text.replace(/&(#x[0-9a-f]+|#\d+|[a-z]+);/gi, (entity, name: string) => {
+    if (name[0] === "#") {
+      const code = name[1].toLowerCase() === "x" ? parseInt(name.slice(2), 16) : parseInt(name.slice(1), 10);
+      return isNaN(code) ? entity : String.fromCodePoint(code);
+    }
+    return NAMED_ENTITIES[name.toLowerCase()] ?? entity;
+  });
+}
+
+/** Visible text of a markup fragment, whitespace collapsed. */
+export function textContent(markup: string): string {
+  const text = markup
+    .replace(/<script\b[\s\S]*?<\/script>|<style\b[\s\S]*?<\/style>|<!--[\s\S]*?-->/gi, "")
+    .replace(/<[^>]+>/g, " ");
+  return decodeEntities(text).replace(/\s+/g, " ").trim();
+}
+
+/** Inner markup of every <tag> element, e.g. the <item>s of an RSS feed. */
+export function xmlElements(xml: string, tag: string): string[] {
+  const re = new RegExp(`<${tag}(?:\\s[^>]*)?>([\\s\\S]*?)</${tag}>`, "gi");
+  return [...xml.matchAll(re)].map((m) => m[1]);
+}
+
+/**
+ * Text of the first <tag> in an XML fragment. RSS fields often carry HTML,
+ * either in CDATA or entity-escaped, so that is reduced to text as well.
+ */
+export function xmlField(xml: string, tag: string): string | undefined {
+  const [inner] = xmlElements(xml, tag);
+  if (inner === undefined) return undefined;
+  const cdata = inner.match(/^\s*<!\[CDATA\[([\s\S]*?)\]\]>\s*$/);
+  return textContent(cdata ? cdata[1] : decodeEntities(inner));
+}
+
+/**
+ * Inner HTML of the first element matching one of a comma-separated list of
+ * simple selectors: "tag", ".class", "#id" or "tag.class".
+ */
+export function innerHtml(html: string, selectors: string): string | undefined {
+  for (const selector of selectors.split(",").map((s) => s.trim())) {
+    const parsed = selector.match(/^([a-z][a-z0-9]*)?(?:([.#])([\w-]+))?$/i);
+    if (!parsed) continue;
+    const [, tag, kind, name] = parsed;
+
+    for (const open of html.matchAll(/<([a-z][a-z0-9]*)\b([^>]*)>/gi)) {
+      const [whole, openTag, attrs] = open;
+      if (tag && openTag.toLowerCase() !== tag.toLowerCase()) continue;
+      if (kind && !hasAttr(attrs, kind === "." ? "class" : "id", name, kind === ".")) continue;
+
+      const start = open.index! + whole.length;
+      const end = closingTagIndex(html, openTag, start);
+      if (end !== -1) return html.slice(start, end);
+    }
+  }
+  return undefined;
+}
+
+/** href of every <a> in the fragment, in document order. */
+export function links(html: string): string[] {
+  return [...html.matchAll(/<a\b[^>]*\bhref\s*=\s*["']([^"']+)["']/gi)].map((m) => decodeEntities(m[1]));
+}
+
+function hasAttr(attrs: string, attr: string, value: string, isList: boolean): boolean {
+  const match = attrs.match(new RegExp(`\\b${attr}\\s*=\\s*["']([^"']*)["']`, "i"));
+  if (!match) return false;
+  return isList ? match[1].split(/\s+/).includes(value) : match[1] === value;
+}
+
+// Index of the </tag> that closes an element whose content starts at `from`,
+// allowing for nested elements with the same tag name
+function closingTagIndex(html: string, tag: string, from: number): number {
+  const re = new RegExp(`<(/?)${tag}\\b[^>]*?(/?)>`, "gi");
+  re.lastIndex = from;
+  let depth = 1;
+  for (let m = re.exec(html); m; m = re.exec(html)) {
+    if (m[1]) {
+      if (--depth === 0) return m.index;
+    } else if (!m[2]) {
+      depth++;
+    }
+  }
+  return -1;
+}
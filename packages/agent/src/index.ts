@@ -1,5 +1,7 @@
-export { BaseSiteAdapter } from "./adapters/base";
-export type { LoginResult, RegistrationParams, RegistrationResult, TenderListing, TenderDetail, SearchParams } from "./adapters/base";
+export { BaseSiteAdapter, CAPTCHA_SELECTOR, advanceWatermark, crawlPages, settleDetails } from "./adapters/base";
+export type { LoginResult, RegistrationParams, RegistrationResult, TenderListing, TenderDetail, SearchParams, SearchWatermark, ReadyCondition, ReadinessProfile, ReadinessTiming, ResourcePolicy, ResourceReport, TenderSource, DetailResult, DetailLane, DetailFetch, DetailFetchOptions, SessionResult } from "./adapters/base";
+export { detailHash, pageHash } from "./detail-cache";
+export type { CachedDetail } from "./detail-cache";
 export { AusTenderAdapter } from "./adapters/austender";
 export { NSWeTenderAdapter } from "./adapters/nsw-etender";
 export { QLDQTendersAdapter } from "./adapters/qld-qtenders";
@@ -7,6 +9,26 @@ export { VICTendersAdapter } from "./adapters/vic-tenders";
 export { SATendersAdapter } from "./adapters/sa-tenders";
 export { WATendersAdapter } from "./adapters/wa-tenders";
 export { TenderLinkAdapter } from "./adapters/tenderlink";
+export { HttpSiteAdapter, RequiresBrowserError } from "./adapters/http-base";
+export { AusTenderHttpAdapter } from "./adapters/austender-http";
+export { NSWeTenderHttpAdapter } from "./adapters/nsw-etender-http";
+export { HttpClient, HttpStatusError } from "./http/client";
+export type { HttpResponse, HttpClientOptions } from "./http/client";
+export { LocalDocumentStorage } from "./documents/storage";
+export type { DocumentStorage } from "./documents/storage";
+export { streamDocument, uploadIdFor, DocumentTooLargeError } from "./documents/download";
+export type { DocumentValidators, OpenDocument, StreamDocumentOptions, StoredDocument } from "./documents/download";
+export { sessionCookies, sessionChanged } from "./session";
+export type { StoredSession } from "./session";
+export { Recording } from "./replay/har";
+export type { RecordedRequest, RecordedResponse } from "./replay/har";
+export { recordContext, recordingFetch } from "./replay/record";
+export { ReplayServer } from "./replay/server";
+export type { ReplayStats } from "./replay/server";
+export { PortalLimiter, portalLimiter, DEFAULT_PORTAL_LIMITS, isThrottleError, statusOutcome } from "./rate-limit";
+export type { PortalLimits, PortalOutcome, PortalSlot, PortalLimitMetrics } from "./rate-limit";
+export { BrowserPool } from "./browser-pool";
+export type { BrowserPoolOptions, BrowserLease, BrowserPoolMetrics, LatencyStats } from "./browser-pool";
 
 import type { Browser } from "playwright-core";
 import { BaseSiteAdapter } from "./adapters/base";
@@ -17,6 +39,10 @@ import { VICTendersAdapter } from "./adapters/vic-tenders";
 import { SATendersAdapter } from "./adapters/sa-tenders";
 import { WATendersAdapter } from "./adapters/wa-tenders";
 import { TenderLinkAdapter } from "./adapters/tenderlink";
+import { HttpSiteAdapter } from "./adapters/http-base";
+import type { HttpClient } from "./http/client";
+import { AusTenderHttpAdapter } from "./adapters/austender-http";
+import { NSWeTenderHttpAdapter } from "./adapters/nsw-etender-http";
 
 export function getAdapter(site: string, browser: Browser, page: any): BaseSiteAdapter {
   switch (site) {
@@ -38,3 +64,19 @@ export function getAdapter(site: string, browser: Browser, page: any): BaseSiteA
       throw new Error(`Unknown site: ${site}. Supported: austender, nsw_etender, qld_qtenders, vic_tenders, sa_tenders, wa_tenders, tenderlink`);
   }
 }
+
+/**
+ * Plain HTTP adapter for portals with public feeds or APIs (hasApi in
+ * SITES), or null if the site can only be read through a browser. Pass a
+ * client to use instead of the shared one (e.g. for replay).
+ */
+export function getHttpAdapter(site: string, http?: HttpClient): HttpSiteAdapter | null {
+  switch (site) {
+    case "austender":
+      return new AusTenderHttpAdapter(http);
+    case "nsw_etender":
+      return new NSWeTenderHttpAdapter(http);
+    default:
+      return null;
+  }
+}
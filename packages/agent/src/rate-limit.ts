@@ -0,0 +1,249 @@
+export interface PortalLimits {
+  // Token bucket: sustained requests per second, and how many may burst
+  ratePerSecond: number;
+  burst: number;
+  // Bounds the in-flight operation limit adapts between
+  minConcurrency: number;
+  maxConcurrency: number;
+  initialConcurrency: number;
+  // Mean latency above which the portal is treated as struggling
+  targetLatencyMs: number;
+  // Smoothed error rate above which concurrency is cut
+  maxErrorRate: number;
+  // How long to hold off increasing again after the portal pushed back
+  cooldownMs: number;
+}
+
+export type PortalOutcome = "ok" | "error" | "throttled";
+
+export interface PortalSlot {
+  // Report how the operation went; feeds the adaptive limits
+  release(outcome?: PortalOutcome): void;
+}
+
+export interface PortalLimitMetrics {
+  site: string;
+  concurrency: number;
+  inFlight: number;
+  waiting: number;
+  ratePerSecond: number;
+  // Exponentially weighted means over recent operations
+  latencyMs: number;
+  errorRate: number;
+  completed: number;
+  throttled: number;
+}
+
+export const DEFAULT_PORTAL_LIMITS: PortalLimits = {
+  ratePerSecond: 4,
+  burst: 8,
+  minConcurrency: 1,
+  maxConcurrency: 8,
+  initialConcurrency: 4,
+  targetLatencyMs: 8000,
+  maxErrorRate: 0.2,
+  cooldownMs: 30_000,
+};
+
+const LATENCY_WEIGHT = 0.2;
+const ERROR_WEIGHT = 0.1;
+// Lowest rate a throttled portal is cut to
+const MIN_RATE_PER_SECOND = 0.2;
+
+interface SiteState {
+  limits: PortalLimits;
+  concurrency: number;
+  rate: number;
+  tokens: number;
+  refilledAt: number;
+  inFlight: number;
+  waiting: (() => void)[];
+  timer?: ReturnType<typeof setTimeout>;
+  latencyMs: number;
+  errorRate: number;
+  cooldownUntil: number;
+  completed: number;
+  throttled: number;
+}
+
+/**
+ * Whether an error means the portal is pushing back: HTTP 429/503, or a
+ * timeout.
+ */
+export function isThrottleError(error: unknown): boolean {
+  const status = (error as { status?: unknown } | null)?.status;
+  if (status === 429 || status === 503) return true;
+  return error instanceof Error && error.name === "TimeoutError";
+}
+
+/**
+ * How an HTTP status reflects on the portal's health. 4xx other than 429
+ * are our problem, not the portal's.
+ */
+export function statusOutcome(status: number): PortalOutcome {
+  if (status === 429 || status === 503) return "throttled";
+  return status >= 500 ? "error" : "ok";
+}
+
+/**
+ * Per-portal token bucket plus an adaptive concurrency limit, shared by
+ * everything that talks to a portal in this process (searches, detail
+ * fetches, downloads, session probes).
+ *
+ * Concurrency grows by about one per window of successful operations while
+ * latency stays under target, shrinks by one per window once it doesn't,
+ * and halves (with the request rate) when the portal throttles us.
+ */
+export class PortalLimiter {
+  private sites = new Map<string, SiteState>();
+
+  constructor(private readonly defaults: Partial<PortalLimits> = {}) {}
+
+  /**
+   * Wait for a slot on the site's portal. Limits passed on a site's first
+   * use override the defaults for that site.
+   */
+  acquire(site: string, limits: Partial<PortalLimits> = {}): Promise<PortalSlot> {
+    const state = this.state(site, limits);
+    return new Promise<PortalSlot>((resolve) => {
+      state.waiting.push(() => {
+        const started = Date.now();
+        let released = false;
+        resolve({
+          release: (outcome = "ok") => {
+            if (released) return;
+            released = true;
+            this.complete(state, outcome, Date.now() - started);
+          },
+        });
+      });
+      this.pump(state);
+    });
+  }
+
+  /**
+   * Run a task in a slot. Errors count against the portal, throttling
+   * errors (see isThrottleError) most heavily, and are rethrown.
+   */
+  async run<T>(site: string, task: () => Promise<T>, limits?: Partial<PortalLimits>): Promise<T> {
+    const slot = await this.acquire(site, limits);
+    try {
+      const result = await task();
+      slot.release("ok");
+      return result;
+    } catch (error) {
+      slot.release(isThrottleError(error) ? "throttled" : "error");
+      throw error;
+    }
+  }
+
+  /**
+   * Like run(), for a task resolving to an HTTP response, whose status
+   * decides the outcome (see statusOutcome).
+   */
+  async request<T extends { status: number }>(
+    site: string,
+    task: () => Promise<T>,
+    limits?: Partial<PortalLimits>
+  ): Promise<T> {
+    const slot = await this.acquire(site, limits);
+    try {
+      const response = await task();
+      slot.release(statusOutcome(response.status));
+      return response;
+    } catch (error) {
+      slot.release(isThrottleError(error) ? "throttled" : "error");
+      throw error;
+    }
+  }
+
+  /** Current limits and recent health of every portal, or just `site`. */
+  metrics(site?: string): PortalLimitMetrics[] {
+    const sites = site ? [...this.sites].filter(([key]) => key === site) : [...this.sites];
+    return sites.map(([site, s]) => ({
+      site,
+      concurrency: Math.floor(s.concurrency),
+      inFlight: s.inFlight,
+      waiting: s.waiting.length,
+      ratePerSecond: Math.round(s.rate * 100) / 100,
+      latencyMs: Math.round(s.latencyMs),
+      errorRate: Math.round(s.errorRate * 1000) / 1000,
+      completed: s.completed,
+      throttled: s.throttled,
+    }));
+  }
+
+  private state(site: string, limits: Partial<PortalLimits>): SiteState {
+    let state = this.sites.get(site);
+    if (!state) {
+      const resolved = { ...DEFAULT_PORTAL_LIMITS, ...this.defaults, ...limits };
+      state = {
+        limits: resolved,
+        concurrency: resolved.initialConcurrency,
+        rate: resolved.ratePerSecond,
+        tokens: resolved.burst,
+        refilledAt: Date.now(),
+        inFlight: 0,
+        waiting: [],
+        latencyMs: 0,
+        errorRate: 0,
+        cooldownUntil: 0,
+        completed: 0,
+        throttled: 0,
+      };
+      this.sites.set(site, state);
+    }
+    return state;
+  }
+
+  private pump(state: SiteState): void {
+    const now = Date.now();
+    state.tokens = Math.min(state.limits.burst, state.tokens + ((now - state.refilledAt) / 1000) * state.rate);
+    state.refilledAt = now;
+
+    while (state.waiting.length && state.inFlight < Math.floor(state.concurrency) && state.tokens >= 1) {
+      state.tokens -= 1;
+      state.inFlight++;
+      state.waiting.shift()!();
+    }
+
+    // Out of tokens rather than slots: come back when the next one is due
+    if (state.waiting.length && state.inFlight < Math.floor(state.concurrency) && !state.timer) {
+      const waitMs = Math.ceil(((1 - state.tokens) / state.rate) * 1000);
+      state.timer = setTimeout(() => {
+        state.timer = undefined;
+        this.pump(state);
+      }, waitMs);
+    }
+  }
+
+  private complete(state: SiteState, outcome: PortalOutcome, latencyMs: number): void {
+    const { limits } = state;
+    const now = Date.now();
+    state.inFlight--;
+    state.completed++;
+    state.latencyMs = state.completed === 1 ? latencyMs : state.latencyMs + LATENCY_WEIGHT * (latencyMs - state.latencyMs);
+    state.errorRate += ERROR_WEIGHT * ((outcome === "ok" ? 0 : 1) - state.errorRate);
+
+    if (outcome === "throttled") {
+      state.throttled++;
+      // Requests already in flight when the portal pushed back will likely
+      // all be throttled too; cut once per cooldown, not once per response
+      if (now >= state.cooldownUntil) {
+        state.concurrency = Math.max(limits.minConcurrency, state.concurrency / 2);
+        state.rate = Math.max(MIN_RATE_PER_SECOND, state.rate / 2);
+        state.cooldownUntil = now + limits.cooldownMs;
+      }
+    } else if (state.errorRate > limits.maxErrorRate || state.latencyMs > limits.targetLatencyMs) {
+      state.concurrency = Math.max(limits.minConcurrency, state.concurrency - 1 / state.concurrency);
+    } else if (outcome === "ok" && now >= state.cooldownUntil) {
+      state.concurrency = Math.min(limits.maxConcurrency, state.concurrency + 1 / state.concurrency);
+      state.rate = Math.min(limits.ratePerSecond, state.rate + limits.ratePerSecond / 20);
+    }
+
+    this.pump(state);
+  }
+}
+
+/** The limiter every adapter in this process shares. */
+export const portalLimiter = new PortalLimiter();
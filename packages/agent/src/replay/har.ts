@@ -0,0 +1,174 @@
+import { readFile, writeFile, mkdir } from "node:fs/promises";
+import { dirname } from "node:path";
+
+export interface RecordedRequest {
+  method: string;
+  url: string;
+  headers: Record<string, string>;
+  body?: Buffer;
+}
+
+export interface RecordedResponse {
+  status: number;
+  // Repeated headers (set-cookie) appear once per value
+  headers: { name: string; value: string }[];
+  body: Buffer;
+}
+
+// The subset of HAR 1.2 we write; enough for browser devtools and other
+// HAR viewers to open a recording
+interface HarEntry {
+  startedDateTime: string;
+  time: number;
+  request: {
+    method: string;
+    url: string;
+    httpVersion: string;
+    headers: { name: string; value: string }[];
+    queryString: { name: string; value: string }[];
+    cookies: [];
+    headersSize: -1;
+    bodySize: number;
+    postData?: { mimeType: string; text: string; encoding?: "base64" };
+  };
+  response: {
+    status: number;
+    statusText: string;
+    httpVersion: string;
+    headers: { name: string; value: string }[];
+    cookies: [];
+    content: { size: number; mimeType: string; text: string; encoding: "base64" };
+    redirectURL: string;
+    headersSize: -1;
+    bodySize: number;
+  };
+  cache: Record<string, never>;
+  timings: { send: number; wait: number; receive: number };
+}
+
+// The body was decoded when recorded, so these no longer describe it
+const STALE_HEADERS = new Set(["content-encoding", "content-length", "transfer-encoding"]);
+
+function key(method: string, url: string, body?: Buffer): string {
+  return `${method} ${url}\n${body?.toString("base64") ?? ""}`;
+}
+
+function withoutQuery(url: string): string {
+  const parsed = new URL(url);
+  return `${parsed.origin}${parsed.pathname}`;
+}
+
+/**
+ * Portal traffic captured as HAR, and looked up again for replay. A request
+ * made more than once (e.g. the same search paged by POST) replays its
+ * responses in the order they were recorded.
+ */
+export class Recording {
+  private entries: HarEntry[] = [];
+  private index = new Map<string, HarEntry[]>();
+  private cursors = new Map<string, number>();
+
+  static async load(path: string): Promise<Recording> {
+    const har = JSON.parse(await readFile(path, "utf8")) as { log: { entries: HarEntry[] } };
+    const recording = new Recording();
+    for (const entry of har.log.entries) recording.insert(entry);
+    return recording;
+  }
+
+  async save(path: string): Promise<void> {
+    await mkdir(dirname(path), { recursive: true });
+    const har = {
+      log: {
+        version: "1.2",
+        creator: { name: "tenderwatch-replay", version: "0.1.0" },
+        entries: this.entries,
+      },
+    };
+    await writeFile(path, JSON.stringify(har, null, 2));
+  }
+
+  get size(): number {
+    return this.entries.length;
+  }
+
+  /** When the first request was recorded, or null for an empty recording. */
+  get recordedAt(): Date | null {
+    return this.entries.length ? new Date(this.entries[0].startedDateTime) : null;
+  }
+
+  add(request: RecordedRequest, response: RecordedResponse, timeMs: number): void {
+    const header = (headers: { name: string; value: string }[], name: string) =>
+      headers.find((h) => h.name.toLowerCase() === name)?.value ?? "";
+
+    const responseHeaders = response.headers.filter((h) => !STALE_HEADERS.has(h.name.toLowerCase()));
+    const contentType = header(responseHeaders, "content-type");
+    this.insert({
+      startedDateTime: new Date(Date.now() - timeMs).toISOString(),
+      time: timeMs,
+      request: {
+        method: request.method,
+        url: request.url,
+        httpVersion: "HTTP/1.1",
+        headers: Object.entries(request.headers).map(([name, value]) => ({ name, value })),
+        queryString: [...new URL(request.url).searchParams].map(([name, value]) => ({ name, value })),
+        cookies: [],
+        headersSize: -1,
+        bodySize: request.body?.length ?? 0,
+        ...(request.body
+          ? { postData: { mimeType: request.headers["content-type"] ?? "", text: request.body.toString("base64"), encoding: "base64" as const } }
+          : {}),
+      },
+      response: {
+        status: response.status,
+        statusText: "",
+        httpVersion: "HTTP/1.1",
+        headers: responseHeaders,
+        cookies: [],
+        content: { size: response.body.length, mimeType: contentType, text: response.body.toString("base64"), encoding: "base64" },
+        redirectURL: header(responseHeaders, "location"),
+        headersSize: -1,
+        bodySize: response.body.length,
+      },
+      cache: {},
+      timings: { send: 0, wait: timeMs, receive: 0 },
+    });
+  }
+
+  /**
+   * The recorded response for a request. Falls back to ignoring the body,
+   * then the query string, so cache-busting parameters don't cause misses.
+   */
+  match(method: string, url: string, body?: Buffer): RecordedResponse | null {
+    const candidates = [key(method, url, body), key(method, url), key(method, withoutQuery(url))];
+    for (const k of candidates) {
+      const entries = this.index.get(k);
+      if (!entries) continue;
+      const cursor = this.cursors.get(k) ?? 0;
+      const entry = entries[Math.min(cursor, entries.length - 1)];
+      this.cursors.set(k, cursor + 1);
+      return {
+        status: entry.response.status,
+        headers: entry.response.headers,
+        body: Buffer.from(entry.response.content.text, entry.response.content.encoding === "base64" ? "base64" : "utf8"),
+      };
+    }
+    return null;
+  }
+
+  /** Start replaying every request's responses from the first again. */
+  rewind(): void {
+    this.cursors.clear();
+  }
+
+  private insert(entry: HarEntry): void {
+    this.entries.push(entry);
+    const { method, url, postData } = entry.request;
+    const body = postData ? Buffer.from(postData.text, postData.encoding === "base64" ? "base64" : "utf8") : undefined;
+    const keys = new Set([key(method, url, body), key(method, url), key(method, withoutQuery(url))]);
+    for (const k of keys) {
+      const list = this.index.get(k) ?? [];
+      list.push(entry);
+      this.index.set(k, list);
+    }
+  }
+}
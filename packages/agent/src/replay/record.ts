@@ -0,0 +1,60 @@
+import type { BrowserContext } from "playwright-core";
+import type { Recording } from "./har";
+
+// Statuses whose responses can't carry a body
+const NULL_BODY_STATUSES = new Set([101, 204, 205, 304]);
+
+/**
+ * Record every request the context's pages let through to the network.
+ * Requests an adapter's resource policy blocks never reach the recording.
+ * Redirects are recorded as they happen, so replayed pages land on the
+ * same URLs the live ones did.
+ */
+export async function recordContext(context: BrowserContext, recording: Recording): Promise<void> {
+  await context.route("**/*", async (route) => {
+    const request = route.request();
+    const started = Date.now();
+    const response = await route.fetch({ maxRedirects: 0 }).catch(() => null);
+    if (!response) return route.abort();
+
+    const body = await response.body();
+    recording.add(
+      {
+        method: request.method(),
+        url: request.url(),
+        headers: await request.allHeaders(),
+        body: request.postDataBuffer() ?? undefined,
+      },
+      { status: response.status(), headers: response.headersArray(), body },
+      Date.now() - started
+    );
+    await route.fulfill({ response, body });
+  });
+}
+
+/**
+ * A fetch that records what it fetches, for HttpClient-based adapters.
+ */
+export function recordingFetch(recording: Recording, inner: typeof fetch = fetch): typeof fetch {
+  return async (input, init) => {
+    const request = new Request(input, init);
+    const requestBody = init?.body ? Buffer.from(await request.clone().arrayBuffer()) : undefined;
+    const started = Date.now();
+    const res = await inner(request);
+    const body = Buffer.from(await res.arrayBuffer());
+
+    const headers: { name: string; value: string }[] = [];
+    res.headers.forEach((value, name) => headers.push({ name, value }));
+    recording.add(
+      { method: request.method, url: request.url, headers: Object.fromEntries(request.headers), body: requestBody },
+      { status: res.status, headers, body },
+      Date.now() - started
+    );
+
+    return new Response(NULL_BODY_STATUSES.has(res.status) ? null : body, {
+      status: res.status,
+      statusText: res.statusText,
+      headers: res.headers,
+    });
+  };
+}
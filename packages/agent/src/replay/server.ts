@@ -0,0 +1,131 @@
+import { createServer } from "node:http";
+import type { IncomingMessage, Server, ServerResponse } from "node:http";
+import type { AddressInfo } from "node:net";
+import type { BrowserContext } from "playwright-core";
+import type { Recording } from "./har";
+
+export interface ReplayStats {
+  // Every request served, hit or miss
+  requests: number;
+  // Page loads: browser documents, plus every request from replay.fetch
+  pages: number;
+  misses: number;
+  // URLs with no recorded response, for re-recording
+  missed: string[];
+}
+
+// Tells the server what kind of request the browser made
+const TYPE_HEADER = "x-replay-type";
+
+// Describe the original connection, not the one to the replay server
+const HOP_HEADERS = new Set(["host", "connection", "content-length", "accept-encoding", "transfer-encoding"]);
+
+function forwardable(headers: Record<string, string>): Record<string, string> {
+  return Object.fromEntries(
+    Object.entries(headers).filter(([name]) => !name.startsWith(":") && !HOP_HEADERS.has(name.toLowerCase()))
+  );
+}
+
+/**
+ * Serves a Recording over local HTTP, so adapters can be run against
+ * captured portal pages with no network. Browser pages are pointed at it
+ * with replayContext(); HttpClient-based adapters take replay.fetch.
+ */
+export class ReplayServer {
+  private server: Server | null = null;
+  private origin = "";
+  private counts: ReplayStats = { requests: 0, pages: 0, misses: 0, missed: [] };
+
+  constructor(private readonly recording: Recording) {}
+
+  /** Listen on a free local port and return the server's origin. */
+  async start(): Promise<string> {
+    const server = createServer((req, res) => void this.serve(req, res));
+    await new Promise<void>((resolve) => server.listen(0, "127.0.0.1", resolve));
+    this.server = server;
+    this.origin = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+    return this.origin;
+  }
+
+  async close(): Promise<void> {
+    const server = this.server;
+    this.server = null;
+    if (server) await new Promise<void>((resolve) => server.close(() => resolve()));
+  }
+
+  /** Where the replay of a portal URL is served from. */
+  urlFor(url: string): string {
+    if (!this.server) throw new Error("ReplayServer is not started");
+    return `${this.origin}/replay?url=${encodeURIComponent(url)}`;
+  }
+
+  stats(): ReplayStats {
+    return { ...this.counts, missed: [...this.counts.missed] };
+  }
+
+  /** Zero the counters and replay every response from the start again. */
+  reset(): void {
+    this.counts = { requests: 0, pages: 0, misses: 0, missed: [] };
+    this.recording.rewind();
+  }
+
+  /**
+   * Answer every request from the context's pages from this server. Pages
+   * keep seeing the portal's own URLs.
+   */
+  async replayContext(context: BrowserContext): Promise<void> {
+    await context.route("**/*", async (route) => {
+      const request = route.request();
+      const res = await fetch(this.urlFor(request.url()), {
+        method: request.method(),
+        headers: { ...forwardable(await request.allHeaders()), [TYPE_HEADER]: request.resourceType() },
+        body: request.postDataBuffer() ?? undefined,
+        redirect: "manual",
+      });
+
+      const headers: Record<string, string> = {};
+      res.headers.forEach((value, name) => {
+        // Playwright takes repeated headers joined by newlines
+        headers[name] = name in headers ? `${headers[name]}\n${value}` : value;
+      });
+      await route.fulfill({
+        status: res.status,
+        headers,
+        body: Buffer.from(await res.arrayBuffer()),
+      });
+    });
+  }
+
+  /** A fetch answered from the recording, for HttpClient. */
+  fetch: typeof fetch = async (input, init) => {
+    const request = new Request(input, init);
+    return fetch(this.urlFor(request.url), {
+      method: request.method,
+      headers: { ...forwardable(Object.fromEntries(request.headers)), [TYPE_HEADER]: "document" },
+      body: init?.body ? await request.arrayBuffer() : undefined,
+      redirect: "manual",
+    });
+  };
+
+  private async serve(req: IncomingMessage, res: ServerResponse): Promise<void> {
+    const chunks: Buffer[] = [];
+    for await (const chunk of req) chunks.push(chunk as Buffer);
+    const body = chunks.length ? Buffer.concat(chunks) : undefined;
+    const url = new URL(req.url ?? "/", this.origin).searchParams.get("url") ?? "";
+
+    this.counts.requests++;
+    if (req.headers[TYPE_HEADER] === "document") this.counts.pages++;
+
+    const recorded = this.recording.match(req.method ?? "GET", url, body);
+    if (!recorded) {
+      this.counts.misses++;
+      this.counts.missed.push(`${req.method} ${url}`);
+      res.writeHead(404, { "content-type": "text/plain" }).end(`Not recorded: ${req.method} ${url}`);
+      return;
+    }
+
+    const headers: Record<string, string[]> = {};
+    for (const { name, value } of recorded.headers) (headers[name.toLowerCase()] ??= []).push(value);
+    res.writeHead(recorded.status, headers).end(recorded.body);
+  }
+}
@@ -0,0 +1,36 @@
+import type { Cookie } from "playwright-core";
+
+/**
+ * What linkedAccounts.sessionData holds: the portal's cookies as Playwright
+ * reports them.
+ */
+export interface StoredSession {
+  cookies: Cookie[];
+}
+
+/**
+ * Usable cookies from stored session data, dropping any that have expired.
+ * Tolerates null and malformed data from older rows.
+ */
+export function sessionCookies(sessionData: unknown, now = Date.now()): Cookie[] {
+  const cookies = (sessionData as Partial<StoredSession> | null | undefined)?.cookies;
+  if (!Array.isArray(cookies)) return [];
+  // Session cookies have expires -1 and never expire on our side
+  return cookies.filter((c) => c && typeof c.name === "string" && (c.expires <= 0 || c.expires * 1000 > now));
+}
+
+// Expiry only matters to the day: sliding sessions push it forward on
+// every request, and rewriting the row each time would defeat the point
+function fingerprint(cookies: Cookie[]): string {
+  return cookies
+    .map((c) => [c.domain, c.path, c.name, c.value, c.expires > 0 ? Math.floor(c.expires / 86400) : -1].join("\t"))
+    .sort()
+    .join("\n");
+}
+
+/**
+ * Whether a session differs enough from the stored one to be worth saving.
+ */
+export function sessionChanged(previous: unknown, next: StoredSession): boolean {
+  return fingerprint(sessionCookies(previous)) !== fingerprint(next.cookies);
+}
@@ -0,0 +1,200 @@
+import { describe, expect, it } from "vitest";
+import type { Browser } from "playwright-core";
+import { BrowserPool } from "../src/browser-pool";
+
+/**
+ * Just enough of a playwright Browser for the pool: contexts with one page
+ * each, whose navigations and heap size the tests control.
+ */
+class FakeBrowser {
+  contexts: FakeContext[] = [];
+  connected = true;
+  peakOpen = 0;
+  private onDisconnect: (() => void)[] = [];
+
+  get open(): number {
+    return this.contexts.filter((c) => !c.closed).length;
+  }
+
+  isConnected() {
+    return this.connected;
+  }
+
+  on(event: string, listener: () => void) {
+    if (event === "disconnected") this.onDisconnect.push(listener);
+  }
+
+  async newContext() {
+    // Opening a context takes a while, long enough for other acquires to race
+    await new Promise((resolve) => setTimeout(resolve, 5));
+    const context = new FakeContext();
+    this.contexts.push(context);
+    this.peakOpen = Math.max(this.peakOpen, this.open);
+    return context;
+  }
+
+  async close() {
+    this.connected = false;
+    for (const listener of this.onDisconnect) listener();
+  }
+}
+
+class FakeContext {
+  closed = false;
+  page = new FakePage();
+
+  async newPage() {
+    return this.page;
+  }
+
+  async close() {
+    this.closed = true;
+    this.page.closed = true;
+  }
+}
+
+class FakePage {
+  closed = false;
+  heapBytes = 0;
+  private frame = {};
+  private onNavigate: ((frame: unknown) => void)[] = [];
+
+  on(event: string, listener: (frame: unknown) => void) {
+    if (event === "framenavigated") this.onNavigate.push(listener);
+  }
+
+  mainFrame() {
+    return this.frame;
+  }
+
+  isClosed() {
+    return this.closed;
+  }
+
+  async evaluate() {
+    return this.heapBytes;
+  }
+
+  navigate(times = 1) {
+    for (let i = 0; i < times; i++) {
+      for (const listener of this.onNavigate) listener(this.frame);
+    }
+  }
+}
+
+function fakePool(options: Partial<ConstructorParameters<typeof BrowserPool>[0]> = {}) {
+  const browsers: FakeBrowser[] = [];
+  const pool = new BrowserPool({
+    launch: async () => {
+      const browser = new FakeBrowser();
+      browsers.push(browser);
+      return browser as unknown as Browser;
+    },
+    ...options,
+  });
+  return { pool, browsers };
+}
+
+const pageOf = (lease: { page: unknown }) => lease.page as unknown as FakePage;
+
+describe("BrowserPool", () => {
+  it("opens one context for concurrent acquires of the same key", async () => {
+    const { pool, browsers } = fakePool();
+
+    const first = pool.acquire("account:1");
+    const second = pool.acquire("account:1");
+    const lease = await first;
+
+    let secondSettled = false;
+    void second.then(() => (secondSettled = true));
+    await new Promise((resolve) => setTimeout(resolve, 20));
+    expect(secondSettled).toBe(false);
+
+    await lease.release();
+    const next = await second;
+    expect(next.context).toBe(lease.context);
+    expect(browsers).toHaveLength(1);
+    expect(browsers[0].contexts).toHaveLength(1);
+
+    await next.release();
+    await pool.close();
+  });
+
+  it("never opens more contexts than a browser has room for", async () => {
+    const { pool, browsers } = fakePool({ maxBrowsers: 1, maxContextsPerBrowser: 2 });
+
+    const leases = await Promise.all([pool.acquire("a"), pool.acquire("b")]);
+    const third = pool.acquire("c");
+    await new Promise((resolve) => setTimeout(resolve, 20));
+    expect(pool.metrics().leased).toBe(2);
+
+    // Releasing one makes room: its context is evicted for the waiting key
+    await leases[0].release();
+    const lease = await third;
+    expect(lease.key).toBe("c");
+    expect(browsers).toHaveLength(1);
+    expect(browsers[0].peakOpen).toBe(2);
+    expect(browsers[0].open).toBe(2);
+
+    await Promise.all([leases[1].release(), lease.release()]);
+    await pool.close();
+  });
+
+  it("launches no more browsers than allowed under concurrent acquires", async () => {
+    const { pool, browsers } = fakePool({ maxBrowsers: 2, maxContextsPerBrowser: 1 });
+
+    const acquires = ["a", "b", "c", "d"].map((key) => pool.acquire(key));
+    const [a, b] = await Promise.all(acquires.slice(0, 2));
+    expect(browsers).toHaveLength(2);
+
+    await Promise.all([a.release(), b.release()]);
+    const [c, d] = await Promise.all(acquires.slice(2));
+    expect(browsers).toHaveLength(2);
+    expect(browsers.every((browser) => browser.peakOpen === 1)).toBe(true);
+
+    await Promise.all([c.release(), d.release()]);
+    await pool.close();
+  });
+
+  it("reuses a context until it has served maxPagesPerContext navigations", async () => {
+    const { pool } = fakePool({ maxPagesPerContext: 3 });
+
+    let lease = await pool.acquire("portal:austender");
+    const first = lease.context;
+    pageOf(lease).navigate(2);
+    await lease.release();
+
+    lease = await pool.acquire("portal:austender");
+    expect(lease.context).toBe(first);
+    pageOf(lease).navigate();
+    await lease.release();
+
+    lease = await pool.acquire("portal:austender");
+    expect(lease.context).not.toBe(first);
+    expect(pool.metrics().recycled).toBe(1);
+
+    await lease.release();
+    await pool.close();
+  });
+
+  it("recycles a context that is discarded or over its heap limit", async () => {
+    const { pool } = fakePool({ maxHeapBytes: 1000 });
+
+    let lease = await pool.acquire("account:1");
+    const first = lease.context;
+    await lease.release({ discard: true });
+
+    lease = await pool.acquire("account:1");
+    const second = lease.context;
+    expect(second).not.toBe(first);
+    pageOf(lease).heapBytes = 2000;
+    await lease.release();
+
+    lease = await pool.acquire("account:1");
+    expect(lease.context).not.toBe(second);
+    expect(pool.metrics().recycled).toBe(2);
+
+    await lease.release();
+    await pool.close();
+  });
+});
@@ -0,0 +1,152 @@
+import { afterEach, beforeEach, describe, expect, it } from "vitest";
+import { createHash, randomBytes } from "node:crypto";
+import { createServer } from "node:http";
+import type { Server } from "node:http";
+import type { AddressInfo } from "node:net";
+import { mkdtemp, readFile, rm } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import path from "node:path";
+import { streamDocument, uploadIdFor } from "../src/documents/download";
+import { LocalDocumentStorage } from "../src/documents/storage";
+
+const sha256 = (data: Buffer) => createHash("sha256").update(data).digest("hex");
+
+/**
+ * Serves one document with a strong ETag, honouring Range, If-Range and
+ * If-None-Match.
+ * cutAfter makes the next response stop partway through.
+ */
+class DocumentServer {
+  content = randomBytes(256 * 1024);
+  cutAfter: number | null = null;
+  requests: Record<string, string | undefined>[] = [];
+  private server: Server | null = null;
+
+  get etag() {
+    return `"${sha256(this.content).slice(0, 16)}"`;
+  }
+
+  async start(): Promise<string> {
+    const server = createServer((req, res) => {
+      this.requests.push({ range: req.headers.range, ifRange: req.headers["if-range"] as string | undefined });
+      if (req.headers["if-none-match"] === this.etag) {
+        res.writeHead(304, { etag: this.etag });
+        res.end();
+        return;
+      }
+      let start = 0;
+      const range = req.headers.range?.match(/^bytes=(\d+)-$/);
+      if (range && (!req.headers["if-range"] || req.headers["if-range"] === this.etag)) {
+        start = Number(range[1]);
+      }
+      const body = this.content.subarray(start);
+      res.writeHead(start > 0 ? 206 : 200, {
+        etag: this.etag,
+        "content-type": "application/pdf",
+        "content-length": body.length,
+        ...(start > 0 && { "content-range": `bytes ${start}-${this.content.length - 1}/${this.content.length}` }),
+      });
+
+      const cut = this.cutAfter;
+      this.cutAfter = null;
+      if (cut === null) {
+        // In two writes, so concurrent downloads overlap
+        res.write(body.subarray(0, body.length / 2));
+        setTimeout(() => res.end(body.subarray(body.length / 2)), 20);
+        return;
+      }
+      res.write(body.subarray(0, cut));
+      setTimeout(() => res.destroy(), 50);
+    });
+    await new Promise<void>((resolve) => server.listen(0, "127.0.0.1", resolve));
+    this.server = server;
+    return `http://127.0.0.1:${(server.address() as AddressInfo).port}/tender-pack.pdf`;
+  }
+
+  async close(): Promise<void> {
+    await new Promise<void>((resolve) => this.server?.close(() => resolve()) ?? resolve());
+  }
+}
+
+const open = (url: string, headers: Record<string, string>) => fetch(url, { headers });
+const blobPath = (hash: string) => `blobs/${hash}`;
+
+describe("streamDocument", () => {
+  let server: DocumentServer;
+  let url: string;
+  let root: string;
+  let storage: LocalDocumentStorage;
+
+  beforeEach(async () => {
+    server = new DocumentServer();
+    url = await server.start();
+    root = await mkdtemp(path.join(tmpdir(), "tenderwatch-documents-"));
+    storage = new LocalDocumentStorage(root);
+  });
+
+  afterEach(async () => {
+    await server.close();
+    await rm(root, { recursive: true, force: true });
+  });
+
+  it("stores a document under its content hash", async () => {
+    const doc = await streamDocument(open, url, storage, { objectPath: blobPath });
+
+    expect(doc.sha256).toBe(sha256(server.content));
+    expect(doc.bytes).toBe(server.content.length);
+    expect(doc.contentType).toBe("application/pdf");
+    expect(await readFile(path.join(root, doc.objectPath))).toEqual(server.content);
+  });
+
+  it("resumes an interrupted download from the bytes already stored", async () => {
+    server.cutAfter = 100 * 1024;
+    await expect(streamDocument(open, url, storage, { objectPath: blobPath })).rejects.toThrow();
+    const stored = await storage.partialSize(uploadIdFor(url));
+    expect(stored).toBeGreaterThan(0);
+
+    const doc = await streamDocument(open, url, storage, { objectPath: blobPath });
+
+    expect(doc.resumedFrom).toBe(stored);
+    expect(server.requests[1]).toEqual({ range: `bytes=${stored}-`, ifRange: server.etag });
+    expect(doc.sha256).toBe(sha256(server.content));
+    expect(await readFile(path.join(root, doc.objectPath))).toEqual(server.content);
+  });
+
+  it("starts over when the document changed after an interrupted attempt", async () => {
+    server.cutAfter = 100 * 1024;
+    await expect(streamDocument(open, url, storage, { objectPath: blobPath })).rejects.toThrow();
+    expect(await storage.partialSize(uploadIdFor(url))).toBeGreaterThan(0);
+
+    server.content = randomBytes(200 * 1024);
+    const doc = await streamDocument(open, url, storage, { objectPath: blobPath });
+
+    expect(doc.resumedFrom).toBe(0);
+    expect(doc.sha256).toBe(sha256(server.content));
+    expect(await readFile(path.join(root, doc.objectPath))).toEqual(server.content);
+  });
+
+  it("skips the download when the stored copy is still current", async () => {
+    const doc = await streamDocument(open, url, storage, { objectPath: blobPath });
+    expect(doc?.etag).toBe(server.etag);
+
+    expect(await streamDocument(open, url, storage, { objectPath: blobPath, ifChanged: doc! })).toBeNull();
+
+    server.content = randomBytes(200 * 1024);
+    const changed = await streamDocument(open, url, storage, { objectPath: blobPath, ifChanged: doc! });
+    expect(changed?.sha256).toBe(sha256(server.content));
+    expect(changed?.etag).toBe(server.etag);
+  });
+
+  it("keeps concurrent downloads of one URL apart", async () => {
+    const docs = await Promise.all([
+      streamDocument(open, url, storage, { objectPath: "first.pdf" }),
+      streamDocument(open, url, storage, { objectPath: "second.pdf" }),
+    ]);
+
+    for (const doc of docs) {
+      expect(doc.sha256).toBe(sha256(server.content));
+      expect(await readFile(path.join(root, doc.objectPath))).toEqual(server.content);
+    }
+    expect(await storage.partialSize(uploadIdFor(url))).toBe(0);
+  });
+});
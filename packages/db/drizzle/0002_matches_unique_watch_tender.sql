@@ -0,0 +1,23 @@
+-- Deduplicate matches and enforce one row per (watch_id, tender_id)
+-- Retried or re-synced tender processing used to insert the same pair again.
+-- Keep the row the user has interacted with, otherwise the earliest one.
+
+DELETE FROM matches m
+USING (
+  SELECT
+    id,
+    row_number() OVER (
+      PARTITION BY watch_id, tender_id
+      ORDER BY
+        (user_feedback IS NOT NULL) DESC,
+        COALESCE(is_saved, false) DESC,
+        (notified_at IS NOT NULL) DESC,
+        created_at ASC,
+        id ASC
+    ) AS rn
+  FROM matches
+) ranked
+WHERE m.id = ranked.id
+  AND ranked.rn > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS matches_watch_tender_idx ON matches (watch_id, tender_id);
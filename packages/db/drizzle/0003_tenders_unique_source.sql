@@ -0,0 +1,51 @@
+-- Deduplicate tenders on (source, source_id) and add a content hash column
+-- Each linked account's sync used to insert its own copy of a public tender.
+-- Duplicates are folded into the earliest row and their matches re-pointed.
+
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE TEMP TABLE tender_dupes AS
+SELECT id, keep_id
+FROM (
+  SELECT
+    id,
+    first_value(id) OVER (PARTITION BY source, source_id ORDER BY created_at ASC, id ASC) AS keep_id
+  FROM tenders
+) ranked
+WHERE id <> keep_id;
+
+-- Drop matches that would collide on (watch_id, tender_id) once re-pointed,
+-- keeping one that was already notified (so the pair isn't alerted again),
+-- then the kept tender's match, then one the user has interacted with
+DELETE FROM matches m
+USING (
+  SELECT
+    m2.id,
+    row_number() OVER (
+      PARTITION BY m2.watch_id, COALESCE(d.keep_id, m2.tender_id)
+      ORDER BY
+        (m2.notified_at IS NOT NULL) DESC,
+        (d.id IS NULL) DESC,
+        (m2.user_feedback IS NOT NULL) DESC,
+        COALESCE(m2.is_saved, false) DESC,
+        m2.created_at ASC,
+        m2.id ASC
+    ) AS rn
+  FROM matches m2
+  LEFT JOIN tender_dupes d ON d.id = m2.tender_id
+) ranked
+WHERE m.id = ranked.id
+  AND ranked.rn > 1;
+
+UPDATE matches m
+SET tender_id = d.keep_id
+FROM tender_dupes d
+WHERE m.tender_id = d.id;
+
+DELETE FROM tenders t
+USING tender_dupes d
+WHERE t.id = d.id;
+
+DROP TABLE tender_dupes;
+
+CREATE UNIQUE INDEX IF NOT EXISTS tenders_source_source_id_idx ON tenders (source, source_id);
@@ -0,0 +1,9 @@
+-- Per-portal search watermark so syncs only page through new listings
+
+CREATE TABLE IF NOT EXISTS portal_sync_state (
+  site site PRIMARY KEY,
+  watermark JSONB,
+  last_crawl_at TIMESTAMP,
+  created_at TIMESTAMP DEFAULT now() NOT NULL,
+  updated_at TIMESTAMP DEFAULT now() NOT NULL
+);
@@ -0,0 +1,58 @@
+-- Content-addressed document store: each distinct file (by SHA-256) is
+-- stored once and linked to every tender that lists it.
+
+DO $$ BEGIN
+  CREATE TYPE document_status AS ENUM ('pending', 'stored', 'failed');
+EXCEPTION
+  WHEN duplicate_object THEN null;
+END $$;
+
+CREATE TABLE IF NOT EXISTS document_blobs (
+  sha256 TEXT PRIMARY KEY,
+  bytes INTEGER NOT NULL,
+  content_type TEXT,
+  storage_path TEXT NOT NULL,
+  ref_count INTEGER DEFAULT 0 NOT NULL,
+  unreferenced_at TIMESTAMP DEFAULT now(),
+  created_at TIMESTAMP DEFAULT now() NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tender_documents (
+  id TEXT PRIMARY KEY,
+  tender_id TEXT NOT NULL REFERENCES tenders(id) ON DELETE CASCADE,
+  url TEXT NOT NULL,
+  blob_sha256 TEXT REFERENCES document_blobs(sha256),
+  status document_status DEFAULT 'pending' NOT NULL,
+  last_error TEXT,
+  created_at TIMESTAMP DEFAULT now() NOT NULL,
+  updated_at TIMESTAMP DEFAULT now() NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS tender_documents_tender_url_idx ON tender_documents (tender_id, url);
+CREATE INDEX IF NOT EXISTS tender_documents_url_idx ON tender_documents (url);
+CREATE INDEX IF NOT EXISTS tender_documents_blob_idx ON tender_documents (blob_sha256);
+
+-- Keep document_blobs.ref_count in step with the links pointing at it,
+-- including rows removed by ON DELETE CASCADE from tenders
+CREATE OR REPLACE FUNCTION tender_documents_blob_refs() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.blob_sha256 IS NOT NULL THEN
+    UPDATE document_blobs
+    SET ref_count = ref_count - 1,
+        unreferenced_at = CASE WHEN ref_count = 1 THEN now() ELSE unreferenced_at END
+    WHERE sha256 = OLD.blob_sha256;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.blob_sha256 IS NOT NULL THEN
+    UPDATE document_blobs
+    SET ref_count = ref_count + 1,
+        unreferenced_at = NULL
+    WHERE sha256 = NEW.blob_sha256;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tender_documents_blob_refs ON tender_documents;
+CREATE TRIGGER tender_documents_blob_refs
+AFTER INSERT OR DELETE OR UPDATE OF blob_sha256 ON tender_documents
+FOR EACH ROW EXECUTE FUNCTION tender_documents_blob_refs();
@@ -0,0 +1,7 @@
+-- Cache extracted document text per blob, so a file shared by many tenders
+-- is parsed once
+
+ALTER TABLE document_blobs ADD COLUMN IF NOT EXISTS extracted_text TEXT;
+ALTER TABLE document_blobs ADD COLUMN IF NOT EXISTS extracted_pages INTEGER;
+ALTER TABLE document_blobs ADD COLUMN IF NOT EXISTS extraction_error TEXT;
+ALTER TABLE document_blobs ADD COLUMN IF NOT EXISTS extracted_at TIMESTAMP;
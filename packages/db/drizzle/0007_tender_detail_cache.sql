@@ -0,0 +1,13 @@
+-- Validators and hashes of each tender's detail page, so re-syncs can skip
+-- pages that haven't changed
+
+CREATE TABLE IF NOT EXISTS tender_detail_cache (
+  source site NOT NULL,
+  source_id TEXT NOT NULL,
+  etag TEXT,
+  last_modified TEXT,
+  page_hash TEXT,
+  detail_hash TEXT NOT NULL,
+  checked_at TIMESTAMP DEFAULT now() NOT NULL,
+  PRIMARY KEY (source, source_id)
+);
@@ -0,0 +1,16 @@
+-- Per-field hashes of each tender's scraped content, and a history of
+-- amendments, so a re-sync only reprocesses what actually changed
+
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS field_hashes JSONB;
+
+CREATE TABLE IF NOT EXISTS tender_revisions (
+  id TEXT PRIMARY KEY,
+  tender_id TEXT NOT NULL REFERENCES tenders(id) ON DELETE CASCADE,
+  changed_fields JSONB NOT NULL,
+  previous JSONB NOT NULL,
+  previous_hashes JSONB,
+  field_hashes JSONB NOT NULL,
+  created_at TIMESTAMP DEFAULT now() NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS tender_revisions_tender_idx ON tender_revisions (tender_id, created_at);
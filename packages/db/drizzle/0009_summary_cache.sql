@@ -0,0 +1,13 @@
+-- Cache of generated LLM summaries, keyed by a hash of the prompt and model
+
+CREATE TABLE IF NOT EXISTS summary_cache (
+  key TEXT PRIMARY KEY,
+  tender_id TEXT REFERENCES tenders(id) ON DELETE CASCADE,
+  detail_level TEXT NOT NULL,
+  model TEXT NOT NULL,
+  summary TEXT NOT NULL,
+  expires_at TIMESTAMP,
+  created_at TIMESTAMP DEFAULT now() NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS summary_cache_tender_idx ON summary_cache (tender_id);
@@ -0,0 +1,4 @@
+-- Superseded by the content-addressed store (tender_documents and
+-- document_blobs); nothing ever wrote it
+
+ALTER TABLE tenders DROP COLUMN IF EXISTS documents_storage_path;
@@ -0,0 +1,5 @@
+-- Validators each stored document URL was served with, so a URL is reused
+-- only after a conditional request shows it hasn't changed
+
+ALTER TABLE tender_documents ADD COLUMN IF NOT EXISTS etag TEXT;
+ALTER TABLE tender_documents ADD COLUMN IF NOT EXISTS last_modified TEXT;
@@ -7,8 +7,13 @@ import * as tenders from "./schema/tenders";
 import * as matches from "./schema/matches";
 import * as usage from "./schema/usage";
 import * as audit from "./schema/audit";
+import * as portalSyncState from "./schema/portal-sync-state";
+import * as documents from "./schema/documents";
+import * as tenderDetailCache from "./schema/tender-detail-cache";
+import * as tenderRevisions from "./schema/tender-revisions";
+import * as summaryCache from "./schema/summary-cache";
 
-const schema = { ...users, ...watches, ...linkedAccounts, ...tenders, ...matches, ...usage, ...audit };
+const schema = { ...users, ...watches, ...linkedAccounts, ...tenders, ...matches, ...usage, ...audit, ...portalSyncState, ...documents, ...tenderDetailCache, ...tenderRevisions, ...summaryCache };
 
 const connectionString = process.env.DATABASE_URL!;
 const client = postgres(connectionString);
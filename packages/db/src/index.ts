@@ -5,5 +5,41 @@ export * from "./schema/tenders";
 export * from "./schema/matches";
 export * from "./schema/usage";
 export * from "./schema/audit";
+export * from "./schema/portal-sync-state";
+export * from "./schema/documents";
+export * from "./schema/tender-detail-cache";
+export * from "./schema/tender-revisions";
+export * from "./schema/summary-cache";
 
 export { db } from "./client";
+
+export { upsertMatches, matchedWatchIds, renotifyMatches, deleteMatches } from "./queries/matches";
+export type { UpsertedMatch } from "./queries/matches";
+export {
+  ingestTenders,
+  tenderContentHash,
+  tenderFieldHashes,
+  changedTenderFields,
+  resetTenderSummaries,
+  TENDER_FIELDS
+} from "./queries/tenders";
+export type { IngestedTender, TenderField } from "./queries/tenders";
+export {
+  registerTenderDocuments,
+  storedBlobsForUrls,
+  linkDocumentsToBlob,
+  linkDocumentsToStoredBlob,
+  markDocumentsFailed,
+  deleteUnreferencedBlobs,
+  blobsAwaitingExtraction,
+  saveBlobExtraction,
+  refreshTenderFullText
+} from "./queries/documents";
+export type { StoredUrlBlob } from "./queries/documents";
+export { loadDetailCache, saveDetailCache } from "./queries/detail-cache";
+export {
+  loadCachedSummary,
+  saveCachedSummary,
+  deleteCachedSummaries,
+  deleteExpiredSummaries
+} from "./queries/summaries";
@@ -0,0 +1,37 @@
+import { and, eq, inArray, sql } from "drizzle-orm";
+import { db } from "../client";
+import { tenderDetailCache } from "../schema/tender-detail-cache";
+import type { NewTenderDetailCacheEntry, TenderDetailCacheEntry } from "../schema/tender-detail-cache";
+
+type Site = NewTenderDetailCacheEntry["source"];
+
+// Keeps each INSERT well under Postgres' 65535 bind parameter limit
+const SAVE_CHUNK_SIZE = 1000;
+
+/** Cached detail pages of these tenders, by sourceId. */
+export async function loadDetailCache(site: Site, sourceIds: string[]): Promise<Map<string, TenderDetailCacheEntry>> {
+  if (sourceIds.length === 0) return new Map();
+  const rows = await db
+    .select()
+    .from(tenderDetailCache)
+    .where(and(eq(tenderDetailCache.source, site), inArray(tenderDetailCache.sourceId, sourceIds)));
+  return new Map(rows.map((row) => [row.sourceId, row]));
+}
+
+export async function saveDetailCache(entries: NewTenderDetailCacheEntry[]): Promise<void> {
+  for (let i = 0; i < entries.length; i += SAVE_CHUNK_SIZE) {
+    await db
+      .insert(tenderDetailCache)
+      .values(entries.slice(i, i + SAVE_CHUNK_SIZE))
+      .onConflictDoUpdate({
+        target: [tenderDetailCache.source, tenderDetailCache.sourceId],
+        set: {
+          etag: sql`excluded.etag`,
+          lastModified: sql`excluded.last_modified`,
+          pageHash: sql`excluded.page_hash`,
+          detailHash: sql`excluded.detail_hash`,
+          checkedAt: sql`now()`
+        }
+      });
+  }
+}
@@ -0,0 +1,203 @@
+import { and, desc, eq, inArray, isNotNull, isNull, lt, notInArray, sql } from "drizzle-orm";
+import { db } from "../client";
+import { documentBlobs, tenderDocuments } from "../schema/documents";
+import type { DocumentBlob, NewDocumentBlob, TenderDocument } from "../schema/documents";
+
+// Keeps each INSERT well under Postgres' 65535 bind parameter limit
+const REGISTER_CHUNK_SIZE = 1000;
+
+/**
+ * Record the document URLs each tender lists and return the ones not yet
+ * stored. URLs already registered for a tender are left as they are; URLs
+ * an amendment removed are unlinked, which releases their blobs for
+ * garbage collection.
+ */
+export async function registerTenderDocuments(
+  tenders: { id: string; documentUrls: string[] | null }[]
+): Promise<TenderDocument[]> {
+  const values = tenders.flatMap((t) => [...new Set(t.documentUrls ?? [])].map((url) => ({ tenderId: t.id, url })));
+
+  await db.transaction(async (tx) => {
+    for (const tender of tenders) {
+      const urls = [...new Set(tender.documentUrls ?? [])];
+      // The tender_documents trigger drops the unlinked blobs' ref counts
+      await tx
+        .delete(tenderDocuments)
+        .where(and(
+          eq(tenderDocuments.tenderId, tender.id),
+          urls.length > 0 ? notInArray(tenderDocuments.url, urls) : undefined
+        ));
+    }
+    for (let i = 0; i < values.length; i += REGISTER_CHUNK_SIZE) {
+      await tx
+        .insert(tenderDocuments)
+        .values(values.slice(i, i + REGISTER_CHUNK_SIZE))
+        .onConflictDoNothing({ target: [tenderDocuments.tenderId, tenderDocuments.url] });
+    }
+  });
+
+  if (tenders.length === 0) return [];
+  return db
+    .select()
+    .from(tenderDocuments)
+    .where(and(
+      inArray(tenderDocuments.tenderId, tenders.map((t) => t.id)),
+      eq(tenderDocuments.status, "pending")
+    ));
+}
+
+type DocumentValidators = Pick<TenderDocument, "etag" | "lastModified">;
+
+export interface StoredUrlBlob extends DocumentValidators {
+  sha256: string;
+}
+
+/**
+ * The blob most recently stored for each of these URLs, by any tender, with
+ * the validators it was served with. The URL may have changed since, so a
+ * caller reuses the blob only once the server confirms it hasn't.
+ */
+export async function storedBlobsForUrls(urls: string[]): Promise<Map<string, StoredUrlBlob>> {
+  if (urls.length === 0) return new Map();
+  const rows = await db
+    .selectDistinctOn([tenderDocuments.url], {
+      url: tenderDocuments.url,
+      sha256: tenderDocuments.blobSha256,
+      etag: tenderDocuments.etag,
+      lastModified: tenderDocuments.lastModified,
+    })
+    .from(tenderDocuments)
+    .where(and(inArray(tenderDocuments.url, urls), isNotNull(tenderDocuments.blobSha256)))
+    .orderBy(tenderDocuments.url, desc(tenderDocuments.updatedAt));
+  return new Map(rows.map(({ url, sha256, etag, lastModified }) => [url, { sha256: sha256!, etag, lastModified }]));
+}
+
+/**
+ * Point documents at a blob, creating the blob row if this content is new.
+ * Reference counts are kept by the tender_documents trigger.
+ */
+export async function linkDocumentsToBlob(
+  documentIds: string[],
+  blob: NewDocumentBlob,
+  validators: DocumentValidators
+): Promise<void> {
+  if (documentIds.length === 0) return;
+  await db.transaction(async (tx) => {
+    await tx.insert(documentBlobs).values(blob).onConflictDoNothing({ target: documentBlobs.sha256 });
+    await tx
+      .update(tenderDocuments)
+      .set({ blobSha256: blob.sha256, ...validators, status: "stored", lastError: null, updatedAt: new Date() })
+      .where(inArray(tenderDocuments.id, documentIds));
+  });
+}
+
+/** Point documents at a blob that is known to exist. */
+export async function linkDocumentsToStoredBlob(documentIds: string[], stored: StoredUrlBlob): Promise<void> {
+  if (documentIds.length === 0) return;
+  await db
+    .update(tenderDocuments)
+    .set({
+      blobSha256: stored.sha256,
+      etag: stored.etag,
+      lastModified: stored.lastModified,
+      status: "stored",
+      lastError: null,
+      updatedAt: new Date(),
+    })
+    .where(inArray(tenderDocuments.id, documentIds));
+}
+
+export async function markDocumentsFailed(documentIds: string[], error: string): Promise<void> {
+  if (documentIds.length === 0) return;
+  await db
+    .update(tenderDocuments)
+    .set({ status: "failed", lastError: error, updatedAt: new Date() })
+    .where(inArray(tenderDocuments.id, documentIds));
+}
+
+/**
+ * Delete blob rows nothing has referenced since `before` and return them,
+ * so the caller can remove their files. A blob that gets linked again while
+ * this runs keeps its row (ref_count is re-checked under the row lock).
+ */
+export async function deleteUnreferencedBlobs(before: Date, limit = 500): Promise<DocumentBlob[]> {
+  const candidates = db
+    .select({ sha256: documentBlobs.sha256 })
+    .from(documentBlobs)
+    .where(and(eq(documentBlobs.refCount, 0), lt(documentBlobs.unreferencedAt, before)))
+    .limit(limit);
+
+  return db
+    .delete(documentBlobs)
+    .where(and(
+      inArray(documentBlobs.sha256, candidates),
+      eq(documentBlobs.refCount, 0),
+      sql`NOT EXISTS (SELECT 1 FROM tender_documents WHERE blob_sha256 = ${documentBlobs.sha256})`
+    ))
+    .returning();
+}
+
+// Documents beyond this are left out of a tender's fullText
+const MAX_FULL_TEXT_CHARS = 1_000_000;
+
+/**
+ * Stored blobs linked to these tenders whose text hasn't been extracted
+ * yet, one row per tender linking each blob.
+ */
+export async function blobsAwaitingExtraction(tenderIds: string[]) {
+  if (tenderIds.length === 0) return [];
+  return db
+    .selectDistinct({
+      tenderId: tenderDocuments.tenderId,
+      sha256: documentBlobs.sha256,
+      bytes: documentBlobs.bytes,
+      contentType: documentBlobs.contentType,
+      storagePath: documentBlobs.storagePath,
+    })
+    .from(documentBlobs)
+    .innerJoin(tenderDocuments, eq(tenderDocuments.blobSha256, documentBlobs.sha256))
+    .where(and(inArray(tenderDocuments.tenderId, tenderIds), isNull(documentBlobs.extractedAt)));
+}
+
+/**
+ * Cache a blob's extracted text, or why there is none, so no tender
+ * linking the same file parses it again.
+ */
+export async function saveBlobExtraction(
+  sha256: string,
+  result: { text: string; pages: number } | { error: string }
+): Promise<void> {
+  await db
+    .update(documentBlobs)
+    .set("error" in result
+      ? { extractionError: result.error, extractedAt: new Date() }
+      : { extractedText: result.text, extractedPages: result.pages, extractionError: null, extractedAt: new Date() })
+    .where(eq(documentBlobs.sha256, sha256));
+}
+
+/**
+ * Rebuild fullText for these tenders from the extracted text of their
+ * documents, in the order the portal listed them. Tenders with no
+ * extracted documents yet keep whatever fullText they had. Returns the ids
+ * of tenders whose fullText changed.
+ */
+export async function refreshTenderFullText(tenderIds: string[]): Promise<string[]> {
+  if (tenderIds.length === 0) return [];
+  const rows = await db.execute(sql`
+    UPDATE tenders
+    SET full_text = docs.text, updated_at = now()
+    FROM (
+      SELECT tender_documents.tender_id,
+        left(string_agg(document_blobs.extracted_text, E'\\n\\n' ORDER BY tender_documents.created_at, tender_documents.id), ${MAX_FULL_TEXT_CHARS}) AS text
+      FROM tender_documents
+      JOIN document_blobs ON document_blobs.sha256 = tender_documents.blob_sha256
+      WHERE ${inArray(tenderDocuments.tenderId, tenderIds)}
+        AND document_blobs.extracted_text <> ''
+      GROUP BY tender_documents.tender_id
+    ) AS docs
+    WHERE tenders.id = docs.tender_id
+      AND tenders.full_text IS DISTINCT FROM docs.text
+    RETURNING tenders.id
+  `);
+  return rows.map((row) => row.id as string);
+}
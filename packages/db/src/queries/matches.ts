@@ -0,0 +1,116 @@
+import { and, inArray, isNotNull, sql } from "drizzle-orm";
+import { db } from "../client";
+import { matches } from "../schema/matches";
+import type { NewMatch } from "../schema/matches";
+
+// Keeps each INSERT well under Postgres' 65535 bind parameter limit
+const UPSERT_CHUNK_SIZE = 1000;
+
+export interface UpsertedMatch {
+  id: string;
+  watchId: string;
+  tenderId: string;
+  inserted: boolean;
+}
+
+/**
+ * Bulk insert matches, updating the scoring of any (watch, tender) pair that
+ * already exists. Safe to repeat: retries and re-syncs never duplicate rows,
+ * and user feedback, saved/hidden flags and notifiedAt are left untouched.
+ */
+export async function upsertMatches(values: NewMatch[]): Promise<UpsertedMatch[]> {
+  const upserted: UpsertedMatch[] = [];
+
+  for (let i = 0; i < values.length; i += UPSERT_CHUNK_SIZE) {
+    const rows = await db
+      .insert(matches)
+      .values(values.slice(i, i + UPSERT_CHUNK_SIZE))
+      .onConflictDoUpdate({
+        target: [matches.watchId, matches.tenderId],
+        set: {
+          score: sql`excluded.score`,
+          tier: sql`excluded.tier`,
+          matchedKeywords: sql`excluded.matched_keywords`,
+          llmReasoning: sql`excluded.llm_reasoning`
+        }
+      })
+      .returning({
+        id: matches.id,
+        watchId: matches.watchId,
+        tenderId: matches.tenderId,
+        // xmax is 0 for freshly inserted rows and set for updated ones
+        inserted: sql<boolean>`(xmax = 0)`
+      });
+    upserted.push(...rows);
+  }
+
+  return upserted;
+}
+
+/** Watches each of these tenders is already matched to. */
+export async function matchedWatchIds(tenderIds: string[]): Promise<Map<string, string[]>> {
+  const byTender = new Map<string, string[]>();
+  if (tenderIds.length === 0) return byTender;
+  const rows = await db
+    .select({ tenderId: matches.tenderId, watchId: matches.watchId })
+    .from(matches)
+    .where(inArray(matches.tenderId, tenderIds));
+  for (const row of rows) {
+    const ids = byTender.get(row.tenderId) ?? [];
+    ids.push(row.watchId);
+    byTender.set(row.tenderId, ids);
+  }
+  return byTender;
+}
+
+/**
+ * Mark already notified matches as unnotified, so the next digest tells
+ * their watchers the tender was amended. Returns how many were reset.
+ */
+export async function renotifyMatches(pairs: { watchId: string; tenderId: string }[]): Promise<number> {
+  let reset = 0;
+  for (let i = 0; i < pairs.length; i += UPSERT_CHUNK_SIZE) {
+    const chunk = pairs.slice(i, i + UPSERT_CHUNK_SIZE);
+    const rows = await db
+      .update(matches)
+      .set({ notifiedAt: null })
+      .where(
+        and(
+          isNotNull(matches.notifiedAt),
+          sql`(${matches.watchId}, ${matches.tenderId}) IN (${sql.join(
+            chunk.map((p) => sql`(${p.watchId}, ${p.tenderId})`),
+            sql`, `
+          )})`
+        )
+      )
+      .returning({ id: matches.id });
+    reset += rows.length;
+  }
+  return reset;
+}
+
+/**
+ * Delete matches whose tender no longer passes the watch's filters, so they
+ * drop out of digests and the dashboard. Matches the user saved are kept.
+ * Returns how many were deleted.
+ */
+export async function deleteMatches(pairs: { watchId: string; tenderId: string }[]): Promise<number> {
+  let deleted = 0;
+  for (let i = 0; i < pairs.length; i += UPSERT_CHUNK_SIZE) {
+    const chunk = pairs.slice(i, i + UPSERT_CHUNK_SIZE);
+    const rows = await db
+      .delete(matches)
+      .where(
+        and(
+          sql`${matches.isSaved} IS NOT TRUE`,
+          sql`(${matches.watchId}, ${matches.tenderId}) IN (${sql.join(
+            chunk.map((p) => sql`(${p.watchId}, ${p.tenderId})`),
+            sql`, `
+          )})`
+        )
+      )
+      .returning({ id: matches.id });
+    deleted += rows.length;
+  }
+  return deleted;
+}
@@ -0,0 +1,43 @@
+import { and, eq, gt, inArray, isNull, or, sql } from "drizzle-orm";
+import { db } from "../client";
+import { summaryCache } from "../schema/summary-cache";
+import type { NewSummaryCacheEntry, SummaryCacheEntry } from "../schema/summary-cache";
+
+/** A cached summary by key, unless it has expired. */
+export async function loadCachedSummary(key: string): Promise<SummaryCacheEntry | null> {
+  const [row] = await db
+    .select()
+    .from(summaryCache)
+    .where(and(eq(summaryCache.key, key), or(isNull(summaryCache.expiresAt), gt(summaryCache.expiresAt, new Date()))))
+    .limit(1);
+  return row ?? null;
+}
+
+export async function saveCachedSummary(entry: NewSummaryCacheEntry): Promise<void> {
+  await db
+    .insert(summaryCache)
+    .values(entry)
+    .onConflictDoUpdate({
+      target: summaryCache.key,
+      set: {
+        tenderId: sql`excluded.tender_id`,
+        summary: sql`excluded.summary`,
+        expiresAt: sql`excluded.expires_at`,
+        createdAt: sql`now()`
+      }
+    });
+}
+
+export async function deleteCachedSummaries(tenderIds: string[]): Promise<void> {
+  if (tenderIds.length === 0) return;
+  await db.delete(summaryCache).where(inArray(summaryCache.tenderId, tenderIds));
+}
+
+/** Remove expired summaries. Returns how many were removed. */
+export async function deleteExpiredSummaries(): Promise<number> {
+  const rows = await db
+    .delete(summaryCache)
+    .where(sql`${summaryCache.expiresAt} <= now()`)
+    .returning({ key: summaryCache.key });
+  return rows.length;
+}
@@ -0,0 +1,219 @@
+import { createHash } from "crypto";
+import { and, inArray, sql } from "drizzle-orm";
+import { db } from "../client";
+import { tenders } from "../schema/tenders";
+import type { NewTender } from "../schema/tenders";
+import { tenderRevisions } from "../schema/tender-revisions";
+import type { NewTenderRevision } from "../schema/tender-revisions";
+import { matches } from "../schema/matches";
+import { deleteCachedSummaries } from "./summaries";
+
+// Keeps each INSERT well under Postgres' 65535 bind parameter limit
+const INGEST_CHUNK_SIZE = 500;
+
+// The scraped fields of a tender, in content hash order
+export const TENDER_FIELDS = [
+  "sourceUrl", "title", "description", "fullText", "buyerOrg", "regions", "categories", "tenderType",
+  "valueLow", "valueHigh", "valueIsEstimated", "publishedAt", "closesAt", "briefingAt",
+  "certificationsRequired", "documentUrls"
+] as const;
+
+export type TenderField = typeof TENDER_FIELDS[number];
+
+export interface IngestedTender {
+  id: string;
+  sourceId: string;
+  inserted: boolean;
+  // Fields that differ from the stored tender; empty for new tenders
+  changedFields: TenderField[];
+}
+
+function scrapedContent(tender: NewTender): Record<TenderField, unknown> {
+  return {
+    sourceUrl: tender.sourceUrl,
+    title: tender.title,
+    description: tender.description ?? null,
+    fullText: tender.fullText ?? null,
+    buyerOrg: tender.buyerOrg ?? null,
+    regions: tender.regions ?? [],
+    categories: tender.categories ?? [],
+    tenderType: tender.tenderType ?? null,
+    valueLow: tender.valueLow ?? null,
+    valueHigh: tender.valueHigh ?? null,
+    valueIsEstimated: tender.valueIsEstimated ?? false,
+    publishedAt: tender.publishedAt?.toISOString() ?? null,
+    closesAt: tender.closesAt?.toISOString() ?? null,
+    briefingAt: tender.briefingAt?.toISOString() ?? null,
+    certificationsRequired: tender.certificationsRequired ?? [],
+    documentUrls: tender.documentUrls ?? []
+  };
+}
+
+function sha256(value: unknown): string {
+  return createHash("sha256").update(JSON.stringify(value)).digest("hex");
+}
+
+/**
+ * SHA-256 over the scraped fields of a tender. AI output, storage paths and
+ * timestamps are excluded so they never make a tender look changed.
+ */
+export function tenderContentHash(tender: NewTender): string {
+  return sha256(scrapedContent(tender));
+}
+
+/** SHA-256 of each scraped field of a tender. */
+export function tenderFieldHashes(tender: NewTender): Record<TenderField, string> {
+  const content = scrapedContent(tender);
+  return Object.fromEntries(TENDER_FIELDS.map((field) => [field, sha256(content[field])])) as Record<TenderField, string>;
+}
+
+/**
+ * Fields whose hashes differ. Tenders stored before field hashes were kept
+ * have none, and count as changed in every field.
+ */
+export function changedTenderFields(
+  previous: Record<string, string> | null | undefined,
+  next: Record<string, string>
+): TenderField[] {
+  return TENDER_FIELDS.filter((field) => !previous || previous[field] !== next[field]);
+}
+
+/**
+ * Bulk upsert scraped tenders on (source, source_id). Returns only tenders
+ * that are new or whose content hash changed, with the fields that changed;
+ * unchanged rows are not rewritten and not returned, so callers can queue
+ * exactly the work those changes need. Every amendment is recorded in
+ * tender_revisions.
+ */
+export async function ingestTenders(details: NewTender[]): Promise<IngestedTender[]> {
+  // A batch can list the same tender twice; Postgres rejects that in one upsert
+  const unique = new Map<string, NewTender>();
+  for (const tender of details) {
+    unique.set(`${tender.source}:${tender.sourceId}`, {
+      ...tender,
+      contentHash: tenderContentHash(tender),
+      fieldHashes: tenderFieldHashes(tender)
+    });
+  }
+  const values = [...unique.values()];
+  const ingested: IngestedTender[] = [];
+
+  for (let i = 0; i < values.length; i += INGEST_CHUNK_SIZE) {
+    const chunk = values.slice(i, i + INGEST_CHUNK_SIZE);
+
+    // The stored fields and the amendments recorded against them must move together
+    await db.transaction(async (tx) => {
+      // Serialise with concurrent ingests of the same tenders, so the rows
+      // read below are still current when the upsert overwrites them. An
+      // advisory lock also covers tenders not stored yet, which FOR UPDATE
+      // can't lock. Sorted, so two syncs never wait on each other's locks.
+      const keys = [...new Set(chunk.map((t) => `${t.source}:${t.sourceId}`))].sort();
+      await tx.execute(sql`
+        SELECT pg_advisory_xact_lock(hashtext(key))
+        FROM (SELECT key FROM (VALUES ${sql.join(keys.map((key) => sql`(${key})`), sql`, `)}) AS v(key) ORDER BY key) AS sorted
+      `);
+
+      // What the stored tenders looked like, for the revision history.
+      // Full text is left out: it can be large and only its hash is kept.
+      const previousRows = await tx
+        .select({
+          source: tenders.source,
+          sourceId: tenders.sourceId,
+          fieldHashes: tenders.fieldHashes,
+          ...Object.fromEntries(
+            TENDER_FIELDS.filter((field) => field !== "fullText").map((field) => [field, tenders[field]])
+          )
+        })
+        .from(tenders)
+        .where(
+          and(
+            inArray(tenders.source, [...new Set(chunk.map((t) => t.source))]),
+            inArray(tenders.sourceId, chunk.map((t) => t.sourceId))
+          )
+        );
+      const previousByKey = new Map(previousRows.map((row) => [`${row.source}:${row.sourceId}`, row as Record<string, unknown>]));
+
+      const rows = await tx
+        .insert(tenders)
+        .values(chunk)
+        .onConflictDoUpdate({
+          target: [tenders.source, tenders.sourceId],
+          set: {
+            sourceUrl: sql`excluded.source_url`,
+            title: sql`excluded.title`,
+            description: sql`excluded.description`,
+            // Keep text extracted from documents when the listing has none
+            fullText: sql`COALESCE(excluded.full_text, ${tenders.fullText})`,
+            buyerOrg: sql`excluded.buyer_org`,
+            regions: sql`excluded.regions`,
+            categories: sql`excluded.categories`,
+            tenderType: sql`excluded.tender_type`,
+            valueLow: sql`excluded.value_low`,
+            valueHigh: sql`excluded.value_high`,
+            valueIsEstimated: sql`excluded.value_is_estimated`,
+            publishedAt: sql`excluded.published_at`,
+            closesAt: sql`excluded.closes_at`,
+            briefingAt: sql`excluded.briefing_at`,
+            certificationsRequired: sql`excluded.certifications_required`,
+            documentUrls: sql`excluded.document_urls`,
+            contentHash: sql`excluded.content_hash`,
+            fieldHashes: sql`excluded.field_hashes`,
+            updatedAt: sql`now()`
+          },
+          where: sql`${tenders.contentHash} IS DISTINCT FROM excluded.content_hash`
+        })
+        .returning({
+          id: tenders.id,
+          source: tenders.source,
+          sourceId: tenders.sourceId,
+          fieldHashes: tenders.fieldHashes,
+          // xmax is 0 for freshly inserted rows and set for updated ones
+          inserted: sql<boolean>`(xmax = 0)`
+        });
+
+      const revisions: NewTenderRevision[] = [];
+      for (const row of rows) {
+        if (row.inserted) {
+          ingested.push({ id: row.id, sourceId: row.sourceId, inserted: true, changedFields: [] });
+          continue;
+        }
+        const previous = previousByKey.get(`${row.source}:${row.sourceId}`);
+        const previousHashes = (previous?.fieldHashes ?? null) as Record<string, string> | null;
+        const changedFields = changedTenderFields(previousHashes, row.fieldHashes ?? {});
+        ingested.push({ id: row.id, sourceId: row.sourceId, inserted: false, changedFields });
+        revisions.push({
+          tenderId: row.id,
+          changedFields,
+          previous: Object.fromEntries(
+            changedFields.filter((field) => field !== "fullText").map((field) => [field, previous?.[field] ?? null])
+          ),
+          previousHashes,
+          fieldHashes: row.fieldHashes ?? {}
+        });
+      }
+      if (revisions.length > 0) {
+        await tx.insert(tenderRevisions).values(revisions);
+      }
+    });
+  }
+
+  return ingested;
+}
+
+/**
+ * Forget the AI summaries of tenders whose text changed, including the
+ * personalised ones on their matches and cached ones, so they are generated
+ * afresh.
+ */
+export async function resetTenderSummaries(tenderIds: string[]): Promise<void> {
+  if (tenderIds.length === 0) return;
+  await db
+    .update(tenders)
+    .set({ llmSummary: null, llmExtractedData: null, updatedAt: new Date() })
+    .where(inArray(tenders.id, tenderIds));
+  await db
+    .update(matches)
+    .set({ personalisedSummary: null })
+    .where(inArray(matches.tenderId, tenderIds));
+  await deleteCachedSummaries(tenderIds);
+}
@@ -0,0 +1,53 @@
+import { pgTable, text, timestamp, integer, pgEnum, uniqueIndex, index } from "drizzle-orm/pg-core";
+import { createId } from "@paralleldrive/cuid2";
+import { tenders } from "./tenders";
+
+export const documentStatusEnum = pgEnum("document_status", ["pending", "stored", "failed"]);
+
+// One stored file per distinct content, however many tenders link to it
+export const documentBlobs = pgTable("document_blobs", {
+  sha256: text("sha256").primaryKey(),
+  bytes: integer("bytes").notNull(),
+  contentType: text("content_type"),
+  storagePath: text("storage_path").notNull(),
+
+  // Text extraction, done once per blob however many tenders share it
+  extractedText: text("extracted_text"),
+  extractedPages: integer("extracted_pages"),
+  extractionError: text("extraction_error"),
+  extractedAt: timestamp("extracted_at"),
+
+  // tender_documents rows pointing here, maintained by a trigger
+  refCount: integer("ref_count").default(0).notNull(),
+  // When refCount last dropped to 0; garbage collected after a grace period
+  unreferencedAt: timestamp("unreferenced_at").defaultNow(),
+
+  createdAt: timestamp("created_at").defaultNow().notNull()
+});
+
+export const tenderDocuments = pgTable("tender_documents", {
+  id: text("id").primaryKey().$defaultFn(() => createId()),
+  tenderId: text("tender_id").notNull().references(() => tenders.id, { onDelete: "cascade" }),
+  url: text("url").notNull(),
+
+  blobSha256: text("blob_sha256").references(() => documentBlobs.sha256),
+  status: documentStatusEnum("status").default("pending").notNull(),
+  lastError: text("last_error"),
+  // Validators the URL was served with when stored, for a conditional
+  // re-download before the blob is reused
+  etag: text("etag"),
+  lastModified: text("last_modified"),
+
+  createdAt: timestamp("created_at").defaultNow().notNull(),
+  updatedAt: timestamp("updated_at").defaultNow().notNull()
+}, (table) => ({
+  tenderUrlIdx: uniqueIndex("tender_documents_tender_url_idx").on(table.tenderId, table.url),
+  // Finds an already stored copy of a URL another tender linked
+  urlIdx: index("tender_documents_url_idx").on(table.url),
+  blobIdx: index("tender_documents_blob_idx").on(table.blobSha256)
+}));
+
+export type DocumentBlob = typeof documentBlobs.$inferSelect;
+export type NewDocumentBlob = typeof documentBlobs.$inferInsert;
+export type TenderDocument = typeof tenderDocuments.$inferSelect;
+export type NewTenderDocument = typeof tenderDocuments.$inferInsert;
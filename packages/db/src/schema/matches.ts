@@ -1,4 +1,4 @@
-import { pgTable, text, timestamp, integer, jsonb, pgEnum, boolean } from "drizzle-orm/pg-core";
+import { pgTable, text, timestamp, integer, jsonb, pgEnum, boolean, uniqueIndex } from "drizzle-orm/pg-core";
 import { createId } from "@paralleldrive/cuid2";
 import { watches } from "./watches";
 import { tenders } from "./tenders";
@@ -30,7 +30,10 @@ export const matches = pgTable("matches", {
   notifiedAt: timestamp("notified_at"),
 
   createdAt: timestamp("created_at").defaultNow().notNull()
-});
+}, (table) => ({
+  // One match per watch/tender pair, so reprocessing a tender is idempotent
+  watchTenderIdx: uniqueIndex("matches_watch_tender_idx").on(table.watchId, table.tenderId)
+}));
 
 export type Match = typeof matches.$inferSelect;
 export type NewMatch = typeof matches.$inferInsert;
@@ -0,0 +1,22 @@
+import { pgTable, timestamp, jsonb } from "drizzle-orm/pg-core";
+import { siteEnum } from "./linked-accounts";
+
+export interface StoredSearchWatermark {
+  publishedAt?: string;
+  sourceIds: string[];
+}
+
+// Per-portal crawl state shared by every sync of that site
+export const portalSyncState = pgTable("portal_sync_state", {
+  site: siteEnum("site").primaryKey(),
+
+  // High-water mark of the last successful search
+  watermark: jsonb("watermark").$type<StoredSearchWatermark>(),
+  lastCrawlAt: timestamp("last_crawl_at"),
+
+  createdAt: timestamp("created_at").defaultNow().notNull(),
+  updatedAt: timestamp("updated_at").defaultNow().notNull()
+});
+
+export type PortalSyncState = typeof portalSyncState.$inferSelect;
+export type NewPortalSyncState = typeof portalSyncState.$inferInsert;
@@ -0,0 +1,20 @@
+import { pgTable, text, timestamp, index } from "drizzle-orm/pg-core";
+import { tenders } from "./tenders";
+
+// Generated LLM summaries by a hash of the prompt and model, so the same
+// tender summarised for the same context is only paid for once
+export const summaryCache = pgTable("summary_cache", {
+  key: text("key").primaryKey(),
+  tenderId: text("tender_id").references(() => tenders.id, { onDelete: "cascade" }),
+  detailLevel: text("detail_level").notNull(),
+  model: text("model").notNull(),
+  summary: text("summary").notNull(),
+
+  expiresAt: timestamp("expires_at"),
+  createdAt: timestamp("created_at").defaultNow().notNull()
+}, (table) => ({
+  tenderIdx: index("summary_cache_tender_idx").on(table.tenderId)
+}));
+
+export type SummaryCacheEntry = typeof summaryCache.$inferSelect;
+export type NewSummaryCacheEntry = typeof summaryCache.$inferInsert;
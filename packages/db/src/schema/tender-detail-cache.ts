@@ -0,0 +1,23 @@
+import { pgTable, text, timestamp, primaryKey } from "drizzle-orm/pg-core";
+import { siteEnum } from "./linked-accounts";
+
+// What each tender's detail page looked like when last fetched, so re-syncs
+// can ask the portal whether it changed instead of fetching it again
+export const tenderDetailCache = pgTable("tender_detail_cache", {
+  source: siteEnum("source").notNull(),
+  sourceId: text("source_id").notNull(),
+
+  // Validators the portal sent, for conditional requests
+  etag: text("etag"),
+  lastModified: text("last_modified"),
+  // Hashes of the raw page and of the detail parsed from it
+  pageHash: text("page_hash"),
+  detailHash: text("detail_hash").notNull(),
+
+  checkedAt: timestamp("checked_at").defaultNow().notNull()
+}, (table) => ({
+  pk: primaryKey({ columns: [table.source, table.sourceId] })
+}));
+
+export type TenderDetailCacheEntry = typeof tenderDetailCache.$inferSelect;
+export type NewTenderDetailCacheEntry = typeof tenderDetailCache.$inferInsert;
@@ -0,0 +1,24 @@
+import { pgTable, text, timestamp, jsonb, index } from "drizzle-orm/pg-core";
+import { createId } from "@paralleldrive/cuid2";
+import { tenders } from "./tenders";
+
+// One row per amendment of a tender: which scraped fields changed, and what
+// they were before
+export const tenderRevisions = pgTable("tender_revisions", {
+  id: text("id").primaryKey().$defaultFn(() => createId()),
+  tenderId: text("tender_id").notNull().references(() => tenders.id, { onDelete: "cascade" }),
+
+  changedFields: jsonb("changed_fields").$type<string[]>().notNull(),
+  // Previous values of the changed fields; full text is only hashed
+  previous: jsonb("previous").$type<Record<string, unknown>>().notNull(),
+  // Field hashes before and after the amendment
+  previousHashes: jsonb("previous_hashes").$type<Record<string, string>>(),
+  fieldHashes: jsonb("field_hashes").$type<Record<string, string>>().notNull(),
+
+  createdAt: timestamp("created_at").defaultNow().notNull()
+}, (table) => ({
+  tenderIdx: index("tender_revisions_tender_idx").on(table.tenderId, table.createdAt)
+}));
+
+export type TenderRevision = typeof tenderRevisions.$inferSelect;
+export type NewTenderRevision = typeof tenderRevisions.$inferInsert;
@@ -1,4 +1,4 @@
-import { pgTable, text, timestamp, boolean, integer, jsonb } from "drizzle-orm/pg-core";
+import { pgTable, text, timestamp, boolean, integer, jsonb, uniqueIndex } from "drizzle-orm/pg-core";
 import { createId } from "@paralleldrive/cuid2";
 import { siteEnum } from "./linked-accounts";
 
@@ -39,12 +39,20 @@ export const tenders = pgTable("tenders", {
   llmExtractedData: jsonb("llm_extracted_data"),
 
   // Documents
+  // Downloaded files are in tender_documents / document_blobs
   documentUrls: jsonb("document_urls").$type<string[]>().default([]),
-  documentsStoragePath: text("documents_storage_path"),
+
+  // SHA-256 of the scraped content, used to skip unchanged re-syncs
+  contentHash: text("content_hash"),
+  // SHA-256 of each scraped field, to tell which ones an amendment changed
+  fieldHashes: jsonb("field_hashes").$type<Record<string, string>>(),
 
   createdAt: timestamp("created_at").defaultNow().notNull(),
   updatedAt: timestamp("updated_at").defaultNow().notNull()
-});
+}, (table) => ({
+  // The same public tender is discovered by every linked account on a portal
+  sourceIdx: uniqueIndex("tenders_source_source_id_idx").on(table.source, table.sourceId)
+}));
 
 export type Tender = typeof tenders.$inferSelect;
 export type NewTender = typeof tenders.$inferInsert;
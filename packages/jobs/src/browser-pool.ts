@@ -0,0 +1,32 @@
+import type { BrowserPool } from "@tenderwatch/agent";
+
+let pool: BrowserPool | null = null;
+
+/**
+ * Browsers shared by every function running in this worker, so warm
+ * invocations skip the Browserbase session cold start. Set
+ * AGENT_BROWSER=local to use a local Chromium instead (tests, dev).
+ */
+export async function getBrowserPool(): Promise<BrowserPool> {
+  if (!pool) {
+    const { BrowserPool } = await import("@tenderwatch/agent");
+    pool = new BrowserPool({ launch: launchBrowser });
+  }
+  return pool;
+}
+
+async function launchBrowser() {
+  const { chromium } = await import("playwright-core");
+  if (process.env.AGENT_BROWSER === "local") {
+    return chromium.launch();
+  }
+
+  const Browserbase = (await import("@browserbasehq/sdk")).default;
+  const bb = new Browserbase({
+    apiKey: process.env.BROWSERBASE_API_KEY!,
+  });
+  const session = await bb.sessions.create({
+    projectId: process.env.BROWSERBASE_PROJECT_ID!,
+  });
+  return chromium.connectOverCDP(session.connectUrl);
+}
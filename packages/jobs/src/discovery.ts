@@ -0,0 +1,201 @@
+import { db } from "@tenderwatch/db";
+import { tenders, portalSyncState, loadDetailCache, saveDetailCache } from "@tenderwatch/db";
+import type { NewTender, StoredSearchWatermark } from "@tenderwatch/db";
+import type { CachedDetail, SearchWatermark, TenderDetail, TenderListing } from "@tenderwatch/agent";
+import { eq, and, inArray } from "drizzle-orm";
+
+type Site = NewTender["source"];
+
+// Detail pages fetched per sync; the rest wait for the next run
+export const MAX_DETAILS_PER_SYNC = 50;
+
+/** Listings that need their detail page fetched, see listingsToFetch. */
+export interface FetchCandidates {
+  // Never seen, or listed differently from what we stored; newest first
+  changed: TenderListing[];
+  // Known and listed the same, with validators for a conditional re-check;
+  // least recently checked first
+  recheck: TenderListing[];
+}
+
+/**
+ * Caps a sync's detail fetches. search() returns newest first, so when the
+ * changed listings alone pass the cap keep the oldest, and only count
+ * listings from the newest kept one on as processed: anything newer is left
+ * outside the advanced watermark and gets picked up next time. Conditional
+ * re-checks only get the slots left over, and never move the cut-off.
+ */
+export function listingsForThisSync(
+  listings: TenderListing[],
+  candidates: FetchCandidates
+): { toFetch: TenderListing[]; processed: TenderListing[] } {
+  const changed = candidates.changed.slice(-MAX_DETAILS_PER_SYNC);
+  const processed = changed.length === candidates.changed.length
+    ? listings
+    : listings.slice(listings.indexOf(changed[0]));
+  const recheck = candidates.recheck.slice(0, MAX_DETAILS_PER_SYNC - changed.length);
+  return { toFetch: [...changed, ...recheck], processed };
+}
+
+export async function loadWatermark(site: Site): Promise<SearchWatermark | undefined> {
+  const state = await db.query.portalSyncState.findFirst({
+    where: eq(portalSyncState.site, site),
+  });
+  if (!state?.watermark) return undefined;
+  return {
+    publishedAt: state.watermark.publishedAt ? new Date(state.watermark.publishedAt) : undefined,
+    sourceIds: state.watermark.sourceIds,
+  };
+}
+
+export function toStoredWatermark(watermark: SearchWatermark): StoredSearchWatermark {
+  return {
+    publishedAt: watermark.publishedAt?.toISOString(),
+    sourceIds: watermark.sourceIds,
+  };
+}
+
+export async function saveWatermark(site: Site, watermark: StoredSearchWatermark): Promise<void> {
+  const now = new Date();
+  await db
+    .insert(portalSyncState)
+    .values({ site, watermark, lastCrawlAt: now, updatedAt: now })
+    .onConflictDoUpdate({
+      target: portalSyncState.site,
+      set: { watermark, lastCrawlAt: now, updatedAt: now },
+    });
+}
+
+/**
+ * Listings worth fetching details for. Tenders we have never seen and known
+ * tenders whose listed title or closing date no longer matches ours are
+ * `changed`. Known tenders whose detail page gave validators last time are
+ * worth a `recheck`: a conditional request costs a 304 and catches
+ * amendments the listing doesn't show. Two queries for all of them.
+ */
+export async function listingsToFetch(site: Site, listings: TenderListing[]): Promise<FetchCandidates> {
+  if (listings.length === 0) return { changed: [], recheck: [] };
+
+  const known = await db
+    .select({ sourceId: tenders.sourceId, title: tenders.title, closesAt: tenders.closesAt })
+    .from(tenders)
+    .where(
+      and(
+        eq(tenders.source, site),
+        inArray(tenders.sourceId, listings.map((l) => l.sourceId))
+      )
+    );
+  const knownById = new Map(known.map((t) => [t.sourceId, t]));
+  const cached = await loadDetailCache(site, known.map((t) => t.sourceId));
+
+  const changed: TenderListing[] = [];
+  const recheck: TenderListing[] = [];
+  for (const listing of listings) {
+    const existing = knownById.get(listing.sourceId);
+    const closesAt = listing.closesAt && !isNaN(listing.closesAt.getTime()) ? listing.closesAt : undefined;
+    if (
+      !existing ||
+      existing.title !== listing.title ||
+      (closesAt !== undefined && existing.closesAt?.getTime() !== closesAt.getTime())
+    ) {
+      changed.push(listing);
+      continue;
+    }
+    const entry = cached.get(listing.sourceId);
+    if (entry?.etag || entry?.lastModified) recheck.push(listing);
+  }
+
+  const checkedAt = (listing: TenderListing) => cached.get(listing.sourceId)!.checkedAt.getTime();
+  recheck.sort((a, b) => checkedAt(a) - checkedAt(b));
+  return { changed, recheck };
+}
+
+export type DetailCacheUpdate = CachedDetail & { sourceId: string };
+
+/** What earlier syncs learned about these tenders' detail pages. */
+export async function detailCacheFor(site: Site, sourceIds: string[]): Promise<Map<string, CachedDetail>> {
+  const rows = await loadDetailCache(site, sourceIds);
+  return new Map(
+    [...rows].map(([sourceId, row]) => [
+      sourceId,
+      {
+        etag: row.etag ?? undefined,
+        lastModified: row.lastModified ?? undefined,
+        pageHash: row.pageHash ?? undefined,
+        detailHash: row.detailHash,
+      },
+    ])
+  );
+}
+
+/**
+ * Remember fetched detail pages. Call once the changed tenders are
+ * ingested, so a failed run never marks an unsaved change as seen.
+ */
+export async function saveDetailCacheUpdates(site: Site, updates: DetailCacheUpdate[]): Promise<void> {
+  await saveDetailCache(
+    updates.map((u) => ({
+      source: site,
+      sourceId: u.sourceId,
+      etag: u.etag ?? null,
+      lastModified: u.lastModified ?? null,
+      pageHash: u.pageHash ?? null,
+      detailHash: u.detailHash,
+    }))
+  );
+}
+
+export function toNewTender(site: Site, sourceId: string, detail: TenderDetail) {
+  return {
+    source: site,
+    sourceId,
+    sourceUrl: detail.sourceUrl,
+    title: detail.title,
+    description: detail.description,
+    fullText: detail.fullText || null,
+    buyerOrg: detail.buyerOrg,
+    regions: detail.regions,
+    categories: detail.categories,
+    tenderType: detail.tenderType || null,
+    valueLow: detail.valueLow || null,
+    valueHigh: detail.valueHigh || null,
+    publishedAt: detail.publishedAt || null,
+    closesAt: detail.closesAt || null,
+    briefingAt: detail.briefingAt || null,
+    certificationsRequired: detail.certificationsRequired,
+    documentUrls: detail.documentUrls,
+  };
+}
+
+type SerializedTender = Omit<NewTender, "publishedAt" | "closesAt" | "briefingAt"> & {
+  publishedAt?: string | Date | null;
+  closesAt?: string | Date | null;
+  briefingAt?: string | Date | null;
+};
+
+/**
+ * Step output is JSON, so timestamps come back as strings.
+ */
+export function reviveTender(tender: SerializedTender): NewTender {
+  const toDate = (value: string | Date | null | undefined) => (value ? new Date(value) : null);
+  return {
+    ...tender,
+    publishedAt: toDate(tender.publishedAt),
+    closesAt: toDate(tender.closesAt),
+    briefingAt: toDate(tender.briefingAt),
+  };
+}
+
+// Tenders per tender/process.batch event
+export const TENDER_BATCH_SIZE = 100;
+
+export function processBatchEvents(tenderIds: string[], extra: Record<string, unknown> = {}) {
+  const events = [];
+  for (let i = 0; i < tenderIds.length; i += TENDER_BATCH_SIZE) {
+    events.push({
+      name: "tender/process.batch" as const,
+      data: { tenderIds: tenderIds.slice(i, i + TENDER_BATCH_SIZE), ...extra },
+    });
+  }
+  return events;
+}
@@ -0,0 +1,56 @@
+import type { DocumentStorage } from "@tenderwatch/agent";
+import type { ExtractionPool } from "@tenderwatch/processor";
+
+let storage: DocumentStorage | null = null;
+let extractionPool: ExtractionPool | null = null;
+
+/**
+ * Storage for downloaded tender documents, rooted at DOCUMENT_STORAGE_DIR.
+ *
+ * There is no default: blob refcounts live in Postgres, so the directory
+ * must be durable and shared by every worker (a mounted volume), never a
+ * worker's own /tmp.
+ */
+export async function getDocumentStorage(): Promise<DocumentStorage> {
+  if (!storage) {
+    const root = process.env.DOCUMENT_STORAGE_DIR;
+    if (!root) {
+      throw new Error("DOCUMENT_STORAGE_DIR is not set; tender documents need durable storage shared by every worker");
+    }
+    const { LocalDocumentStorage } = await import("@tenderwatch/agent");
+    storage = new LocalDocumentStorage(root);
+  }
+  return storage;
+}
+
+/**
+ * Worker pool for document text extraction, shared by every job step in
+ * this process.
+ */
+export async function getExtractionPool(): Promise<ExtractionPool> {
+  if (!extractionPool) {
+    const { ExtractionPool } = await import("@tenderwatch/processor");
+    const workers = Number(process.env.EXTRACTION_WORKERS);
+    extractionPool = new ExtractionPool(workers > 0 ? { size: workers } : {});
+  }
+  return extractionPool;
+}
+
+/** Content-addressed location of a document blob. */
+export function blobPath(sha256: string): string {
+  return `blobs/${sha256.slice(0, 2)}/${sha256}`;
+}
+
+// Tenders per tender/documents.fetch event
+export const DOCUMENT_BATCH_SIZE = 25;
+
+export function documentFetchEvents(tenderIds: string[], extra: Record<string, unknown> = {}) {
+  const events = [];
+  for (let i = 0; i < tenderIds.length; i += DOCUMENT_BATCH_SIZE) {
+    events.push({
+      name: "tender/documents.fetch" as const,
+      data: { tenderIds: tenderIds.slice(i, i + DOCUMENT_BATCH_SIZE), ...extra },
+    });
+  }
+  return events;
+}
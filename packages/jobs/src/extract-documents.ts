@@ -0,0 +1,99 @@
+import { inngest } from "./client";
+import { blobsAwaitingExtraction, saveBlobExtraction, refreshTenderFullText, resetTenderSummaries } from "@tenderwatch/db";
+import { getDocumentStorage, getExtractionPool } from "./documents";
+import { processBatchEvents } from "./discovery";
+
+// Larger files are recorded as skipped rather than read into memory
+const MAX_EXTRACT_BYTES = 100 * 1024 * 1024;
+const EXTRACT_LANES = 4;
+
+/**
+ * Extract the text of newly stored tender documents into tenders.fullText,
+ * then re-match the tenders whose text changed so watches see what the
+ * documents say. Text is cached per blob, so a file shared by many tenders
+ * is parsed once and reaches every tender linking it.
+ */
+export const extractTenderDocuments = inngest.createFunction(
+  {
+    id: "extract-tender-documents",
+    retries: 2,
+    concurrency: { limit: 2 },
+  },
+  { event: "tender/documents.extract" },
+  async ({ event, step }) => {
+    const { tenderIds } = event.data as { tenderIds: string[] };
+
+    // Each blob's result is saved as soon as it's extracted, so a retry
+    // only parses what's left
+    const result = await step.run("extract-text", async () => {
+      const storage = await getDocumentStorage();
+      const pool = await getExtractionPool();
+
+      const rows = await blobsAwaitingExtraction(tenderIds);
+      const tendersOf = new Map<string, { blob: (typeof rows)[number]; tenderIds: string[] }>();
+      for (const row of rows) {
+        const entry = tendersOf.get(row.sha256) ?? { blob: row, tenderIds: [] };
+        entry.tenderIds.push(row.tenderId);
+        tendersOf.set(row.sha256, entry);
+      }
+
+      let extracted = 0;
+      let skipped = 0;
+      let failed = 0;
+      const updated = new Set<string>();
+
+      const extractOne = async ({ blob, tenderIds: linked }: { blob: (typeof rows)[number]; tenderIds: string[] }) => {
+        if (blob.bytes > MAX_EXTRACT_BYTES) {
+          await saveBlobExtraction(blob.sha256, { error: `Document too large to extract (${blob.bytes} bytes)` });
+          skipped++;
+          return;
+        }
+
+        const chunks: Buffer[] = [];
+        for await (const chunk of storage.read(blob.storagePath)) chunks.push(chunk as Buffer);
+
+        let text;
+        try {
+          text = await pool.extract(Buffer.concat(chunks), blob.contentType ?? "");
+        } catch (error) {
+          // Timeouts and parse errors are properties of the file; retrying
+          // won't help
+          await saveBlobExtraction(blob.sha256, { error: error instanceof Error ? error.message : String(error) });
+          failed++;
+          return;
+        }
+
+        if (!text) {
+          await saveBlobExtraction(blob.sha256, { error: `Unsupported document type: ${blob.contentType}` });
+          skipped++;
+          return;
+        }
+
+        await saveBlobExtraction(blob.sha256, text);
+        // Tenders gain text document by document rather than all at the end
+        for (const id of await refreshTenderFullText(linked)) updated.add(id);
+        extracted++;
+      };
+
+      // A few files in memory at a time, enough to keep the workers busy
+      const queue = [...tendersOf.values()];
+      await Promise.all(Array.from({ length: EXTRACT_LANES }, async () => {
+        for (let next = queue.shift(); next; next = queue.shift()) await extractOne(next);
+      }));
+
+      // Documents another tender already had extracted were skipped above,
+      // but their text still belongs in these tenders' fullText
+      for (const id of await refreshTenderFullText(tenderIds)) updated.add(id);
+
+      // Summaries were written from the text the tenders had before
+      await resetTenderSummaries([...updated]);
+      return { extracted, skipped, failed, updated: [...updated] };
+    });
+
+    if (result.updated.length > 0) {
+      await step.sendEvent("rematch-tenders", processBatchEvents(result.updated));
+    }
+
+    return { extracted: result.extracted, skipped: result.skipped, failed: result.failed };
+  }
+);
@@ -0,0 +1,189 @@
+import { inngest } from "./client";
+import { db } from "@tenderwatch/db";
+import {
+  tenders,
+  registerTenderDocuments,
+  storedBlobsForUrls,
+  linkDocumentsToBlob,
+  linkDocumentsToStoredBlob,
+  markDocumentsFailed,
+  deleteUnreferencedBlobs,
+} from "@tenderwatch/db";
+import { SITES } from "@tenderwatch/shared";
+import type { SiteKey } from "@tenderwatch/shared";
+import type { TenderSource, BaseSiteAdapter, BrowserLease } from "@tenderwatch/agent";
+import { inArray } from "drizzle-orm";
+import { getBrowserPool } from "./browser-pool";
+import { getDocumentStorage, blobPath } from "./documents";
+
+// Unreferenced blobs are kept this long in case a re-sync links them again
+const BLOB_GRACE_DAYS = 7;
+
+/**
+ * Download the documents of newly ingested tenders into the content-addressed
+ * store. A URL some other tender already stored is linked without a
+ * download when the server answers a conditional request with 304 Not
+ * Modified; otherwise it is downloaded again and linked by its hash, so
+ * identical files behind one or more URLs share one blob.
+ */
+export const fetchTenderDocuments = inngest.createFunction(
+  {
+    id: "fetch-tender-documents",
+    retries: 3,
+    concurrency: { limit: 4 },
+  },
+  { event: "tender/documents.fetch" },
+  async ({ event, step }) => {
+    const { tenderIds, accountId } = event.data as { tenderIds: string[]; accountId?: string };
+
+    const pending = await step.run("register-documents", async () => {
+      const rows = await db
+        .select({ id: tenders.id, source: tenders.source, documentUrls: tenders.documentUrls })
+        .from(tenders)
+        .where(inArray(tenders.id, tenderIds));
+      const sourceOf = new Map(rows.map((r) => [r.id, r.source]));
+
+      const documents = await registerTenderDocuments(rows);
+      return documents.map((d) => ({ id: d.id, url: d.url, site: sourceOf.get(d.tenderId)! }));
+    });
+
+    if (pending.length === 0) {
+      return { stored: 0, reused: 0, failed: 0 };
+    }
+
+    // File bytes stream straight to storage inside this step and never pass
+    // through step state; completed documents are skipped on retry
+    const result = await step.run("store-documents", async () => {
+      const { getAdapter, getHttpAdapter, RequiresBrowserError, DocumentTooLargeError, HttpStatusError } =
+        await import("@tenderwatch/agent");
+      const storage = await getDocumentStorage();
+
+      const byUrl = new Map<string, { site: SiteKey; ids: string[] }>();
+      for (const doc of pending) {
+        const entry = byUrl.get(doc.url) ?? { site: doc.site as SiteKey, ids: [] };
+        entry.ids.push(doc.id);
+        byUrl.set(doc.url, entry);
+      }
+
+      // Copies other tenders already stored; reused only if the URL still
+      // serves the same document
+      const storedByUrl = await storedBlobsForUrls([...byUrl.keys()]);
+
+      let reused = 0;
+      let stored = 0;
+      let failed = 0;
+      let retryable: unknown = null;
+
+      const leases: { lease: BrowserLease; adapter: BaseSiteAdapter }[] = [];
+      const browserFor = new Map<SiteKey, Promise<BaseSiteAdapter>>();
+      const browserSource = (site: SiteKey) => {
+        let adapter = browserFor.get(site);
+        if (!adapter) {
+          adapter = (async () => {
+            const lease = await (await getBrowserPool()).acquire(accountId ? `account:${accountId}` : `portal:${site}`);
+            const browser = getAdapter(site, lease.browser, lease.page);
+            leases.push({ lease, adapter: browser });
+            return browser;
+          })();
+          browserFor.set(site, adapter);
+        }
+        return adapter;
+      };
+
+      try {
+        for (const [url, { site, ids }] of byUrl) {
+          const http = SITES[site].hasApi ? getHttpAdapter(site) : null;
+          // Without validators there's no asking whether the copy is still
+          // current; the download is re-hashed instead
+          const known = storedByUrl.get(url);
+          const ifChanged = known && (known.etag || known.lastModified) ? known : undefined;
+          const download = (source: TenderSource) =>
+            source.downloadDocumentTo(url, storage, { objectPath: blobPath, ifChanged });
+
+          try {
+            let doc;
+            try {
+              doc = await download(http ?? (await browserSource(site)));
+            } catch (error) {
+              // Login-walled documents need the account's browser session
+              if (!(http && accountId && error instanceof RequiresBrowserError)) throw error;
+              doc = await download(await browserSource(site));
+            }
+
+            if (!doc) {
+              await linkDocumentsToStoredBlob(ids, known!);
+              reused += ids.length;
+              continue;
+            }
+            await linkDocumentsToBlob(
+              ids,
+              { sha256: doc.sha256, bytes: doc.bytes, contentType: doc.contentType, storagePath: doc.objectPath },
+              { etag: doc.etag, lastModified: doc.lastModified }
+            );
+            if (doc.sha256 === known?.sha256) reused += ids.length;
+            else stored += ids.length;
+          } catch (error) {
+            const permanent =
+              error instanceof DocumentTooLargeError ||
+              error instanceof RequiresBrowserError ||
+              (error instanceof HttpStatusError && error.status >= 400 && error.status < 500);
+            if (!permanent) {
+              // Left pending; the partial upload is resumed on retry
+              retryable = error;
+              continue;
+            }
+            await markDocumentsFailed(ids, error instanceof Error ? error.message : String(error));
+            failed += ids.length;
+          }
+        }
+      } finally {
+        for (const { lease, adapter } of leases) {
+          await adapter.dispose();
+          await lease.release();
+        }
+      }
+
+      if (retryable) throw retryable;
+      return { stored, reused, failed };
+    });
+
+    if (result.stored + result.reused > 0) {
+      await step.sendEvent("queue-extraction", {
+        name: "tender/documents.extract",
+        data: { tenderIds },
+      });
+    }
+
+    return result;
+  }
+);
+
+/**
+ * Daily, remove blobs no tender has referenced for BLOB_GRACE_DAYS.
+ */
+export const collectDocumentBlobs = inngest.createFunction(
+  {
+    id: "collect-document-blobs",
+    retries: 1,
+  },
+  { cron: "0 3 * * *" },
+  async ({ step }) => {
+    return step.run("delete-unreferenced", async () => {
+      const storage = await getDocumentStorage();
+      const before = new Date(Date.now() - BLOB_GRACE_DAYS * 24 * 60 * 60 * 1000);
+
+      let deleted = 0;
+      let bytes = 0;
+      for (;;) {
+        const blobs = await deleteUnreferencedBlobs(before);
+        for (const blob of blobs) {
+          await storage.delete(blob.storagePath);
+          bytes += blob.bytes;
+        }
+        deleted += blobs.length;
+        if (blobs.length === 0) break;
+      }
+      return { deleted, bytes };
+    });
+  }
+);
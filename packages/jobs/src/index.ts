@@ -1,17 +1,32 @@
 export { inngest } from "./client";
 export { syncAccount } from "./sync-account";
+export { schedulePortalSyncs, syncPortal } from "./sync-portal";
 export { processTender } from "./process-tender";
+export { processTenderBatch } from "./process-tender-batch";
 export { sendDigest } from "./send-digest";
 export { sessionHealthCheck } from "./session-health";
 export { validateAccount } from "./validate-account";
 export { completeManualStep } from "./complete-manual-step";
+export { fetchTenderDocuments, collectDocumentBlobs } from "./fetch-documents";
+export { extractTenderDocuments } from "./extract-documents";
+export { pruneSummaryCache, getSummaryCache } from "./summaries";
+export { summarizeMatches } from "./summarize-matches";
+export { summarizeScheduledMatches } from "./summary-batch";
+export { getBrowserPool } from "./browser-pool";
 
 // Export all functions for Inngest serve
 import { syncAccount } from "./sync-account";
+import { schedulePortalSyncs, syncPortal } from "./sync-portal";
 import { processTender } from "./process-tender";
+import { processTenderBatch } from "./process-tender-batch";
 import { sendDigest } from "./send-digest";
 import { sessionHealthCheck } from "./session-health";
 import { validateAccount } from "./validate-account";
 import { completeManualStep } from "./complete-manual-step";
+import { fetchTenderDocuments, collectDocumentBlobs } from "./fetch-documents";
+import { extractTenderDocuments } from "./extract-documents";
+import { pruneSummaryCache } from "./summaries";
+import { summarizeMatches } from "./summarize-matches";
+import { summarizeScheduledMatches } from "./summary-batch";
 
-export const functions = [syncAccount, processTender, sendDigest, sessionHealthCheck, validateAccount, completeManualStep];
+export const functions = [syncAccount, schedulePortalSyncs, syncPortal, processTender, processTenderBatch, sendDigest, sessionHealthCheck, validateAccount, completeManualStep, fetchTenderDocuments, collectDocumentBlobs, extractTenderDocuments, pruneSummaryCache, summarizeMatches, summarizeScheduledMatches];
@@ -0,0 +1,94 @@
+import { inngest } from "./client";
+import { db } from "@tenderwatch/db";
+import { tenders, upsertMatches, matchedWatchIds, renotifyMatches, deleteMatches } from "@tenderwatch/db";
+import type { NewMatch } from "@tenderwatch/db";
+import { inArray } from "drizzle-orm";
+import { matchTenders } from "@tenderwatch/processor";
+import type { WatchMatch } from "@tenderwatch/processor";
+import { getWatchIndex, toTenderForMatching } from "./watch-index";
+
+export const processTenderBatch = inngest.createFunction(
+  {
+    id: "process-tender-batch",
+    retries: 2
+  },
+  { event: "tender/process.batch" },
+  async ({ event, step }) => {
+    const { tenderIds, match = "full", notify = false } = event.data as {
+      tenderIds: string[];
+      // "filters": only regions, value or dates changed, see tenderChangeWork
+      match?: "full" | "filters" | "none";
+      notify?: boolean;
+    };
+
+    // Matching and saving share a step so match rows never have to be
+    // serialised into step state; the upsert is safe to repeat on retry
+    const saved = await step.run("match-and-save", async () => {
+      // Notifying needs only the existing matches, not the tenders
+      const rows = match === "none" ? [] : await db.query.tenders.findMany({
+        where: inArray(tenders.id, tenderIds)
+      });
+      const existing = match === "full" ? new Map<string, string[]>() : await matchedWatchIds(tenderIds);
+
+      const index = await getWatchIndex();
+      const values: NewMatch[] = [];
+      // Watches each tender still matches, for notification
+      const current: { watchId: string; tenderId: string }[] = [];
+      // Watches a tender no longer passes the filters of
+      const stale: { watchId: string; tenderId: string }[] = [];
+
+      const toMatch = (tenderId: string, result: WatchMatch): NewMatch => ({
+        watchId: result.watchId,
+        tenderId,
+        score: result.score,
+        tier: result.tier as "strong" | "maybe" | "stretch",
+        matchedKeywords: result.matchedKeywords,
+        llmReasoning: result.reasoning,
+      });
+
+      if (match === "full") {
+        const results = matchTenders(rows.map(toTenderForMatching), index);
+        rows.forEach((tender, i) => values.push(...results[i].map(result => toMatch(tender.id, result))));
+      } else if (match === "filters") {
+        // Existing matches keep their scores; only newly eligible watches are scored
+        const now = Date.now();
+        for (const tender of rows) {
+          const result = index.refilter(toTenderForMatching(tender), existing.get(tender.id) ?? [], now);
+          values.push(...result.added.map(added => toMatch(tender.id, added)));
+          current.push(...result.kept.map(watchId => ({ watchId, tenderId: tender.id })));
+          stale.push(...result.dropped.map(watchId => ({ watchId, tenderId: tender.id })));
+        }
+      } else {
+        for (const [tenderId, watchIds] of existing) {
+          current.push(...watchIds.map(watchId => ({ watchId, tenderId })));
+        }
+      }
+
+      const dropped = await deleteMatches(stale);
+      const upserted = await upsertMatches(values);
+      const inserted = upserted.filter(m => m.inserted).length;
+      current.push(...upserted.filter(m => !m.inserted));
+      const renotified = notify ? await renotifyMatches(current) : 0;
+
+      return {
+        tenderCount: match === "none" ? tenderIds.length : rows.length,
+        matchCount: values.length,
+        inserted,
+        dropped,
+        renotified,
+        // Tenders with new or rescored matches, which may need summaries
+        summarize: [...new Set(upserted.map(m => m.tenderId))],
+      };
+    });
+
+    if (saved.summarize.length > 0) {
+      await step.sendEvent("queue-summaries", {
+        name: "tender/summarize",
+        data: { tenderIds: saved.summarize },
+      });
+    }
+
+    const { summarize, ...counts } = saved;
+    return { ...counts, summarizing: summarize.length };
+  }
+);
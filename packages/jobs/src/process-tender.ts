@@ -1,8 +1,8 @@
 import { inngest } from "./client";
 import { db } from "@tenderwatch/db";
-import { tenders, watches, matches } from "@tenderwatch/db";
+import { tenders, upsertMatches } from "@tenderwatch/db";
 import { eq } from "drizzle-orm";
-import { matchTender, generateSummary } from "@tenderwatch/processor";
+import { getWatchIndex, toTenderForMatching } from "./watch-index";
 
 export const processTender = inngest.createFunction(
   {
@@ -22,80 +22,27 @@ export const processTender = inngest.createFunction(
       return result;
     });
 
-    // Get all active watches
-    const activeWatches = await step.run("get-watches", async () => {
-      return db.query.watches.findMany({
-        where: eq(watches.isActive, true)
-      });
-    });
-
-    // Match against each watch
+    // Match against every active watch in a single scan of the tender text
     const matchResults = await step.run("match-watches", async () => {
-      const results = [];
-
-      for (const watch of activeWatches) {
-        const matchResult = matchTender(
-          {
-            title: tender.title,
-            description: tender.description || "",
-            fullText: tender.fullText || undefined,
-            regions: tender.regions || [],
-            categories: tender.categories || [],
-            buyerOrg: tender.buyerOrg || undefined,
-            valueLow: tender.valueLow || undefined,
-            valueHigh: tender.valueHigh || undefined,
-            closesAt: tender.closesAt ? new Date(tender.closesAt) : undefined,
-            certificationsRequired: tender.certificationsRequired || []
-          },
-          {
-            keywordsMust: watch.keywordsMust || [],
-            keywordsBonus: watch.keywordsBonus || [],
-            keywordsExclude: watch.keywordsExclude || [],
-            regions: watch.regions || [],
-            valueMin: watch.valueMin || undefined,
-            valueMax: watch.valueMax || undefined,
-            includeUnspecifiedValue: watch.includeUnspecifiedValue ?? true,
-            minResponseDays: watch.minResponseDays || undefined,
-            preferredSectors: watch.preferredSectors || [],
-            preferredBuyers: watch.preferredBuyers || [],
-            certificationsHeld: watch.certificationsHeld || [],
-            sensitivity: watch.sensitivity
-          }
-        );
-
-        if (matchResult.tier !== "reject") {
-          results.push({
-            watchId: watch.id,
-            ...matchResult
-          });
-        }
-      }
-
-      return results;
+      const index = await getWatchIndex();
+      return index.match(toTenderForMatching(tender));
     });
 
-    // Save matches and generate summaries
-    for (const result of matchResults) {
-      await step.run(`save-match-${result.watchId}`, async () => {
-        // Get watch for summary context
-        const watch = activeWatches.find((w: any) => w.id === result.watchId)!;
-        
-        // Generate personalised summary if Pro user
-        // TODO: Check user plan
-        let summary: string | undefined;
-        
-        // Insert match
-        await db.insert(matches).values({
+    // Save matches. Upserting keeps retries from duplicating rows.
+    await step.run("save-matches", async () => {
+      // Generate personalised summary if Pro user
+      // TODO: Check user plan
+      await upsertMatches(
+        matchResults.map((result) => ({
           watchId: result.watchId,
           tenderId: tender.id,
           score: result.score,
           tier: result.tier as "strong" | "maybe" | "stretch",
           matchedKeywords: result.matchedKeywords,
           llmReasoning: result.reasoning,
-          personalisedSummary: summary,
-        });
-      });
-    }
+        }))
+      );
+    });
 
     return { matchCount: matchResults.length };
   }
@@ -2,6 +2,7 @@ import { inngest } from "./client";
 import { db } from "@tenderwatch/db";
 import { linkedAccounts } from "@tenderwatch/db";
 import { eq, inArray, and, lt } from "drizzle-orm";
+import { getBrowserPool } from "./browser-pool";
 
 export const sessionHealthCheck = inngest.createFunction(
   {
@@ -70,81 +71,47 @@ export const sessionHealthCheck = inngest.createFunction(
     for (const account of activeAccounts) {
       await step.run(`heartbeat-${account.id}`, async () => {
         try {
-          const Browserbase = (await import("@browserbasehq/sdk")).default;
-          const { chromium } = await import("playwright-core");
           const { getAdapter } = await import("@tenderwatch/agent");
 
-          const bb = new Browserbase({
-            apiKey: process.env.BROWSERBASE_API_KEY!,
-          });
-
-          const session = await bb.sessions.create({
-            projectId: process.env.BROWSERBASE_PROJECT_ID!,
-          });
-
-          const browser = await chromium.connectOverCDP(session.connectUrl);
-          const context = browser.contexts()[0];
-          const page = context.pages()[0];
+          const lease = await (await getBrowserPool()).acquire(`account:${account.id}`);
+          const adapter = getAdapter(account.site, lease.browser, lease.page);
+          let failed = true;
 
           try {
-            const adapter = getAdapter(account.site, browser as any, page);
-
-            // Restore cookies if we have session data
-            if (account.sessionData && typeof account.sessionData === "object") {
-              const cookies = (account.sessionData as any).cookies;
-              if (Array.isArray(cookies) && cookies.length > 0) {
-                await context.addCookies(cookies);
-              }
-            }
-
-            // Navigate to the portal and check if logged in
-            await adapter.navigateTo(adapter.siteUrl);
-            const isLoggedIn = await adapter.isLoggedIn();
+            // Keeps a session the portal still accepts; logs in again, and
+            // only then decrypts the password, if it doesn't
+            const session = await adapter.ensureSession(account.sessionData, account.siteUsername, async () => {
+              const { decrypt } = await import("@tenderwatch/crypto");
+              return decrypt(account.encryptedCredentials);
+            });
 
-            if (isLoggedIn) {
-              // Session is still valid — update sync time and fresh cookies
-              const freshCookies = await context.cookies();
+            if (session.success) {
               await db
                 .update(linkedAccounts)
                 .set({
-                  sessionData: { cookies: freshCookies },
+                  ...(session.changed ? { sessionData: session.sessionData } : {}),
                   lastSyncAt: new Date(),
+                  lastError: null,
                   updatedAt: new Date(),
                 } as any)
                 .where(eq(linkedAccounts.id, account.id));
-              healthy++;
+              if (session.via === "login") refreshed++;
+              else healthy++;
             } else {
-              // Session expired — try re-login with stored credentials
-              const { decrypt } = await import("@tenderwatch/crypto");
-              const plainPassword = await decrypt(account.encryptedCredentials);
-
-              const loginResult = await adapter.login(account.siteUsername, plainPassword);
-
-              if (loginResult.success) {
-                await db
-                  .update(linkedAccounts)
-                  .set({
-                    sessionData: loginResult.sessionData || null,
-                    lastSyncAt: new Date(),
-                    lastError: null,
-                    updatedAt: new Date(),
-                  } as any)
-                  .where(eq(linkedAccounts.id, account.id));
-                refreshed++;
-              } else {
-                await db
-                  .update(linkedAccounts)
-                  .set({
-                    status: "expired",
-                    lastError: `Session expired, re-login failed: ${loginResult.error || "unknown"}`,
-                    updatedAt: new Date(),
-                  })
-                  .where(eq(linkedAccounts.id, account.id));
-                expired++;
-              }
+              await db
+                .update(linkedAccounts)
+                .set({
+                  status: "expired",
+                  lastError: `Session expired, re-login failed: ${session.error || "unknown"}`,
+                  updatedAt: new Date(),
+                })
+                .where(eq(linkedAccounts.id, account.id));
+              expired++;
             }
+            failed = false;
           } finally {
-            await browser.close();
+            await adapter.dispose();
+            await lease.release({ discard: failed });
           }
         } catch (error) {
           const errorMessage = error instanceof Error ? error.message : "Health check failed";
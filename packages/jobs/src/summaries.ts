@@ -0,0 +1,40 @@
+import { inngest } from "./client";
+import { loadCachedSummary, saveCachedSummary, deleteCachedSummaries, deleteExpiredSummaries } from "@tenderwatch/db";
+import type { SummaryCache } from "@tenderwatch/processor";
+
+let summaryCache: SummaryCache | null = null;
+
+/**
+ * Summary cache for this process, backed by the summary_cache table so
+ * every worker shares what has been generated. SUMMARY_CACHE_TTL_DAYS sets
+ * how long summaries are kept.
+ */
+export async function getSummaryCache(): Promise<SummaryCache> {
+  if (!summaryCache) {
+    const { SummaryCache } = await import("@tenderwatch/processor");
+    const ttlDays = Number(process.env.SUMMARY_CACHE_TTL_DAYS);
+    summaryCache = new SummaryCache({
+      store: {
+        get: loadCachedSummary,
+        set: saveCachedSummary,
+        deleteForTenders: deleteCachedSummaries,
+      },
+      ...(ttlDays > 0 && { ttlMs: ttlDays * 24 * 60 * 60 * 1000 }),
+    });
+  }
+  return summaryCache;
+}
+
+/**
+ * Daily, remove expired summaries from the cache table.
+ */
+export const pruneSummaryCache = inngest.createFunction(
+  {
+    id: "prune-summary-cache",
+    retries: 1,
+  },
+  { cron: "30 3 * * *" },
+  async ({ step }) => {
+    return step.run("delete-expired", async () => ({ deleted: await deleteExpiredSummaries() }));
+  }
+);
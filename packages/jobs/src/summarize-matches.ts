@@ -0,0 +1,196 @@
+import { inngest } from "./client";
+import { db } from "@tenderwatch/db";
+import { tenders, matches, watches, users } from "@tenderwatch/db";
+import { and, eq, gt, inArray, isNull, or, sql } from "drizzle-orm";
+import type { SQL } from "drizzle-orm";
+import {
+  buildSummaryRequest,
+  cacheablePrefix,
+  generateSummary,
+  generateTenderDigest,
+  storedDigest,
+  TokenUsageMeter,
+} from "@tenderwatch/processor";
+import type { SummaryContext, SummaryTender } from "@tenderwatch/processor";
+import { getSummaryCache } from "./summaries";
+
+// Model calls in flight per step
+const SUMMARY_LANES = 4;
+
+async function inLanes<T>(items: T[], run: (item: T) => Promise<void>): Promise<void> {
+  const queue = [...items];
+  await Promise.all(Array.from({ length: SUMMARY_LANES }, async () => {
+    for (let next = queue.shift(); next !== undefined; next = queue.shift()) await run(next);
+  }));
+}
+
+/**
+ * Pro users' matches, meeting `where`, that have no personalised summary
+ * yet, with what their summaries are written from. Tenders that have
+ * closed are left out; nobody needs a summary of those.
+ */
+export async function unsummarisedMatches(where: SQL) {
+  return db
+    .select({
+      matchId: matches.id,
+      tenderId: tenders.id,
+      title: tenders.title,
+      description: tenders.description,
+      // Only read if the tender has no digest, and then no more than the prompt uses
+      fullText: sql<string | null>`CASE WHEN ${tenders.llmExtractedData} IS NULL THEN left(${tenders.fullText}, 8000) END`,
+      buyerOrg: tenders.buyerOrg,
+      closesAt: tenders.closesAt,
+      valueLow: tenders.valueLow,
+      valueHigh: tenders.valueHigh,
+      llmExtractedData: tenders.llmExtractedData,
+      watch: watches,
+      companyName: sql<string>`COALESCE(${users.companyName}, ${users.businessName}, ${users.legalName}, '')`,
+    })
+    .from(matches)
+    .innerJoin(tenders, eq(matches.tenderId, tenders.id))
+    .innerJoin(watches, eq(matches.watchId, watches.id))
+    .innerJoin(users, eq(watches.userId, users.id))
+    .where(
+      and(
+        where,
+        isNull(matches.personalisedSummary),
+        or(isNull(tenders.closesAt), gt(tenders.closesAt, sql`now()`)),
+        eq(watches.isActive, true),
+        eq(users.plan, "pro")
+      )
+    );
+}
+
+export function summaryInputs(row: Awaited<ReturnType<typeof unsummarisedMatches>>[number]) {
+  const context: SummaryContext = {
+    watchName: row.watch.name,
+    companyName: row.companyName || "this company",
+    keywordsMust: row.watch.keywordsMust ?? [],
+    keywordsBonus: row.watch.keywordsBonus ?? [],
+    preferredSectors: row.watch.preferredSectors ?? [],
+    certificationsHeld: row.watch.certificationsHeld ?? [],
+  };
+  const tender: SummaryTender = {
+    title: row.title,
+    description: row.description ?? "",
+    fullText: row.fullText ?? undefined,
+    buyerOrg: row.buyerOrg ?? "",
+    closesAt: row.closesAt ?? undefined,
+    valueLow: row.valueLow ?? undefined,
+    valueHigh: row.valueHigh ?? undefined,
+    digest: storedDigest(row.llmExtractedData),
+  };
+  return { tender, context, detailLevel: row.watch.detailLevel };
+}
+
+/**
+ * Summarise newly matched tenders in two tiers. Each tender is read in full
+ * once, into a shared digest (tenders.llmExtractedData). Personalised
+ * summaries for Pro users' instant-alert matches are then written from
+ * that digest and the watch's context, so a popular tender's full text
+ * isn't re-sent for every watch it matches. Both tiers skip what is already
+ * done, so retries and repeated events only pay for what's missing. Each
+ * tender's first personalised summary goes ahead of the rest, so it writes
+ * the tender's part of the prompt to the prompt cache and the others read it.
+ */
+export const summarizeMatches = inngest.createFunction(
+  {
+    id: "summarize-matches",
+    retries: 2,
+    concurrency: { limit: 4 },
+  },
+  { event: "tender/summarize" },
+  async ({ event, step }) => {
+    const { tenderIds, includeScheduled = false } = event.data as {
+      tenderIds: string[];
+      // Also summarise matches of daily and weekly watches, e.g. when their batch failed
+      includeScheduled?: boolean;
+    };
+
+    const digests = await step.run("digest-tenders", async () => {
+      const cache = await getSummaryCache();
+      const usage = new TokenUsageMeter();
+      const rows = await db
+        .select({
+          id: tenders.id,
+          title: tenders.title,
+          description: tenders.description,
+          fullText: tenders.fullText,
+          buyerOrg: tenders.buyerOrg,
+          llmExtractedData: tenders.llmExtractedData,
+        })
+        .from(tenders)
+        .where(inArray(tenders.id, tenderIds));
+
+      let generated = 0;
+      let failed = 0;
+      await inLanes(rows.filter((row) => !storedDigest(row.llmExtractedData)), async (row) => {
+        const digest = await generateTenderDigest(
+          {
+            title: row.title,
+            description: row.description ?? "",
+            fullText: row.fullText ?? undefined,
+            buyerOrg: row.buyerOrg ?? "",
+          },
+          { cache, tenderId: row.id, usage }
+        );
+        if (!digest) {
+          failed++;
+          return;
+        }
+        await db
+          .update(tenders)
+          .set({ llmExtractedData: digest, llmSummary: digest.overview, updatedAt: new Date() })
+          .where(eq(tenders.id, row.id));
+        generated++;
+      });
+
+      return { generated, failed, usage: usage.report() };
+    });
+
+    const personalised = await step.run("personalise-matches", async () => {
+      const cache = await getSummaryCache();
+      // Daily and weekly digests are summarised in a message batch instead
+      const rows = await unsummarisedMatches(
+        and(
+          inArray(matches.tenderId, tenderIds),
+          includeScheduled ? undefined : eq(watches.deliveryMethod, "instant")
+        )!
+      );
+
+      const usage = new TokenUsageMeter();
+      let written = 0;
+      const personalise = async (row: (typeof rows)[number]) => {
+        const { tender, context, detailLevel } = summaryInputs(row);
+        const summary = await generateSummary(tender, context, detailLevel, { cache, tenderId: row.tenderId, usage });
+        if (!summary) return;
+        await db.update(matches).set({ personalisedSummary: summary }).where(eq(matches.id, row.matchId));
+        written++;
+      };
+
+      // A prompt cache entry is only readable once its first call is
+      // answered. Where several matches share a tender's prefix and it is
+      // long enough to be cached, one of them goes first; the rest of the
+      // time nothing waits.
+      const shared = new Map<string, typeof rows>();
+      for (const row of rows) {
+        const key = `${row.tenderId}:${row.watch.detailLevel}`;
+        const group = shared.get(key);
+        if (group) group.push(row);
+        else shared.set(key, [row]);
+      }
+      const firsts = new Set<(typeof rows)[number]>();
+      for (const [lead, ...rest] of shared.values()) {
+        if (rest.length === 0) continue;
+        const { tender, context, detailLevel } = summaryInputs(lead);
+        if (cacheablePrefix(buildSummaryRequest(tender, context, detailLevel))) firsts.add(lead);
+      }
+      await inLanes([...firsts], personalise);
+      await inLanes(rows.filter((row) => !firsts.has(row)), personalise);
+
+      return { written, cache: cache.stats(), usage: usage.report() };
+    });
+
+    return { digests, personalised };
+  }
+);
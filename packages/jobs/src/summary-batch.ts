@@ -0,0 +1,130 @@
+import { inngest } from "./client";
+import { db } from "@tenderwatch/db";
+import { matches, watches } from "@tenderwatch/db";
+import { and, inArray, isNull } from "drizzle-orm";
+import {
+  buildSummaryRequest,
+  collectSummaryBatch,
+  MessageBatchClient,
+  pendingSummaries,
+  submitSummaryBatch,
+  TokenUsageMeter,
+} from "@tenderwatch/processor";
+import type { PendingSummary } from "@tenderwatch/processor";
+import { getSummaryCache } from "./summaries";
+import { unsummarisedMatches, summaryInputs } from "./summarize-matches";
+
+// Submitted at 04:00 for the 07:00 digest; given up on by 06:30
+const POLL_INTERVAL = "10m";
+const MAX_POLLS = 15;
+// After a cancel, how long to wait for the batch to wind down
+const CANCEL_POLLS = 3;
+
+function tendersOf(pending: PendingSummary[]): string[] {
+  return [...new Set(pending.flatMap((p) => (p.tenderId ? [p.tenderId] : [])))];
+}
+
+/**
+ * Summary requests for digest matches not summarised or sent yet. Run again
+ * at collect time, it maps the batch's results back to matches without the
+ * batch's targets ever being kept in step state.
+ */
+async function scheduledSummaryItems() {
+  const rows = await unsummarisedMatches(
+    and(inArray(watches.deliveryMethod, ["daily", "weekly"]), isNull(matches.notifiedAt))!
+  );
+  return rows.map((row) => {
+    const { tender, context, detailLevel } = summaryInputs(row);
+    return { target: row.matchId, request: buildSummaryRequest(tender, context, detailLevel), tenderId: row.tenderId };
+  });
+}
+
+async function writeSummaries(written: { targets: string[]; summary: string }[]): Promise<number> {
+  let count = 0;
+  for (const { targets, summary } of written) {
+    await db.update(matches).set({ personalisedSummary: summary }).where(inArray(matches.id, targets));
+    count += targets.length;
+  }
+  return count;
+}
+
+/**
+ * Personalised summaries for daily and weekly digest matches, generated
+ * through the Message Batches API at about half the price of the Messages
+ * API and without competing with instant alerts for rate limits. Requests
+ * already in the summary cache are written straight away. Anything the
+ * batch doesn't deliver in time is handed to summarize-matches to generate
+ * directly before the digest goes out.
+ */
+export const summarizeScheduledMatches = inngest.createFunction(
+  {
+    id: "summarize-scheduled-matches",
+    retries: 2,
+    concurrency: { limit: 1 },
+  },
+  { cron: "0 4 * * *" },
+  async ({ step }) => {
+    const submitted = await step.run("submit-batch", async () => {
+      const cache = await getSummaryCache();
+      const result = await submitSummaryBatch(await scheduledSummaryItems(), { client: new MessageBatchClient(), cache });
+      return { batchId: result.batchId, batched: result.batched, cached: await writeSummaries(result.cached) };
+    });
+
+    if (!submitted.batchId) return { cached: submitted.cached, batched: 0 };
+    const batchId = submitted.batchId;
+
+    const check = (id: string) =>
+      step.run(id, async () => {
+        const batch = await new MessageBatchClient().retrieve(batchId);
+        return { status: batch.processing_status, counts: batch.request_counts };
+      });
+
+    let state = await check("check-batch-0");
+    for (let i = 1; i <= MAX_POLLS && state.status !== "ended"; i++) {
+      await step.sleep(`wait-${i}`, POLL_INTERVAL);
+      state = await check(`check-batch-${i}`);
+    }
+
+    // Results of requests that finished before a cancel are still delivered
+    if (state.status !== "ended") {
+      await step.run("cancel-batch", () => new MessageBatchClient().cancel(batchId));
+      for (let i = 1; i <= CANCEL_POLLS && state.status !== "ended"; i++) {
+        await step.sleep(`wait-cancel-${i}`, "1m");
+        state = await check(`check-cancel-${i}`);
+      }
+    }
+
+    const collected = await step.run("write-results", async () => {
+      // Matches summarised since the batch was submitted drop out here
+      const pending = pendingSummaries(await scheduledSummaryItems());
+      if (state.status !== "ended") {
+        return { written: 0, failedTenderIds: tendersOf(Object.values(pending)), usage: {} };
+      }
+      const client = new MessageBatchClient();
+      const batch = await client.retrieve(batchId);
+      const usage = new TokenUsageMeter();
+      const result = await collectSummaryBatch(batch, pending, { client, cache: await getSummaryCache(), usage });
+      return {
+        written: await writeSummaries(result.written),
+        failedTenderIds: tendersOf(result.failed),
+        usage: usage.report(),
+      };
+    });
+
+    if (collected.failedTenderIds.length > 0) {
+      await step.sendEvent("summarize-directly", {
+        name: "tender/summarize",
+        data: { tenderIds: collected.failedTenderIds, includeScheduled: true },
+      });
+    }
+
+    return {
+      cached: submitted.cached,
+      batched: submitted.batched,
+      written: collected.written,
+      fallback: collected.failedTenderIds.length,
+      counts: state.counts,
+      usage: collected.usage,
+    };
+  }
+);
@@ -1,19 +1,43 @@
 import { inngest } from "./client";
 import { db } from "@tenderwatch/db";
-import { linkedAccounts, tenders } from "@tenderwatch/db";
+import { linkedAccounts, ingestTenders, resetTenderSummaries } from "@tenderwatch/db";
+import type { StoredSearchWatermark } from "@tenderwatch/db";
 import { eq } from "drizzle-orm";
+import {
+  listingsToFetch,
+  listingsForThisSync,
+  toNewTender,
+  reviveTender,
+  loadWatermark,
+  saveWatermark,
+  toStoredWatermark,
+  detailCacheFor,
+  saveDetailCacheUpdates,
+} from "./discovery";
+import type { DetailCacheUpdate } from "./discovery";
+import { getBrowserPool } from "./browser-pool";
+import { tenderChangeWork } from "./tender-changes";
 
 export const syncAccount = inngest.createFunction(
   {
     id: "sync-account",
     retries: 3,
-    concurrency: {
-      limit: 5,
-    },
+    // A slow portal only holds up its own accounts' syncs
+    concurrency: [
+      { key: "event.data.site", limit: 2 },
+      { limit: 10 },
+    ],
   },
   { event: "account/sync" },
   async ({ event, step }) => {
-    const { accountId } = event.data;
+    // sourceIds is set when sync-portal hands over listings whose detail
+    // pages need a logged-in session, with the watermark to save once they
+    // are stored; otherwise this account does a full sync
+    const { accountId, sourceIds, watermark: handedWatermark } = event.data as {
+      accountId: string;
+      sourceIds?: string[];
+      watermark?: StoredSearchWatermark;
+    };
 
     // Get account details
     const account = await step.run("get-account", async () => {
@@ -31,103 +55,102 @@ export const syncAccount = inngest.createFunction(
     });
 
     // Spin up browser and sync tenders
-    const discoveredTenders = await step.run("sync-portal", async () => {
-      const Browserbase = (await import("@browserbasehq/sdk")).default;
-      const { chromium } = await import("playwright-core");
-      const { getAdapter } = await import("@tenderwatch/agent");
+    const discovered = await step.run("sync-portal", async () => {
+      const { getAdapter, advanceWatermark, sessionChanged, portalLimiter } = await import("@tenderwatch/agent");
 
-      const bb = new Browserbase({
-        apiKey: process.env.BROWSERBASE_API_KEY!,
-      });
-
-      const session = await bb.sessions.create({
-        projectId: process.env.BROWSERBASE_PROJECT_ID!,
-      });
-
-      const browser = await chromium.connectOverCDP(session.connectUrl);
-      const context = browser.contexts()[0];
-      const page = context.pages()[0];
+      // Each account keeps its own warm context between runs
+      const lease = await (await getBrowserPool()).acquire(`account:${accountId}`);
+      const adapter = getAdapter(account.site, lease.browser, lease.page);
+      let failed = true;
 
       try {
-        const adapter = getAdapter(account.site, browser as any, page);
-
-        // Login with stored credentials
-        const loginResult = await adapter.login(account.siteUsername, password);
-        if (!loginResult.success) {
-          throw new Error(`Login failed for ${account.site}: ${loginResult.error}`);
+        // Reuse the pooled context's or the stored session when the portal
+        // still accepts it; the login form is the slow, CAPTCHA-prone part
+        const session = await adapter.ensureSession(account.sessionData, account.siteUsername, async () => password);
+        if (!session.success) {
+          throw new Error(`Login failed for ${account.site}: ${session.error}`);
         }
 
-        // Search for recent tenders (last 7 days)
-        const sevenDaysAgo = new Date();
-        sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 7);
+        let toFetch: { sourceId: string }[];
+        let watermark: StoredSearchWatermark | null = null;
+        if (sourceIds) {
+          // Portal-level crawl already found these; only the gated detail
+          // pages need this account's session
+          toFetch = sourceIds.map((sourceId) => ({ sourceId }));
+          watermark = handedWatermark ?? null;
+        } else {
+          // Search for recent tenders (last 7 days)
+          const sevenDaysAgo = new Date();
+          sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 7);
+
+          const previous = await loadWatermark(account.site);
+          const listings = await adapter.search({
+            publishedAfter: sevenDaysAgo,
+            watermark: previous,
+          });
+          const selected = listingsForThisSync(listings, await listingsToFetch(account.site, listings));
+          toFetch = selected.toFetch;
+          watermark = toStoredWatermark(advanceWatermark(previous, selected.processed));
+        }
 
-        const listings = await adapter.search({
-          publishedAfter: sevenDaysAgo,
-        });
+        // Fetch details for tenders that are new or whose listing changed,
+        // and conditionally re-check some known ones, several tabs at a time
+        const fetchIds = toFetch.map((l) => l.sourceId);
+        const cached = await detailCacheFor(account.site, fetchIds);
 
-        // Fetch details for each new tender
         const newTenders = [];
-        for (const listing of listings.slice(0, 50)) {
-          // Check if tender already exists
-          const existing = await db.query.tenders.findFirst({
-            where: eq(tenders.sourceId, listing.sourceId),
-          });
-
-          if (!existing) {
-            const detail = await adapter.fetchTenderDetail(listing.sourceId);
-            newTenders.push({
-              source: account.site,
-              sourceId: listing.sourceId,
-              sourceUrl: detail.sourceUrl,
-              title: detail.title,
-              description: detail.description,
-              fullText: detail.fullText || null,
-              buyerOrg: detail.buyerOrg,
-              regions: detail.regions,
-              categories: detail.categories,
-              tenderType: detail.tenderType || null,
-              valueLow: detail.valueLow || null,
-              valueHigh: detail.valueHigh || null,
-              publishedAt: detail.publishedAt || null,
-              closesAt: detail.closesAt || null,
-              briefingAt: detail.briefingAt || null,
-              certificationsRequired: detail.certificationsRequired,
-              documentUrls: detail.documentUrls,
-            });
-          }
+        const detailCache: DetailCacheUpdate[] = [];
+        const results = adapter.fetchTenderDetails(fetchIds, { cached });
+        for await (const { sourceId, detail, error, cache, unchanged } of results) {
+          if (cache) detailCache.push({ sourceId, ...cache });
+          if (unchanged) continue;
+          if (!detail) throw error;
+          newTenders.push(toNewTender(account.site, sourceId, detail));
         }
 
-        // Update session data
-        const cookies = await context.cookies();
-
-        await db
-          .update(linkedAccounts)
-          .set({
-            sessionData: { cookies },
-            updatedAt: new Date(),
-          })
-          .where(eq(linkedAccounts.id, accountId));
+        // Save refreshed cookies, only if they changed. No logout: the
+        // session is kept for the next sync to reuse
+        const current = await adapter.captureSession();
+        if (sessionChanged(account.sessionData, current)) {
+          await db
+            .update(linkedAccounts)
+            .set({
+              sessionData: { ...current },
+              updatedAt: new Date(),
+            })
+            .where(eq(linkedAccounts.id, accountId));
+        }
 
-        await adapter.logout();
-        return newTenders;
+        failed = false;
+        return {
+          tenders: newTenders,
+          detailCache,
+          watermark,
+          resources: adapter.resourceReport,
+          session: session.via,
+          limits: portalLimiter.metrics(adapter.siteName)[0] ?? null,
+        };
       } finally {
-        await browser.close();
+        await adapter.dispose();
+        await lease.release({ discard: failed });
       }
     });
 
-    // Insert discovered tenders
+    // Upsert discovered tenders; only new or changed ones come back
     const insertedTenders = await step.run("insert-tenders", async () => {
-      const inserted = [];
-      for (const tender of discoveredTenders) {
-        const [result] = await db
-          .insert(tenders)
-          .values(tender as any)
-          .returning({ id: tenders.id });
-        if (result) inserted.push(result);
-      }
-      return inserted;
+      const ingested = await ingestTenders(discovered.tenders.map(reviveTender));
+      await resetTenderSummaries(tenderChangeWork(ingested).resummarize);
+      await saveDetailCacheUpdates(account.site, discovered.detailCache);
+      return ingested;
     });
 
+    // Only advance the watermark once the listings it covers are stored
+    if (discovered.watermark) {
+      await step.run("save-watermark", async () => {
+        await saveWatermark(account.site, discovered.watermark!);
+      });
+    }
+
     // Update account status
     await step.run("update-status", async () => {
       await db
@@ -141,14 +164,22 @@ export const syncAccount = inngest.createFunction(
         .where(eq(linkedAccounts.id, accountId));
     });
 
-    // Trigger processing for each new tender
-    for (const tender of insertedTenders) {
-      await step.sendEvent("queue-processing", {
-        name: "tender/process",
-        data: { tenderId: tender.id, accountId },
-      });
+    // New tenders get everything; amended ones only what their changes need
+    const work = tenderChangeWork(insertedTenders, { accountId });
+    if (work.process.length > 0) {
+      await step.sendEvent("queue-processing", work.process);
+    }
+
+    if (work.documents.length > 0) {
+      await step.sendEvent("queue-documents", work.documents);
     }
 
-    return { discovered: insertedTenders.length };
+    return {
+      discovered: insertedTenders.filter((t) => t.inserted).length,
+      changed: insertedTenders.filter((t) => !t.inserted).length,
+      resources: discovered.resources,
+      session: discovered.session,
+      limits: discovered.limits,
+    };
   }
 );
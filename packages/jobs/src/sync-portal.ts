@@ -0,0 +1,209 @@
+import { inngest } from "./client";
+import { db } from "@tenderwatch/db";
+import { linkedAccounts, ingestTenders, resetTenderSummaries } from "@tenderwatch/db";
+import type { NewTender } from "@tenderwatch/db";
+import { SITES } from "@tenderwatch/shared";
+import type { SiteKey } from "@tenderwatch/shared";
+import type { TenderSource } from "@tenderwatch/agent";
+import { eq, and, asc } from "drizzle-orm";
+import {
+  listingsToFetch,
+  listingsForThisSync,
+  toNewTender,
+  reviveTender,
+  loadWatermark,
+  saveWatermark,
+  toStoredWatermark,
+  detailCacheFor,
+  saveDetailCacheUpdates,
+} from "./discovery";
+import type { DetailCacheUpdate } from "./discovery";
+import { getBrowserPool } from "./browser-pool";
+import { tenderChangeWork } from "./tender-changes";
+
+function isPublicSite(site: string): site is SiteKey {
+  return site in SITES && SITES[site as SiteKey].publicListings;
+}
+
+/**
+ * Every 6 hours, crawl each portal once. Portals with public listings get a
+ * single shared portal/sync; only portals that gate their search behind a
+ * login still sync per linked account.
+ */
+export const schedulePortalSyncs = inngest.createFunction(
+  {
+    id: "schedule-portal-syncs",
+    retries: 1,
+  },
+  { cron: "0 */6 * * *" },
+  async ({ step }) => {
+    const accounts = await step.run("get-connected-accounts", async () => {
+      return db
+        .select({ id: linkedAccounts.id, site: linkedAccounts.site })
+        .from(linkedAccounts)
+        .where(eq(linkedAccounts.status, "connected"));
+    });
+
+    const publicSites = [...new Set(accounts.map((a) => a.site))].filter(isPublicSite);
+    const gatedAccounts = accounts.filter((a) => !isPublicSite(a.site));
+
+    const events = [
+      ...publicSites.map((site) => ({ name: "portal/sync" as const, data: { site } })),
+      ...gatedAccounts.map((a) => ({ name: "account/sync" as const, data: { accountId: a.id, site: a.site } })),
+    ];
+    if (events.length > 0) {
+      await step.sendEvent("queue-syncs", events);
+    }
+
+    return { portals: publicSites.length, accounts: gatedAccounts.length };
+  }
+);
+
+export const syncPortal = inngest.createFunction(
+  {
+    id: "sync-portal",
+    retries: 3,
+    concurrency: {
+      limit: 1,
+      key: "event.data.site",
+    },
+  },
+  { event: "portal/sync" },
+  async ({ event, step }) => {
+    const { site } = event.data as { site: SiteKey };
+    const { publicDetails } = SITES[site];
+
+    // One anonymous crawl of the listing pages for the whole portal
+    const crawl = await step.run("crawl-listings", async () => {
+      const { getAdapter, getHttpAdapter, advanceWatermark, RequiresBrowserError, portalLimiter } = await import("@tenderwatch/agent");
+
+      const sevenDaysAgo = new Date();
+      sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 7);
+      const previous = await loadWatermark(site);
+
+      const crawlWith = async (source: TenderSource) => {
+        // Only pages through listings newer than the last crawl
+        const listings = await source.search({
+          publishedAfter: sevenDaysAgo,
+          watermark: previous,
+        });
+        const { toFetch, processed } = listingsForThisSync(listings, await listingsToFetch(site, listings));
+        const watermark = toStoredWatermark(advanceWatermark(previous, processed));
+
+        if (!publicDetails) {
+          return { tenders: [], gatedSourceIds: toFetch.map((l) => l.sourceId), watermark, detailCache: [], unchanged: 0 };
+        }
+
+        // Known tenders are re-checked conditionally; unchanged ones are
+        // neither parsed again nor re-ingested
+        const sourceIds = toFetch.map((l) => l.sourceId);
+        const cached = await detailCacheFor(site, sourceIds);
+
+        const newTenders = [];
+        const gatedSourceIds: string[] = [];
+        const detailCache: DetailCacheUpdate[] = [];
+        let unchanged = 0;
+        const results = source.fetchTenderDetails(sourceIds, { cached });
+        for await (const { sourceId, detail, error, cache, unchanged: same } of results) {
+          if (cache) detailCache.push({ sourceId, ...cache });
+          if (detail) {
+            newTenders.push(toNewTender(site, sourceId, detail));
+          } else if (same) {
+            unchanged++;
+          } else if (error instanceof RequiresBrowserError) {
+            gatedSourceIds.push(sourceId);
+          } else {
+            throw error;
+          }
+        }
+        return { tenders: newTenders, gatedSourceIds, watermark, detailCache, unchanged };
+      };
+
+      // Portals with a public feed or API are read over plain HTTP; a
+      // browser is only started if that fails
+      const http = SITES[site].hasApi ? getHttpAdapter(site) : null;
+      if (http) {
+        try {
+          const result = await crawlWith(http);
+          return { ...result, transport: "http" as const, resources: null, limits: portalLimiter.metrics(http.siteName)[0] ?? null };
+        } catch (error) {
+          console.warn(`HTTP crawl of ${site} failed, falling back to the browser:`, error);
+        }
+      }
+
+      const lease = await (await getBrowserPool()).acquire(`portal:${site}`);
+      const adapter = getAdapter(site, lease.browser, lease.page);
+      let failed = true;
+
+      try {
+        const result = await crawlWith(adapter);
+        failed = false;
+        return {
+          ...result,
+          transport: "browser" as const,
+          resources: adapter.resourceReport,
+          limits: portalLimiter.metrics(adapter.siteName)[0] ?? null,
+        };
+      } finally {
+        await adapter.dispose();
+        await lease.release({ discard: failed });
+      }
+    });
+
+    const insertedTenders = await step.run("insert-tenders", async () => {
+      const ingested = await ingestTenders(crawl.tenders.map((t) => reviveTender(t as NewTender)));
+      await resetTenderSummaries(tenderChangeWork(ingested).resummarize);
+      await saveDetailCacheUpdates(site, crawl.detailCache);
+      return ingested;
+    });
+
+    // Only advance the watermark once the listings it covers are stored.
+    // When some detail pages need a login, that is once the account sync
+    // below has stored them, so the watermark travels with the handoff.
+    if (crawl.gatedSourceIds.length === 0) {
+      await step.run("save-watermark", async () => {
+        await saveWatermark(site, crawl.watermark);
+      });
+    }
+
+    // New tenders get everything; amended ones only what their changes need
+    const work = tenderChangeWork(insertedTenders, { site });
+    if (work.process.length > 0) {
+      await step.sendEvent("queue-processing", work.process);
+    }
+
+    if (work.documents.length > 0) {
+      await step.sendEvent("queue-documents", work.documents);
+    }
+
+    // Gated detail pages go to one logged-in account, the least recently synced
+    if (crawl.gatedSourceIds.length > 0) {
+      const account = await step.run("pick-account", async () => {
+        const [row] = await db
+          .select({ id: linkedAccounts.id })
+          .from(linkedAccounts)
+          .where(and(eq(linkedAccounts.site, site), eq(linkedAccounts.status, "connected")))
+          .orderBy(asc(linkedAccounts.lastSyncAt))
+          .limit(1);
+        return row ?? null;
+      });
+
+      if (account) {
+        await step.sendEvent("queue-gated-details", {
+          name: "account/sync",
+          data: { accountId: account.id, site, sourceIds: crawl.gatedSourceIds, watermark: crawl.watermark },
+        });
+      }
+    }
+
+    return {
+      discovered: insertedTenders.filter((t) => t.inserted).length,
+      changed: insertedTenders.filter((t) => !t.inserted).length,
+      unchanged: crawl.unchanged,
+      gated: crawl.gatedSourceIds.length,
+      transport: crawl.transport,
+      resources: crawl.resources,
+      limits: crawl.limits,
+    };
+  }
+);
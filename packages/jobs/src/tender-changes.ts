@@ -0,0 +1,77 @@
+import type { IngestedTender, TenderField } from "@tenderwatch/db";
+import { processBatchEvents } from "./discovery";
+import { documentFetchEvents } from "./documents";
+
+/**
+ * What an ingested tender needs redoing. New tenders need everything; an
+ * amended one only what reads the fields that changed, and nothing at all
+ * if none of those did.
+ */
+export interface TenderChangePlan {
+  // Rerun keyword matching and scoring, or only the hard filters
+  match: "full" | "filters" | null;
+  resummarize: boolean;
+  // Tell watchers already notified about the tender that it changed
+  notify: boolean;
+  fetchDocuments: boolean;
+}
+
+// Read by keyword matching and scoring
+const MATCH_FIELDS: TenderField[] = ["title", "description", "fullText", "buyerOrg", "categories", "certificationsRequired"];
+// Read only by the hard filters
+const FILTER_FIELDS: TenderField[] = ["regions", "valueLow", "valueHigh", "closesAt"];
+// What summaries are written from
+const SUMMARY_FIELDS: TenderField[] = ["title", "description", "fullText", "buyerOrg"];
+// Amendments and addenda bidders need to hear about
+const NOTIFY_FIELDS: TenderField[] = ["closesAt", "briefingAt", "documentUrls"];
+
+export function classifyTenderChange(tender: IngestedTender): TenderChangePlan {
+  if (tender.inserted) {
+    return { match: "full", resummarize: false, notify: false, fetchDocuments: true };
+  }
+  const changed = new Set(tender.changedFields);
+  const touches = (fields: TenderField[]) => fields.some((field) => changed.has(field));
+  return {
+    match: touches(MATCH_FIELDS) ? "full" : touches(FILTER_FIELDS) ? "filters" : null,
+    resummarize: touches(SUMMARY_FIELDS),
+    notify: touches(NOTIFY_FIELDS),
+    fetchDocuments: changed.has("documentUrls")
+  };
+}
+
+export interface TenderWork {
+  process: ReturnType<typeof processBatchEvents>;
+  documents: ReturnType<typeof documentFetchEvents>;
+  // Tenders whose summaries are out of date
+  resummarize: string[];
+}
+
+/**
+ * The events and summary resets for a batch of ingested tenders. Tenders
+ * are batched by how they need matching, so each tender/process.batch run
+ * does one kind of work.
+ */
+export function tenderChangeWork(ingested: IngestedTender[], extra: Record<string, unknown> = {}): TenderWork {
+  const plans = ingested.map((tender) => ({ id: tender.id, plan: classifyTenderChange(tender) }));
+  const idsWhere = (test: (plan: TenderChangePlan) => boolean) => plans.filter((p) => test(p.plan)).map((p) => p.id);
+
+  const process = [];
+  for (const match of ["full", "filters", null] as const) {
+    for (const notify of [false, true]) {
+      // Unchanged as far as matching goes, and nobody to tell
+      if (match === null && !notify) continue;
+      const ids = idsWhere((plan) => plan.match === match && plan.notify === notify);
+      process.push(...processBatchEvents(ids, {
+        ...extra,
+        ...(match !== "full" && { match: match ?? "none" }),
+        ...(notify && { notify: true }),
+      }));
+    }
+  }
+
+  return {
+    process,
+    documents: documentFetchEvents(idsWhere((plan) => plan.fetchDocuments), extra),
+    resummarize: idsWhere((plan) => plan.resummarize),
+  };
+}
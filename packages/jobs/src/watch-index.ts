@@ -0,0 +1,103 @@
+import { db } from "@tenderwatch/db";
+import { watches } from "@tenderwatch/db";
+import type { Watch, Tender } from "@tenderwatch/db";
+import { eq, gte, sql } from "drizzle-orm";
+import { WatchIndex } from "@tenderwatch/processor";
+import type { MatchConfig, TenderForMatching } from "@tenderwatch/processor";
+
+// Kept warm across invocations handled by the same worker
+const index = new WatchIndex();
+let syncedThrough: Date | null = null;
+
+// Rows are re-read this far behind the last sync: updated_at is stamped by
+// application clocks, and a row can commit a while after it was stamped
+const SYNC_OVERLAP_MS = 2 * 60 * 1000;
+
+async function databaseNow(): Promise<Date> {
+  const [row] = await db.execute(sql`select now()::text as now`);
+  return new Date(row.now as string);
+}
+
+export function toMatchConfig(watch: Watch): MatchConfig {
+  return {
+    keywordsMust: watch.keywordsMust || [],
+    keywordsBonus: watch.keywordsBonus || [],
+    keywordsExclude: watch.keywordsExclude || [],
+    regions: watch.regions || [],
+    valueMin: watch.valueMin || undefined,
+    valueMax: watch.valueMax || undefined,
+    includeUnspecifiedValue: watch.includeUnspecifiedValue ?? true,
+    minResponseDays: watch.minResponseDays || undefined,
+    preferredSectors: watch.preferredSectors || [],
+    preferredBuyers: watch.preferredBuyers || [],
+    certificationsHeld: watch.certificationsHeld || [],
+    sensitivity: watch.sensitivity
+  };
+}
+
+// Accepts step output too, where timestamps have been serialised to strings
+export function toTenderForMatching(tender: Tender | Record<string, any>): TenderForMatching {
+  return {
+    title: tender.title,
+    description: tender.description || "",
+    fullText: tender.fullText || undefined,
+    regions: tender.regions || [],
+    categories: tender.categories || [],
+    buyerOrg: tender.buyerOrg || undefined,
+    valueLow: tender.valueLow || undefined,
+    valueHigh: tender.valueHigh || undefined,
+    closesAt: tender.closesAt ? new Date(tender.closesAt) : undefined,
+    certificationsRequired: tender.certificationsRequired || []
+  };
+}
+
+function apply(watch: Watch) {
+  if (watch.isActive) {
+    index.upsert(watch.id, toMatchConfig(watch));
+  } else {
+    index.remove(watch.id);
+  }
+}
+
+async function reload() {
+  index.clear();
+  syncedThrough = null;
+  const startedAt = await databaseNow();
+  const rows = await db.query.watches.findMany({
+    where: eq(watches.isActive, true)
+  });
+  for (const watch of rows) apply(watch);
+  syncedThrough = startedAt;
+}
+
+/**
+ * Returns the shared WatchIndex, brought up to date with watches created,
+ * edited or deactivated since the last call. Only changed rows are loaded;
+ * a full reload happens on cold start or when watches were deleted outright.
+ */
+export async function getWatchIndex(): Promise<WatchIndex> {
+  if (!syncedThrough) {
+    await reload();
+    return index;
+  }
+
+  // The watermark is the database's clock at the start of the sync, not the
+  // newest updated_at seen. Re-applying rows inside the overlap is idempotent.
+  const startedAt = await databaseNow();
+  const changed = await db.query.watches.findMany({
+    where: gte(watches.updatedAt, new Date(syncedThrough.getTime() - SYNC_OVERLAP_MS))
+  });
+  for (const watch of changed) apply(watch);
+  syncedThrough = startedAt;
+
+  // Deleted rows leave no trace to sync from, so compare counts
+  const [{ active }] = await db
+    .select({ active: sql<number>`count(*)::int` })
+    .from(watches)
+    .where(eq(watches.isActive, true));
+  if (active !== index.size) {
+    await reload();
+  }
+
+  return index;
+}
@@ -0,0 +1,136 @@
+/**
+ * Minimal client for the Message Batches API over fetch. The version of
+ * @anthropic-ai/sdk this package pins predates batches.
+ */
+
+import type { PromptBlock } from "../summarizer";
+import type { TokenUsage } from "../usage";
+
+export interface BatchRequest {
+  // At most 64 characters; summary cache keys (sha256 hex) fit exactly
+  custom_id: string;
+  params: {
+    model: string;
+    max_tokens: number;
+    messages: { role: "user" | "assistant"; content: string | PromptBlock[] }[];
+  };
+}
+
+export interface MessageBatch {
+  id: string;
+  processing_status: "in_progress" | "canceling" | "ended";
+  request_counts: {
+    processing: number;
+    succeeded: number;
+    errored: number;
+    canceled: number;
+    expired: number;
+  };
+  created_at: string;
+  ended_at: string | null;
+  expires_at: string;
+  results_url: string | null;
+}
+
+export type BatchResult =
+  | {
+      custom_id: string;
+      result: { type: "succeeded"; message: { content: { type: string; text?: string }[]; usage?: TokenUsage } };
+    }
+  | { custom_id: string; result: { type: "errored"; error: unknown } }
+  | { custom_id: string; result: { type: "canceled" | "expired" } };
+
+export interface MessageBatchClientOptions {
+  apiKey?: string;
+  // e.g. a MockBatchServer's origin
+  baseUrl?: string;
+  fetch?: typeof fetch;
+}
+
+// Requests per batch accepted by the API
+export const MAX_BATCH_REQUESTS = 100_000;
+
+const API_VERSION = "2023-06-01";
+
+export class MessageBatchError extends Error {
+  constructor(message: string, readonly status: number) {
+    super(message);
+    this.name = "MessageBatchError";
+  }
+}
+
+export class MessageBatchClient {
+  private readonly apiKey: string;
+  private readonly baseUrl: string;
+  private readonly fetch: typeof fetch;
+
+  constructor(options: MessageBatchClientOptions = {}) {
+    this.apiKey = options.apiKey ?? process.env.ANTHROPIC_API_KEY ?? "";
+    this.baseUrl = (options.baseUrl ?? process.env.ANTHROPIC_BASE_URL ?? "https://api.anthropic.com").replace(/\/$/, "");
+    this.fetch = options.fetch ?? ((input, init) => fetch(input, init));
+  }
+
+  create(requests: BatchRequest[]): Promise<MessageBatch> {
+    if (requests.length > MAX_BATCH_REQUESTS) {
+      throw new Error(`A batch takes at most ${MAX_BATCH_REQUESTS} requests, got ${requests.length}`);
+    }
+    return this.json("POST", "/v1/messages/batches", { requests });
+  }
+
+  retrieve(batchId: string): Promise<MessageBatch> {
+    return this.json("GET", `/v1/messages/batches/${batchId}`);
+  }
+
+  cancel(batchId: string): Promise<MessageBatch> {
+    return this.json("POST", `/v1/messages/batches/${batchId}/cancel`);
+  }
+
+  /** Results of an ended batch, in no particular order. */
+  async *results(batch: MessageBatch): AsyncGenerator<BatchResult> {
+    if (!batch.results_url) throw new Error(`Batch ${batch.id} has no results yet`);
+    const res = await this.request("GET", batch.results_url);
+    if (!res.body) return;
+
+    // JSON Lines, read as it streams in rather than all at once
+    const decoder = new TextDecoder();
+    let buffered = "";
+    for await (const chunk of res.body as unknown as AsyncIterable<Uint8Array>) {
+      buffered += decoder.decode(chunk, { stream: true });
+      let newline: number;
+      while ((newline = buffered.indexOf("\n")) >= 0) {
+        const line = buffered.slice(0, newline).trim();
+        buffered = buffered.slice(newline + 1);
+        if (line) yield JSON.parse(line) as BatchResult;
+      }
+    }
+    if (buffered.trim()) yield JSON.parse(buffered) as BatchResult;
+  }
+
+  private async json<T>(method: string, path: string, body?: unknown): Promise<T> {
+    const res = await this.request(method, path, body);
+    return (await res.json()) as T;
+  }
+
+  private async request(method: string, pathOrUrl: string, body?: unknown): Promise<Response> {
+    const url = pathOrUrl.startsWith("http") ? pathOrUrl : `${this.baseUrl}${pathOrUrl}`;
+    const res = await this.fetch(url, {
+      method,
+      headers: {
+        "x-api-key": this.apiKey,
+        "anthropic-version": API_VERSION,
+        ...(body !== undefined && { "content-type": "application/json" }),
+      },
+      body: body !== undefined ? JSON.stringify(body) : undefined,
+    });
+    if (!res.ok) {
+      throw new MessageBatchError(`${method} ${url} failed: ${res.status} ${await res.text()}`, res.status);
+    }
+    return res;
+  }
+}
+
+/** The text of a succeeded result, or null. */
+export function batchResultText(result: BatchResult): string | null {
+  if (result.result.type !== "succeeded") return null;
+  return result.result.message.content.find(c => c.type === "text")?.text || null;
+}
@@ -0,0 +1,138 @@
+import { createServer } from "node:http";
+import type { IncomingMessage, Server, ServerResponse } from "node:http";
+import type { AddressInfo } from "node:net";
+import type { BatchRequest, BatchResult, MessageBatch } from "./client";
+
+export interface MockBatchServerOptions {
+  // How long a batch stays in progress after it's created
+  processingMs?: number;
+  // The reply to each request; return null to make it error
+  respond?: (request: BatchRequest) => string | null;
+}
+
+interface MockBatch {
+  batch: MessageBatch;
+  requests: BatchRequest[];
+  endsAt: number;
+  canceled: boolean;
+}
+
+/**
+ * A local stand-in for the Message Batches API, for tests and offline
+ * development. Point a MessageBatchClient at start()'s origin.
+ */
+export class MockBatchServer {
+  private server: Server | null = null;
+  private origin = "";
+  private batches = new Map<string, MockBatch>();
+  private nextId = 1;
+  private readonly processingMs: number;
+  private readonly respond: (request: BatchRequest) => string | null;
+
+  constructor(options: MockBatchServerOptions = {}) {
+    this.processingMs = options.processingMs ?? 0;
+    this.respond = options.respond ?? ((request) => `Summary of ${request.custom_id}`);
+  }
+
+  /** Listen on a free local port and return the server's origin. */
+  async start(): Promise<string> {
+    const server = createServer((req, res) => void this.serve(req, res));
+    await new Promise<void>((resolve) => server.listen(0, "127.0.0.1", resolve));
+    this.server = server;
+    this.origin = `http://127.0.0.1:${(server.address() as AddressInfo).port}`;
+    return this.origin;
+  }
+
+  async close(): Promise<void> {
+    const server = this.server;
+    this.server = null;
+    if (server) await new Promise<void>((resolve) => server.close(() => resolve()));
+  }
+
+  /** Requests submitted so far, across all batches. */
+  submitted(): BatchRequest[] {
+    return [...this.batches.values()].flatMap((b) => b.requests);
+  }
+
+  private async serve(req: IncomingMessage, res: ServerResponse): Promise<void> {
+    const chunks: Buffer[] = [];
+    for await (const chunk of req) chunks.push(chunk as Buffer);
+    const path = new URL(req.url ?? "/", this.origin).pathname;
+    const route = path.match(/^\/v1\/messages\/batches(?:\/([^/]+))?(?:\/(\w+))?$/);
+    if (!route) return this.send(res, 404, { error: "Not found" });
+    const [, batchId, action] = route;
+
+    if (req.method === "POST" && !batchId) {
+      const { requests } = JSON.parse(Buffer.concat(chunks).toString()) as { requests: BatchRequest[] };
+      return this.send(res, 200, this.create(requests));
+    }
+
+    const mock = batchId ? this.batches.get(batchId) : undefined;
+    if (!mock) return this.send(res, 404, { error: `No batch ${batchId}` });
+    this.settle(mock);
+
+    if (req.method === "GET" && !action) return this.send(res, 200, mock.batch);
+    if (req.method === "POST" && action === "cancel") {
+      if (mock.batch.processing_status === "in_progress") this.end(mock, true);
+      return this.send(res, 200, mock.batch);
+    }
+    if (req.method === "GET" && action === "results") {
+      if (mock.batch.processing_status !== "ended") return this.send(res, 400, { error: "Batch has not ended" });
+      res.writeHead(200, { "content-type": "application/x-jsonl" });
+      res.end(mock.requests.map((request) => JSON.stringify(this.resultFor(mock, request))).join("\n"));
+      return;
+    }
+    this.send(res, 404, { error: "Not found" });
+  }
+
+  private create(requests: BatchRequest[]): MessageBatch {
+    const id = `msgbatch_mock_${this.nextId++}`;
+    const now = Date.now();
+    const batch: MessageBatch = {
+      id,
+      processing_status: "in_progress",
+      request_counts: { processing: requests.length, succeeded: 0, errored: 0, canceled: 0, expired: 0 },
+      created_at: new Date(now).toISOString(),
+      ended_at: null,
+      expires_at: new Date(now + 24 * 60 * 60 * 1000).toISOString(),
+      results_url: null,
+    };
+    const mock = { batch, requests, endsAt: now + this.processingMs, canceled: false };
+    this.batches.set(id, mock);
+    this.settle(mock);
+    return batch;
+  }
+
+  private settle(mock: MockBatch): void {
+    if (mock.batch.processing_status === "in_progress" && Date.now() >= mock.endsAt) this.end(mock, false);
+  }
+
+  private end(mock: MockBatch, canceled: boolean): void {
+    const counts = mock.batch.request_counts;
+    for (const request of mock.requests) {
+      const type = canceled ? "canceled" : this.respond(request) === null ? "errored" : "succeeded";
+      counts[type]++;
+    }
+    counts.processing = 0;
+    mock.batch.processing_status = "ended";
+    mock.batch.ended_at = new Date().toISOString();
+    mock.batch.results_url = `${this.origin}/v1/messages/batches/${mock.batch.id}/results`;
+    mock.canceled = canceled;
+  }
+
+  private resultFor(mock: MockBatch, request: BatchRequest): BatchResult {
+    if (mock.canceled) return { custom_id: request.custom_id, result: { type: "canceled" } };
+    const text = this.respond(request);
+    if (text === null) {
+      return { custom_id: request.custom_id, result: { type: "errored", error: { type: "api_error", message: "Mock error" } } };
+    }
+    return {
+      custom_id: request.custom_id,
+      result: { type: "succeeded", message: { content: [{ type: "text", text }] } },
+    };
+  }
+
+  private send(res: ServerResponse, status: number, body: unknown): void {
+    res.writeHead(status, { "content-type": "application/json" }).end(JSON.stringify(body));
+  }
+}
@@ -0,0 +1,117 @@
+import { SUMMARY_MODEL, summaryMessageParams } from "../summarizer";
+import type { SummaryRequest } from "../summarizer";
+import type { SummaryCache } from "../summary-cache";
+import type { TokenUsageMeter } from "../usage";
+import { batchResultText, MAX_BATCH_REQUESTS } from "./client";
+import type { MessageBatch, MessageBatchClient } from "./client";
+
+export interface PendingSummary {
+  // Whatever the caller writes each summary to, e.g. match ids
+  targets: string[];
+  tenderId: string | null;
+  detailLevel: string;
+}
+
+export interface SubmittedSummaries {
+  batchId: string | null;
+  // Requests in the batch. Which targets they belong to isn't returned:
+  // rebuild it with pendingSummaries() when collecting, so a large batch
+  // never has to be kept in job step state.
+  batched: number;
+  // Targets answered from the cache without a batch
+  cached: { targets: string[]; summary: string }[];
+}
+
+export interface CollectedSummaries {
+  written: { targets: string[]; summary: string }[];
+  // Requests that errored, expired or were canceled
+  failed: PendingSummary[];
+}
+
+type SummaryItem = { target: string; request: SummaryRequest; tenderId?: string };
+
+function groupByKey(items: SummaryItem[]): Map<string, { request: SummaryRequest; pending: PendingSummary }> {
+  const byKey = new Map<string, { request: SummaryRequest; pending: PendingSummary }>();
+  for (const { target, request, tenderId } of items) {
+    const entry = byKey.get(request.key);
+    if (entry) {
+      entry.pending.targets.push(target);
+    } else {
+      byKey.set(request.key, {
+        request,
+        pending: { targets: [target], tenderId: tenderId ?? null, detailLevel: request.detailLevel },
+      });
+    }
+  }
+  return byKey;
+}
+
+/**
+ * Summary requests by key (the batch's custom_id), each with the targets it
+ * is written to. Built from the same items as the batch, it maps the
+ * batch's results back to targets.
+ */
+export function pendingSummaries(items: SummaryItem[]): Record<string, PendingSummary> {
+  const pending: Record<string, PendingSummary> = {};
+  for (const [key, entry] of groupByKey(items)) pending[key] = entry.pending;
+  return pending;
+}
+
+/**
+ * Submit summary requests as one message batch. Requests answered by the
+ * cache are returned straight away, and requests with the same key (the
+ * same tender and context) are sent once for all their targets.
+ */
+export async function submitSummaryBatch(
+  items: SummaryItem[],
+  options: { client: MessageBatchClient; cache?: SummaryCache }
+): Promise<SubmittedSummaries> {
+  const cached: SubmittedSummaries["cached"] = [];
+  const requests = [];
+  for (const [key, entry] of groupByKey(items)) {
+    const summary = await options.cache?.lookup(key);
+    if (summary) {
+      cached.push({ targets: entry.pending.targets, summary });
+    } else if (requests.length < MAX_BATCH_REQUESTS) {
+      // Anything over the limit waits for the next batch
+      requests.push({ custom_id: key, params: summaryMessageParams(entry.request) });
+    }
+  }
+
+  const batch = requests.length > 0 ? await options.client.create(requests) : null;
+  return { batchId: batch?.id ?? null, batched: requests.length, cached };
+}
+
+/**
+ * Read the results of an ended batch back into summaries for each pending
+ * target, caching every one that succeeded. `pending` may hold keys that
+ * weren't in the batch; only the batch's own requests are written or
+ * reported as failed.
+ */
+export async function collectSummaryBatch(
+  batch: MessageBatch,
+  pending: Record<string, PendingSummary>,
+  options: { client: MessageBatchClient; cache?: SummaryCache; usage?: TokenUsageMeter }
+): Promise<CollectedSummaries> {
+  const collected: CollectedSummaries = { written: [], failed: [] };
+
+  for await (const result of options.client.results(batch)) {
+    const entry = pending[result.custom_id];
+    if (!entry) continue;
+    if (result.result.type === "succeeded") options.usage?.record(entry.detailLevel, result.result.message.usage);
+
+    const summary = batchResultText(result);
+    if (!summary) {
+      collected.failed.push(entry);
+      continue;
+    }
+    await options.cache?.put(
+      result.custom_id,
+      { tenderId: entry.tenderId, detailLevel: entry.detailLevel, model: SUMMARY_MODEL },
+      summary
+    );
+    collected.written.push({ targets: entry.targets, summary });
+  }
+
+  return collected;
+}
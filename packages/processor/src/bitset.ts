@@ -0,0 +1,75 @@
+/**
+ * Growable bitset over watch slots.
+ */
+export class Bitset {
+  private words: Uint32Array;
+
+  constructor(capacity = 64) {
+    this.words = new Uint32Array(Math.max(1, Math.ceil(capacity / 32)));
+  }
+
+  private ensure(bit: number): void {
+    const needed = (bit >>> 5) + 1;
+    if (needed <= this.words.length) return;
+    const grown = new Uint32Array(Math.max(needed, this.words.length * 2));
+    grown.set(this.words);
+    this.words = grown;
+  }
+
+  set(bit: number): void {
+    this.ensure(bit);
+    this.words[bit >>> 5] |= 1 << (bit & 31);
+  }
+
+  clear(bit: number): void {
+    const word = bit >>> 5;
+    if (word < this.words.length) {
+      this.words[word] &= ~(1 << (bit & 31));
+    }
+  }
+
+  has(bit: number): boolean {
+    const word = bit >>> 5;
+    return word < this.words.length && (this.words[word] & (1 << (bit & 31))) !== 0;
+  }
+
+  isEmpty(): boolean {
+    return this.words.every(w => w === 0);
+  }
+
+  clone(): Bitset {
+    const copy = new Bitset(0);
+    copy.words = this.words.slice();
+    return copy;
+  }
+
+  /** In-place union. */
+  or(other: Bitset): this {
+    if (other.words.length > this.words.length) {
+      this.ensure(other.words.length * 32 - 1);
+    }
+    for (let i = 0; i < other.words.length; i++) {
+      this.words[i] |= other.words[i];
+    }
+    return this;
+  }
+
+  /** In-place intersection. */
+  and(other: Bitset): this {
+    for (let i = 0; i < this.words.length; i++) {
+      this.words[i] &= i < other.words.length ? other.words[i] : 0;
+    }
+    return this;
+  }
+
+  *[Symbol.iterator](): IterableIterator<number> {
+    for (let i = 0; i < this.words.length; i++) {
+      let word = this.words[i];
+      while (word !== 0) {
+        const low = word & -word;
+        yield i * 32 + (31 - Math.clz32(low));
+        word ^= low;
+      }
+    }
+  }
+}
@@ -0,0 +1,91 @@
+/**
+ * One canonical, context-free reading of a tender, written once from its
+ * full text. Personalised summaries are generated from this instead of the
+ * full text, so a tender matched by many watches is only read in full once.
+ */
+export interface TenderDigest {
+  version: number;
+  overview: string;
+  deliverables: string[];
+  requirements: string[];
+  evaluationCriteria: string[];
+  redFlags: string[];
+}
+
+// Bump when the digest prompt changes, so stored digests are regenerated
+export const DIGEST_VERSION = 1;
+
+// The digest is paid for once per tender, so it can read far more than a
+// per-watch summary could
+export const DIGEST_TEXT_CHARS = 30_000;
+
+export interface DigestInput {
+  title: string;
+  description: string;
+  fullText?: string;
+  buyerOrg: string;
+}
+
+export function buildDigestPrompt(tender: DigestInput): string {
+  return `Read this tender and extract a neutral digest of it as JSON. Don't tailor it to any bidder.
+
+Tender: ${tender.title}
+Buyer: ${tender.buyerOrg}
+
+Full content:
+${tender.fullText?.slice(0, DIGEST_TEXT_CHARS) || tender.description}
+
+Respond with only a JSON object with these keys:
+- "overview": what is being procured, by whom and why, in 2-3 sentences
+- "deliverables": the goods, services or outcomes to be delivered
+- "requirements": mandatory requirements, eligibility conditions, certifications and insurances
+- "evaluationCriteria": how responses will be evaluated, with weightings if given
+- "redFlags": unusual terms, tight timeframes, incumbents, onerous liabilities or anything else a bidder should be wary of
+
+Each list holds short strings, at most 10 of them. Use an empty list when the tender says nothing on a topic.`;
+}
+
+function stringList(value: unknown): string[] {
+  return Array.isArray(value) ? value.filter((v): v is string => typeof v === "string" && v.trim() !== "").map(v => v.trim()) : [];
+}
+
+/**
+ * The digest in a model response, tolerating text around the JSON object.
+ * Returns null if there isn't one.
+ */
+export function parseTenderDigest(text: string): TenderDigest | null {
+  const start = text.indexOf("{");
+  const end = text.lastIndexOf("}");
+  if (start < 0 || end <= start) return null;
+  try {
+    const raw = JSON.parse(text.slice(start, end + 1));
+    if (typeof raw.overview !== "string" || raw.overview.trim() === "") return null;
+    return {
+      version: DIGEST_VERSION,
+      overview: raw.overview.trim(),
+      deliverables: stringList(raw.deliverables),
+      requirements: stringList(raw.requirements),
+      evaluationCriteria: stringList(raw.evaluationCriteria),
+      redFlags: stringList(raw.redFlags),
+    };
+  } catch {
+    return null;
+  }
+}
+
+/** A stored digest (tenders.llmExtractedData) if it is current. */
+export function storedDigest(value: unknown): TenderDigest | null {
+  const digest = value as TenderDigest | null;
+  return digest && typeof digest === "object" && digest.version === DIGEST_VERSION ? digest : null;
+}
+
+/** The digest as compact text for a prompt. */
+export function renderTenderDigest(digest: TenderDigest): string {
+  const section = (heading: string, items: string[]) =>
+    items.length ? `\n${heading}:\n${items.map(item => `- ${item}`).join("\n")}` : "";
+  return `Overview: ${digest.overview}` +
+    section("Deliverables", digest.deliverables) +
+    section("Requirements", digest.requirements) +
+    section("Evaluation criteria", digest.evaluationCriteria) +
+    section("Red flags", digest.redFlags);
+}
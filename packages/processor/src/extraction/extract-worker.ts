@@ -0,0 +1,63 @@
+import { parentPort } from "node:worker_threads";
+// The lib entry skips pdf-parse's debug harness, which tries to read a
+// bundled test PDF whenever the package index is loaded from a bundle
+import pdfParse from "pdf-parse/lib/pdf-parse.js";
+
+export interface ExtractRequest {
+  id: number;
+  data: Uint8Array;
+  kind: "pdf" | "html" | "text";
+  maxPages: number;
+  maxChars: number;
+}
+
+export type ExtractReply =
+  | { id: number; text: string; pages: number; truncated: boolean }
+  | { id: number; error: string };
+
+function htmlToText(html: string): string {
+  return html
+    .replace(/<script\b[\s\S]*?<\/script>|<style\b[\s\S]*?<\/style>/gi, " ")
+    .replace(/<\/(p|div|li|tr|h[1-6])>|<br\s*\/?>/gi, "\n")
+    .replace(/<[^>]+>/g, " ")
+    .replace(/&nbsp;/g, " ")
+    .replace(/&amp;/g, "&")
+    .replace(/&lt;/g, "<")
+    .replace(/&gt;/g, ">");
+}
+
+function tidy(text: string): string {
+  return text.replace(/[ \t\f\v]+/g, " ").replace(/\s*\n\s*/g, "\n").trim();
+}
+
+async function extract(request: ExtractRequest): Promise<ExtractReply> {
+  const buffer = Buffer.from(request.data.buffer, request.data.byteOffset, request.data.byteLength);
+  let text: string;
+  let pages = 1;
+  let truncated = false;
+
+  if (request.kind === "pdf") {
+    const result = await pdfParse(buffer, { max: request.maxPages });
+    text = result.text;
+    pages = Math.min(result.numpages, request.maxPages);
+    truncated = result.numpages > request.maxPages;
+  } else {
+    const raw = buffer.toString("utf8");
+    text = request.kind === "html" ? htmlToText(raw) : raw;
+  }
+
+  text = tidy(text);
+  if (text.length > request.maxChars) {
+    text = text.slice(0, request.maxChars);
+    truncated = true;
+  }
+  return { id: request.id, text, pages, truncated };
+}
+
+parentPort?.on("message", async (request: ExtractRequest) => {
+  try {
+    parentPort!.postMessage(await extract(request));
+  } catch (error) {
+    parentPort!.postMessage({ id: request.id, error: error instanceof Error ? error.message : String(error) });
+  }
+});
@@ -0,0 +1,179 @@
+import { Worker } from "node:worker_threads";
+import { availableParallelism } from "node:os";
+import type { ExtractReply, ExtractRequest } from "./extract-worker";
+
+export interface ExtractionPoolOptions {
+  size?: number;
+  // A document still parsing after this long has its worker terminated
+  timeoutMs?: number;
+  maxPages?: number;
+  maxChars?: number;
+}
+
+export interface ExtractedText {
+  text: string;
+  pages: number;
+  // Page or character limit cut the text short
+  truncated: boolean;
+}
+
+export class ExtractionTimeoutError extends Error {
+  constructor(public readonly timeoutMs: number) {
+    super(`Document extraction timed out after ${timeoutMs}ms`);
+    this.name = "ExtractionTimeoutError";
+  }
+}
+
+type DocumentKind = ExtractRequest["kind"];
+
+interface Job {
+  request: ExtractRequest;
+  timeoutMs: number;
+  resolve: (result: ExtractedText) => void;
+  reject: (error: Error) => void;
+}
+
+interface Slot {
+  worker: Worker;
+  job: Job | null;
+  timer?: ReturnType<typeof setTimeout>;
+}
+
+/**
+ * What kind of document this is, from its content type or, failing that,
+ * its first bytes. Null for formats we can't extract (Word, ZIP, images).
+ */
+export function documentKind(contentType: string, head: Uint8Array): DocumentKind | null {
+  const type = contentType.toLowerCase();
+  if (type.includes("pdf") || Buffer.from(head.subarray(0, 5)).toString("latin1") === "%PDF-") return "pdf";
+  if (type.includes("html")) return "html";
+  if (type.startsWith("text/")) return "text";
+  return null;
+}
+
+/**
+ * Extracts text from tender documents on a pool of worker threads, so
+ * parsing a 200-page PDF never blocks the event loop running job steps.
+ * A document that exceeds its timeout has its worker terminated and
+ * replaced; the other documents carry on.
+ */
+export class ExtractionPool {
+  private readonly options: Required<ExtractionPoolOptions>;
+  private slots: Slot[] = [];
+  private queue: Job[] = [];
+  private nextId = 1;
+  private closed = false;
+
+  constructor(options: ExtractionPoolOptions = {}) {
+    this.options = {
+      size: Math.max(1, availableParallelism() - 1),
+      timeoutMs: 60_000,
+      maxPages: 300,
+      maxChars: 500_000,
+      ...options,
+    };
+  }
+
+  /**
+   * Extract text from a document, or resolve to null if its format isn't
+   * supported. The buffer is transferred to the worker and can't be used
+   * afterwards.
+   */
+  extract(
+    data: Buffer,
+    contentType: string,
+    options: { timeoutMs?: number; maxPages?: number } = {}
+  ): Promise<ExtractedText | null> {
+    if (this.closed) return Promise.reject(new Error("ExtractionPool is closed"));
+    const kind = documentKind(contentType, data);
+    if (!kind) return Promise.resolve(null);
+
+    return new Promise<ExtractedText>((resolve, reject) => {
+      this.queue.push({
+        request: {
+          id: this.nextId++,
+          data: new Uint8Array(data.buffer, data.byteOffset, data.byteLength),
+          kind,
+          maxPages: options.maxPages ?? this.options.maxPages,
+          maxChars: this.options.maxChars,
+        },
+        timeoutMs: options.timeoutMs ?? this.options.timeoutMs,
+        resolve,
+        reject,
+      });
+      this.dispatch();
+    });
+  }
+
+  async close(): Promise<void> {
+    this.closed = true;
+    for (const job of this.queue.splice(0)) job.reject(new Error("ExtractionPool is closed"));
+    await Promise.all(this.slots.map((slot) => this.retire(slot, new Error("ExtractionPool is closed"))));
+  }
+
+  private dispatch(): void {
+    while (this.queue.length) {
+      let slot = this.slots.find((s) => !s.job);
+      if (!slot) {
+        if (this.slots.length >= this.options.size) return;
+        slot = this.spawn();
+      }
+      this.run(slot, this.queue.shift()!);
+    }
+  }
+
+  private spawn(): Slot {
+    const worker = new Worker(new URL("./extract-worker.ts", import.meta.url));
+    const slot: Slot = { worker, job: null };
+
+    worker.on("message", (reply: ExtractReply) => {
+      const job = slot.job;
+      if (!job || job.request.id !== reply.id) return;
+      this.finish(slot);
+      if ("error" in reply) {
+        job.reject(new Error(reply.error));
+      } else {
+        job.resolve({ text: reply.text, pages: reply.pages, truncated: reply.truncated });
+      }
+      this.dispatch();
+    });
+    worker.on("error", (error) => {
+      void this.retire(slot, error);
+    });
+    // Idle workers shouldn't keep a finished process alive
+    worker.unref();
+
+    this.slots.push(slot);
+    return slot;
+  }
+
+  private run(slot: Slot, job: Job): void {
+    slot.job = job;
+    slot.worker.ref();
+    slot.timer = setTimeout(() => {
+      void this.retire(slot, new ExtractionTimeoutError(job.timeoutMs));
+    }, job.timeoutMs);
+    // Transfer rather than copy the document bytes; the underlying buffer
+    // may be shared (Buffer pool), so copy only if it is
+    const { data } = job.request;
+    const owned = data.byteOffset === 0 && data.byteLength === data.buffer.byteLength ? data : data.slice();
+    slot.worker.postMessage({ ...job.request, data: owned }, [owned.buffer as ArrayBuffer]);
+  }
+
+  private finish(slot: Slot): void {
+    clearTimeout(slot.timer);
+    slot.job = null;
+    slot.worker.unref();
+  }
+
+  // Stop a worker (after a timeout or crash), failing its current job; the
+  // next dispatch spawns a replacement
+  private async retire(slot: Slot, error: Error): Promise<void> {
+    const job = slot.job;
+    this.finish(slot);
+    this.slots = this.slots.filter((s) => s !== slot);
+    job?.reject(error);
+    await slot.worker.terminate();
+    if (!this.closed) this.dispatch();
+  }
+}
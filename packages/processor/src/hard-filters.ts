@@ -0,0 +1,120 @@
+import { Bitset } from "./bitset";
+import type { MatchConfig, TenderForMatching } from "./matcher";
+
+// Lower bounds of each bucket. A watch threshold in bucket i lies in
+// [BOUNDS[i], BOUNDS[i + 1]); values below the first bound go in bucket 0.
+const VALUE_BUCKETS = [
+  0, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000,
+  1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000, 50_000_000, 100_000_000
+];
+const RESPONSE_DAY_BUCKETS = [0, 1, 2, 3, 5, 7, 10, 14, 21, 30, 45, 60, 90];
+
+const DAY_MS = 1000 * 60 * 60 * 24;
+
+function bucketOf(value: number, bounds: number[]): number {
+  let i = 0;
+  while (i + 1 < bounds.length && bounds[i + 1] <= value) i++;
+  return i;
+}
+
+// Same rounding as matchTender's response time filter
+function daysUntil(closesAt: Date, now: number): number {
+  return Math.floor((closesAt.getTime() - now) / DAY_MS);
+}
+
+function unionOf(buckets: Bitset[], from: number, to: number): Bitset {
+  const result = new Bitset();
+  for (let i = from; i <= to; i++) result.or(buckets[i]);
+  return result;
+}
+
+/**
+ * Reverse index from matchTender's hard filters (regions, value range,
+ * unspecified value, minimum response days) to watch slots.
+ *
+ * candidates() is conservative: it never drops a watch that would pass the
+ * filters, but watches whose threshold shares a bucket with the tender's
+ * value are kept and settled by the exact check in scoreTender.
+ */
+export class HardFilterIndex {
+  private anyRegion = new Bitset();
+  private byRegion = new Map<string, Bitset>();
+  private valueMin = VALUE_BUCKETS.map(() => new Bitset());
+  private valueMax = VALUE_BUCKETS.map(() => new Bitset());
+  private unspecifiedValue = new Bitset();
+  private responseDays = RESPONSE_DAY_BUCKETS.map(() => new Bitset());
+
+  add(slot: number, config: MatchConfig): void {
+    this.update(slot, config, true);
+  }
+
+  remove(slot: number, config: MatchConfig): void {
+    this.update(slot, config, false);
+  }
+
+  private update(slot: number, config: MatchConfig, on: boolean): void {
+    const apply = (set: Bitset) => (on ? set.set(slot) : set.clear(slot));
+
+    if (config.regions.length === 0) {
+      apply(this.anyRegion);
+    }
+    for (const region of config.regions) {
+      const key = region.toLowerCase();
+      let set = this.byRegion.get(key);
+      if (!set) {
+        set = new Bitset();
+        this.byRegion.set(key, set);
+      }
+      apply(set);
+    }
+
+    // Falsy thresholds are ignored by matchTender, so they always pass
+    apply(this.valueMin[config.valueMin ? bucketOf(config.valueMin, VALUE_BUCKETS) : 0]);
+    apply(this.valueMax[config.valueMax ? bucketOf(config.valueMax, VALUE_BUCKETS) : VALUE_BUCKETS.length - 1]);
+    if (config.includeUnspecifiedValue) {
+      apply(this.unspecifiedValue);
+    }
+    apply(this.responseDays[config.minResponseDays ? bucketOf(config.minResponseDays, RESPONSE_DAY_BUCKETS) : 0]);
+  }
+
+  /**
+   * The inputs candidates() depends on. Tenders with equal keys get the same
+   * candidate set, which lets a batch compute it once per distinct key.
+   */
+  filterKey(tender: TenderForMatching, now = Date.now()): string {
+    const regions = [...new Set(tender.regions.map(r => r.toLowerCase()))].sort().join("|");
+    const low = tender.valueLow !== undefined ? bucketOf(tender.valueLow, VALUE_BUCKETS) : "-";
+    const high = tender.valueLow !== undefined && tender.valueHigh ? bucketOf(tender.valueHigh, VALUE_BUCKETS) : "-";
+    const days = tender.closesAt ? bucketOf(daysUntil(tender.closesAt, now), RESPONSE_DAY_BUCKETS) : "-";
+    return `${regions}/${low}/${high}/${days}`;
+  }
+
+  /**
+   * Slots of watches that may pass the hard filters for this tender.
+   */
+  candidates(tender: TenderForMatching, now = Date.now()): Bitset {
+    const result = this.anyRegion.clone();
+    const tenderRegions = tender.regions.map(r => r.toLowerCase());
+    for (const [region, set] of this.byRegion) {
+      if (tenderRegions.some(tr => tr.includes(region))) {
+        result.or(set);
+      }
+    }
+    if (result.isEmpty()) return result;
+
+    if (tender.valueLow !== undefined) {
+      result.and(unionOf(this.valueMin, 0, bucketOf(tender.valueLow, VALUE_BUCKETS)));
+      if (tender.valueHigh) {
+        result.and(unionOf(this.valueMax, bucketOf(tender.valueHigh, VALUE_BUCKETS), VALUE_BUCKETS.length - 1));
+      }
+    } else {
+      result.and(this.unspecifiedValue);
+    }
+
+    if (tender.closesAt) {
+      result.and(unionOf(this.responseDays, 0, bucketOf(daysUntil(tender.closesAt, now), RESPONSE_DAY_BUCKETS)));
+    }
+
+    return result;
+  }
+}
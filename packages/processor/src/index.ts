@@ -1,5 +1,32 @@
-export { generateSummary } from "./summarizer";
-export type { DetailLevel, SummaryContext } from "./summarizer";
+export {
+  generateSummary,
+  generateTenderDigest,
+  buildSummaryRequest,
+  summaryMessageParams,
+  cacheablePrefix,
+  normalizeSummaryContext,
+  SUMMARY_MODEL
+} from "./summarizer";
+export type { DetailLevel, PromptBlock, SummaryContext, SummaryOptions, SummaryTender, SummaryRequest } from "./summarizer";
+export { TokenUsageMeter } from "./usage";
+export type { TokenUsage, UsageTotals } from "./usage";
+export { DIGEST_VERSION, parseTenderDigest, renderTenderDigest, storedDigest } from "./digest";
+export type { TenderDigest, DigestInput } from "./digest";
+export { SummaryCache, summaryCacheKey } from "./summary-cache";
+export type { CachedSummary, SummaryStore, SummaryCacheOptions, SummaryCacheStats } from "./summary-cache";
 
-export { matchTender } from "./matcher";
+export { matchTender, hardFilterRejection } from "./matcher";
 export type { MatchResult, MatchConfig, TenderForMatching } from "./matcher";
+
+export { WatchIndex, matchTenders } from "./watch-index";
+export type { WatchMatch, RefilterResult } from "./watch-index";
+
+export { ExtractionPool, ExtractionTimeoutError, documentKind } from "./extraction/pool";
+export type { ExtractionPoolOptions, ExtractedText } from "./extraction/pool";
+
+export { MessageBatchClient, MessageBatchError, batchResultText, MAX_BATCH_REQUESTS } from "./batch/client";
+export type { BatchRequest, BatchResult, MessageBatch, MessageBatchClientOptions } from "./batch/client";
+export { MockBatchServer } from "./batch/mock-server";
+export type { MockBatchServerOptions } from "./batch/mock-server";
+export { submitSummaryBatch, collectSummaryBatch, pendingSummaries } from "./batch/summaries";
+export type { PendingSummary, SubmittedSummaries, CollectedSummaries } from "./batch/summaries";
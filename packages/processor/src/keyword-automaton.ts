@@ -0,0 +1,105 @@
+/**
+ * Aho-Corasick automaton over lowercased keywords. A single pass over the
+ * search text reports every keyword that occurs in it as a substring, which
+ * is the same test matchTender does with `searchText.includes(keyword)`.
+ */
+export class KeywordAutomaton {
+  private patterns: string[];
+  // Per node: char code -> child node
+  private goto: Map<number, number>[] = [new Map()];
+  private fail: number[] = [0];
+  // Pattern ids ending exactly at this node
+  private terminal: number[][] = [[]];
+  // Nearest proper suffix node that has terminal patterns (-1 if none)
+  private outputLink: number[] = [-1];
+  private alwaysHit: number[] = [];
+
+  constructor(patterns: string[]) {
+    this.patterns = patterns;
+
+    patterns.forEach((pattern, id) => {
+      // "".includes("") is true, so empty keywords hit every text
+      if (pattern.length === 0) {
+        this.alwaysHit.push(id);
+        return;
+      }
+      let node = 0;
+      for (let i = 0; i < pattern.length; i++) {
+        const code = pattern.charCodeAt(i);
+        let next = this.goto[node].get(code);
+        if (next === undefined) {
+          next = this.goto.length;
+          this.goto.push(new Map());
+          this.fail.push(0);
+          this.terminal.push([]);
+          this.outputLink.push(-1);
+          this.goto[node].set(code, next);
+        }
+        node = next;
+      }
+      this.terminal[node].push(id);
+    });
+
+    this.buildLinks();
+  }
+
+  get size(): number {
+    return this.patterns.length;
+  }
+
+  private buildLinks(): void {
+    const queue: number[] = [];
+    for (const child of this.goto[0].values()) {
+      this.fail[child] = 0;
+      queue.push(child);
+    }
+
+    for (let head = 0; head < queue.length; head++) {
+      const node = queue[head];
+      for (const [code, child] of this.goto[node]) {
+        let f = this.fail[node];
+        while (f !== 0 && !this.goto[f].has(code)) {
+          f = this.fail[f];
+        }
+        const target = this.goto[f].get(code);
+        this.fail[child] = target !== undefined && target !== child ? target : 0;
+
+        const suffix = this.fail[child];
+        this.outputLink[child] = this.terminal[suffix].length > 0 ? suffix : this.outputLink[suffix];
+        queue.push(child);
+      }
+    }
+  }
+
+  /**
+   * Returns the ids (indexes into the constructor's patterns) of every
+   * pattern found in `text`. `text` must already be lowercased.
+   */
+  search(text: string): Set<number> {
+    const hits = new Set<number>(this.alwaysHit);
+    if (this.goto.length === 1) return hits;
+
+    // Once a node's output chain has been reported it never needs walking again
+    const reported = new Uint8Array(this.goto.length);
+    let node = 0;
+
+    for (let i = 0; i < text.length; i++) {
+      const code = text.charCodeAt(i);
+      let next = this.goto[node].get(code);
+      while (next === undefined && node !== 0) {
+        node = this.fail[node];
+        next = this.goto[node].get(code);
+      }
+      node = next ?? 0;
+
+      let out = this.terminal[node].length > 0 ? node : this.outputLink[node];
+      while (out !== -1 && !reported[out]) {
+        reported[out] = 1;
+        for (const id of this.terminal[out]) hits.add(id);
+        out = this.outputLink[out];
+      }
+    }
+
+    return hits;
+  }
+}
@@ -33,93 +33,103 @@ export interface TenderForMatching {
   certificationsRequired: string[];
 }
 
+/**
+ * Lowercased text that keywords are matched against.
+ */
+export function buildSearchText(tender: TenderForMatching): string {
+  return `${tender.title} ${tender.description} ${tender.fullText || ""}`.toLowerCase();
+}
+
 export function matchTender(
   tender: TenderForMatching,
   config: MatchConfig
 ): MatchResult {
-  let score = 0;
-  const matchedKeywords: string[] = [];
-  const reasons: string[] = [];
-
-  const searchText = `${tender.title} ${tender.description} ${tender.fullText || ""}`.toLowerCase();
-
-  // HARD FILTERS - instant rejection
-  
-  // Excluded keywords
-  for (const keyword of config.keywordsExclude) {
-    if (searchText.includes(keyword.toLowerCase())) {
-      return {
-        score: 0,
-        tier: "reject",
-        matchedKeywords: [],
-        reasoning: `Contains excluded keyword: "${keyword}"`
-      };
-    }
-  }
+  const searchText = buildSearchText(tender);
+  return scoreTender(tender, config, keyword => searchText.includes(keyword.toLowerCase()));
+}
 
+/**
+ * Why the hard filters that don't depend on the tender's text (regions,
+ * value range, response time) reject this watch, or null if they pass.
+ */
+export function hardFilterRejection(
+  tender: TenderForMatching,
+  config: MatchConfig,
+  now = Date.now()
+): string | null {
   // Region filter (if specified)
   if (config.regions.length > 0) {
     const regionMatch = config.regions.some(r => 
       tender.regions.some(tr => tr.toLowerCase().includes(r.toLowerCase()))
     );
     if (!regionMatch) {
-      return {
-        score: 0,
-        tier: "reject",
-        matchedKeywords: [],
-        reasoning: "Not in target regions"
-      };
+      return "Not in target regions";
     }
   }
 
   // Value range filter
   if (tender.valueLow !== undefined) {
     if (config.valueMin && tender.valueLow < config.valueMin) {
-      return {
-        score: 0,
-        tier: "reject",
-        matchedKeywords: [],
-        reasoning: `Value ($${tender.valueLow.toLocaleString()}) below minimum ($${config.valueMin.toLocaleString()})`
-      };
+      return `Value ($${tender.valueLow.toLocaleString()}) below minimum ($${config.valueMin.toLocaleString()})`;
     }
     if (config.valueMax && tender.valueHigh && tender.valueHigh > config.valueMax) {
-      return {
-        score: 0,
-        tier: "reject",
-        matchedKeywords: [],
-        reasoning: `Value ($${tender.valueHigh.toLocaleString()}) above maximum ($${config.valueMax.toLocaleString()})`
-      };
+      return `Value ($${tender.valueHigh.toLocaleString()}) above maximum ($${config.valueMax.toLocaleString()})`;
     }
   } else if (!config.includeUnspecifiedValue) {
-    return {
-      score: 0,
-      tier: "reject",
-      matchedKeywords: [],
-      reasoning: "Value not specified (excluded by preference)"
-    };
+    return "Value not specified (excluded by preference)";
   }
 
   // Response time filter
   if (config.minResponseDays && tender.closesAt) {
     const daysUntilClose = Math.floor(
-      (tender.closesAt.getTime() - Date.now()) / (1000 * 60 * 60 * 24)
+      (tender.closesAt.getTime() - now) / (1000 * 60 * 60 * 24)
     );
     if (daysUntilClose < config.minResponseDays) {
+      return `Only ${daysUntilClose} days to respond (minimum: ${config.minResponseDays})`;
+    }
+  }
+
+  return null;
+}
+
+/**
+ * Core of matchTender with keyword lookup supplied by the caller, so a
+ * precomputed set of keyword hits produces exactly the same result.
+ */
+export function scoreTender(
+  tender: TenderForMatching,
+  config: MatchConfig,
+  containsKeyword: (keyword: string) => boolean
+): MatchResult {
+  let score = 0;
+  const matchedKeywords: string[] = [];
+  const reasons: string[] = [];
+
+  // HARD FILTERS - instant rejection
+  
+  // Excluded keywords
+  for (const keyword of config.keywordsExclude) {
+    if (containsKeyword(keyword)) {
       return {
         score: 0,
         tier: "reject",
         matchedKeywords: [],
-        reasoning: `Only ${daysUntilClose} days to respond (minimum: ${config.minResponseDays})`
+        reasoning: `Contains excluded keyword: "${keyword}"`
       };
     }
   }
 
+  const rejection = hardFilterRejection(tender, config);
+  if (rejection) {
+    return { score: 0, tier: "reject", matchedKeywords: [], reasoning: rejection };
+  }
+
   // SCORING
 
   // Must-have keywords (40 points each, max 120)
   let mustMatchCount = 0;
   for (const keyword of config.keywordsMust) {
-    if (searchText.includes(keyword.toLowerCase())) {
+    if (containsKeyword(keyword)) {
       mustMatchCount++;
       matchedKeywords.push(keyword);
       if (mustMatchCount <= 3) {
@@ -134,7 +144,7 @@ export function matchTender(
   // Bonus keywords (15 points each, max 45)
   let bonusMatchCount = 0;
   for (const keyword of config.keywordsBonus) {
-    if (searchText.includes(keyword.toLowerCase())) {
+    if (containsKeyword(keyword)) {
       bonusMatchCount++;
       matchedKeywords.push(keyword);
       if (bonusMatchCount <= 3) {
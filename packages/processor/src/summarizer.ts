@@ -1,7 +1,14 @@
 import Anthropic from "@anthropic-ai/sdk";
+import { summaryCacheKey } from "./summary-cache";
+import type { SummaryCache } from "./summary-cache";
+import { buildDigestPrompt, parseTenderDigest, renderTenderDigest } from "./digest";
+import type { DigestInput, TenderDigest } from "./digest";
+import type { TokenUsage, TokenUsageMeter } from "./usage";
 
 const client = new Anthropic();
 
+export const SUMMARY_MODEL = "claude-sonnet-4-20250514";
+
 export type DetailLevel = "headlines" | "standard" | "deep";
 
 export interface SummaryContext {
@@ -13,22 +20,147 @@ export interface SummaryContext {
   certificationsHeld: string[];
 }
 
+export interface SummaryOptions {
+  cache?: SummaryCache;
+  // Recorded with the cached summary, so amending the tender can drop it
+  tenderId?: string;
+  // Token usage of each model call, by detail level
+  usage?: TokenUsageMeter;
+}
+
+function normalizeList(values: string[]): string[] {
+  return [...new Set(values.map(v => v.trim().toLowerCase()).filter(Boolean))].sort();
+}
+
+/**
+ * The context as the prompts use it: list order, case and duplicates don't
+ * change what is asked, so they don't change the prompt or its cache key.
+ */
+export function normalizeSummaryContext(context: SummaryContext): SummaryContext {
+  return {
+    watchName: context.watchName.trim(),
+    companyName: context.companyName.trim(),
+    keywordsMust: normalizeList(context.keywordsMust),
+    keywordsBonus: normalizeList(context.keywordsBonus),
+    preferredSectors: normalizeList(context.preferredSectors),
+    certificationsHeld: normalizeList(context.certificationsHeld),
+  };
+}
+
+export interface SummaryTender {
+  title: string;
+  description: string;
+  fullText?: string;
+  buyerOrg: string;
+  closesAt?: Date;
+  valueLow?: number;
+  valueHigh?: number;
+  // When given, read instead of the description and full text
+  digest?: TenderDigest | null;
+}
+
+/**
+ * One model call, as sent either directly or in a message batch. The key
+ * identifies it in the summary cache and batch results.
+ */
+export interface SummaryRequest {
+  key: string;
+  detailLevel: string;
+  maxTokens: number;
+  // The tender's content, the same for every watch it matches. Sent first
+  // and marked for prompt caching, so only the first call pays to read it.
+  prefix?: string;
+  prompt: string;
+}
+
+// Text content block; cache_control is newer than the pinned SDK's types
+export interface PromptBlock {
+  type: "text";
+  text: string;
+  cache_control?: { type: "ephemeral" };
+}
+
+// The model's minimum cacheable prompt prefix, in tokens
+const MIN_CACHEABLE_PREFIX_TOKENS = 1024;
+// Conservative: English prose runs a little under 4 characters per token
+const CHARS_PER_TOKEN = 4;
+
+/**
+ * Whether a request's prefix is long enough to be written to the prompt
+ * cache. Shorter prefixes are sent marked all the same, but calls sharing
+ * them gain nothing from waiting for the first one.
+ */
+export function cacheablePrefix(request: SummaryRequest): boolean {
+  return (request.prefix?.length ?? 0) / CHARS_PER_TOKEN >= MIN_CACHEABLE_PREFIX_TOKENS;
+}
+
+function summaryRequest(detailLevel: string, maxTokens: number, prompt: string, prefix?: string): SummaryRequest {
+  const key = summaryCacheKey({
+    model: SUMMARY_MODEL,
+    detailLevel,
+    maxTokens,
+    prompt: prefix ? `${prefix}\n\n${prompt}` : prompt,
+  });
+  return { key, detailLevel, maxTokens, prefix, prompt };
+}
+
+/** Messages API parameters for a request. */
+export function summaryMessageParams(request: SummaryRequest) {
+  // Prefixes shorter than the model's minimum (see cacheablePrefix) aren't
+  // cached, and cost no more for being marked
+  const content: string | PromptBlock[] = request.prefix
+    ? [
+        { type: "text", text: request.prefix, cache_control: { type: "ephemeral" } },
+        { type: "text", text: request.prompt },
+      ]
+    : request.prompt;
+  return {
+    model: SUMMARY_MODEL,
+    max_tokens: request.maxTokens,
+    messages: [
+      {
+        role: "user" as const,
+        content
+      }
+    ]
+  };
+}
+
 export async function generateSummary(
-  tender: {
-    title: string;
-    description: string;
-    fullText?: string;
-    buyerOrg: string;
-    closesAt?: Date;
-    valueLow?: number;
-    valueHigh?: number;
-  },
-  context: SummaryContext,
-  detailLevel: DetailLevel
+  tender: SummaryTender,
+  rawContext: SummaryContext,
+  detailLevel: DetailLevel,
+  options: SummaryOptions = {}
 ): Promise<string> {
+  return complete(buildSummaryRequest(tender, rawContext, detailLevel), options);
+}
+
+export function buildSummaryRequest(
+  tender: SummaryTender,
+  rawContext: SummaryContext,
+  detailLevel: DetailLevel
+): SummaryRequest {
+  const context = normalizeSummaryContext(rawContext);
   const valueStr = tender.valueLow 
     ? `$${tender.valueLow.toLocaleString()} - $${tender.valueHigh?.toLocaleString() || "TBC"}`
     : "Not specified";
+  const digest = tender.digest ? `Tender digest:\n${renderTenderDigest(tender.digest)}` : null;
+
+  // Tender first and company last, so every watch's prompt starts the same
+  const tenderDetails = `Tender: ${tender.title}
+Buyer: ${tender.buyerOrg}
+Closes: ${tender.closesAt?.toISOString() || "Not specified"}
+Value: ${valueStr}`;
+  const prefixes: Record<DetailLevel, string | undefined> = {
+    // Nothing in a headline is specific to the company
+    headlines: undefined,
+    standard: `${tenderDetails}
+
+${digest ?? `Description: ${tender.description?.slice(0, 2000)}`}`,
+    deep: `${tenderDetails}
+
+${digest ?? `Full content:\n${tender.fullText?.slice(0, 8000) || tender.description}`}`,
+  };
 
   const prompts: Record<DetailLevel, string> = {
     headlines: `Summarize this tender in ONE sentence (max 20 words). Focus on: what's being procured, value range, and deadline.
@@ -41,21 +173,15 @@ Value: ${valueStr}
 
 One-line summary:`,
 
-    standard: `Create a 3-4 sentence summary of this tender for ${context.companyName}.
+    standard: `Create a 3-4 sentence summary of the tender above for ${context.companyName}.
 
 They're looking for: ${context.keywordsMust.join(", ")}
 Bonus interests: ${context.keywordsBonus.join(", ")}
 Sectors: ${context.preferredSectors.join(", ")}
 
-Tender: ${tender.title}
-Description: ${tender.description?.slice(0, 2000)}
-Buyer: ${tender.buyerOrg}
-Closes: ${tender.closesAt?.toISOString() || "Not specified"}
-Value: ${valueStr}
-
 Highlight what matters to THIS company. Mention any potential concerns or requirements they should know about. Be direct and actionable.`,
 
-    deep: `Provide a detailed analysis of this tender for ${context.companyName}.
+    deep: `Provide a detailed analysis of the tender above for ${context.companyName}.
 
 Company context:
 - Looking for: ${context.keywordsMust.join(", ")}
@@ -63,15 +189,6 @@ Company context:
 - Sectors: ${context.preferredSectors.join(", ")}
 - Certifications held: ${context.certificationsHeld.join(", ") || "None specified"}
 
-Tender details:
-Title: ${tender.title}
-Buyer: ${tender.buyerOrg}
-Closes: ${tender.closesAt?.toISOString() || "Not specified"}
-Value: ${valueStr}
-
-Full content:
-${tender.fullText?.slice(0, 8000) || tender.description}
-
 Provide:
 1. Executive summary (2-3 sentences)
 2. Key requirements and deliverables
@@ -83,17 +200,40 @@ Provide:
 Be specific and actionable. Don't pad with filler.`
   };
 
-  const response = await client.messages.create({
-    model: "claude-sonnet-4-20250514",
-    max_tokens: detailLevel === "deep" ? 1500 : 500,
-    messages: [
-      {
-        role: "user",
-        content: prompts[detailLevel]
-      }
-    ]
-  });
+  return summaryRequest(detailLevel, detailLevel === "deep" ? 1500 : 500, prompts[detailLevel], prefixes[detailLevel]);
+}
+
+/**
+ * Write the shared digest of a tender from its full text. Returns null if
+ * the model's response can't be parsed as one.
+ */
+export async function generateTenderDigest(
+  tender: DigestInput,
+  options: SummaryOptions = {}
+): Promise<TenderDigest | null> {
+  const request = summaryRequest("digest", 1500, buildDigestPrompt(tender));
+  const text = await complete(request, options, (text) => parseTenderDigest(text) !== null);
+  return parseTenderDigest(text);
+}
+
+async function complete(
+  request: SummaryRequest,
+  options: SummaryOptions,
+  accept?: (text: string) => boolean
+): Promise<string> {
+  const generate = async () => {
+    const response = await client.messages.create(summaryMessageParams(request));
+    // The pinned SDK's Usage type predates the cache token counts
+    options.usage?.record(request.detailLevel, response.usage as TokenUsage);
+    const textContent = response.content.find(c => c.type === "text");
+    return textContent?.text || "";
+  };
 
-  const textContent = response.content.find(c => c.type === "text");
-  return textContent?.text || "";
+  if (!options.cache) return generate();
+  return options.cache.getOrGenerate(
+    request.key,
+    { tenderId: options.tenderId ?? null, detailLevel: request.detailLevel, model: SUMMARY_MODEL },
+    generate,
+    accept
+  );
 }
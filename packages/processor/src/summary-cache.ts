@@ -0,0 +1,191 @@
+import { createHash } from "node:crypto";
+
+export interface CachedSummary {
+  key: string;
+  // Lets a tender's summaries be invalidated when it is amended
+  tenderId: string | null;
+  detailLevel: string;
+  model: string;
+  summary: string;
+  expiresAt: Date | null;
+}
+
+/**
+ * Durable tier behind SummaryCache, shared by every worker (the summaries
+ * table in @tenderwatch/db).
+ */
+export interface SummaryStore {
+  get(key: string): Promise<CachedSummary | null>;
+  set(entry: CachedSummary): Promise<void>;
+  deleteForTenders(tenderIds: string[]): Promise<void>;
+}
+
+export interface SummaryCacheOptions {
+  store?: SummaryStore;
+  // Summaries kept in this process, least recently used evicted first
+  maxEntries?: number;
+  // How long a summary stays valid; null keeps it until invalidated
+  ttlMs?: number | null;
+}
+
+export interface SummaryCacheStats {
+  memoryHits: number;
+  storeHits: number;
+  misses: number;
+  // Share of lookups answered without calling the model
+  hitRatio: number;
+}
+
+const DEFAULT_MAX_ENTRIES = 1000;
+const DEFAULT_TTL_MS = 30 * 24 * 60 * 60 * 1000;
+
+/**
+ * Cache key of a summary request. Callers hash the exact prompt, which is
+ * built from the tender content and the normalized context, so any change
+ * to either (or to the prompt itself) is a different entry.
+ */
+export function summaryCacheKey(request: { model: string; detailLevel: string; maxTokens: number; prompt: string }): string {
+  return createHash("sha256")
+    .update(JSON.stringify([request.model, request.detailLevel, request.maxTokens, request.prompt]))
+    .digest("hex");
+}
+
+/**
+ * LLM summaries by cache key: an in-process LRU in front of an optional
+ * SummaryStore. Concurrent misses on one key share a single generation.
+ */
+export class SummaryCache {
+  private entries = new Map<string, CachedSummary>();
+  private pending = new Map<string, Promise<string>>();
+  private readonly store?: SummaryStore;
+  private readonly maxEntries: number;
+  private readonly ttlMs: number | null;
+  private counts = { memoryHits: 0, storeHits: 0, misses: 0 };
+
+  constructor(options: SummaryCacheOptions = {}) {
+    this.store = options.store;
+    this.maxEntries = options.maxEntries ?? DEFAULT_MAX_ENTRIES;
+    this.ttlMs = options.ttlMs === undefined ? DEFAULT_TTL_MS : options.ttlMs;
+  }
+
+  /**
+   * The cached summary for `key`, or the result of `generate`, which is
+   * then cached if `accept` allows (by default, if it isn't empty, since an
+   * empty response is more likely a failure than a summary worth keeping).
+   */
+  async getOrGenerate(
+    key: string,
+    entry: Omit<CachedSummary, "key" | "summary" | "expiresAt">,
+    generate: () => Promise<string>,
+    accept: (summary: string) => boolean = (summary) => summary !== ""
+  ): Promise<string> {
+    const cached = this.memoryGet(key);
+    if (cached) {
+      this.counts.memoryHits++;
+      return cached.summary;
+    }
+
+    let pending = this.pending.get(key);
+    if (pending) {
+      // Another caller is already generating it; no model call either way
+      this.counts.memoryHits++;
+    } else {
+      pending = this.load(key, entry, generate, accept).finally(() => this.pending.delete(key));
+      this.pending.set(key, pending);
+    }
+    return pending;
+  }
+
+  /**
+   * The cached summary for `key`, or null (counted as a miss), for callers
+   * that generate elsewhere, e.g. in a message batch, and put() the result.
+   */
+  async lookup(key: string): Promise<string | null> {
+    const cached = this.memoryGet(key);
+    if (cached) {
+      this.counts.memoryHits++;
+      return cached.summary;
+    }
+    const stored = await this.store?.get(key);
+    if (stored && !isExpired(stored)) {
+      this.counts.storeHits++;
+      this.remember(stored);
+      return stored.summary;
+    }
+    this.counts.misses++;
+    return null;
+  }
+
+  async put(key: string, entry: Omit<CachedSummary, "key" | "summary" | "expiresAt">, summary: string): Promise<void> {
+    const fresh: CachedSummary = {
+      ...entry,
+      key,
+      summary,
+      expiresAt: this.ttlMs === null ? null : new Date(Date.now() + this.ttlMs),
+    };
+    this.remember(fresh);
+    await this.store?.set(fresh);
+  }
+
+  /** Drop every summary of these tenders, here and in the store. */
+  async invalidateTenders(tenderIds: string[]): Promise<void> {
+    if (tenderIds.length === 0) return;
+    const ids = new Set(tenderIds);
+    for (const [key, entry] of this.entries) {
+      if (entry.tenderId && ids.has(entry.tenderId)) this.entries.delete(key);
+    }
+    await this.store?.deleteForTenders(tenderIds);
+  }
+
+  stats(): SummaryCacheStats {
+    const { memoryHits, storeHits, misses } = this.counts;
+    const lookups = memoryHits + storeHits + misses;
+    return {
+      memoryHits,
+      storeHits,
+      misses,
+      hitRatio: lookups ? Math.round(((memoryHits + storeHits) / lookups) * 1000) / 1000 : 0,
+    };
+  }
+
+  private async load(
+    key: string,
+    entry: Omit<CachedSummary, "key" | "summary" | "expiresAt">,
+    generate: () => Promise<string>,
+    accept: (summary: string) => boolean
+  ): Promise<string> {
+    const stored = await this.store?.get(key);
+    if (stored && !isExpired(stored)) {
+      this.counts.storeHits++;
+      this.remember(stored);
+      return stored.summary;
+    }
+
+    this.counts.misses++;
+    const summary = await generate();
+    if (accept(summary)) await this.put(key, entry, summary);
+    return summary;
+  }
+
+  private memoryGet(key: string): CachedSummary | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) return undefined;
+    this.entries.delete(key);
+    if (isExpired(entry)) return undefined;
+    // Re-inserting moves it to the most recently used end
+    this.entries.set(key, entry);
+    return entry;
+  }
+
+  private remember(entry: CachedSummary): void {
+    this.entries.delete(entry.key);
+    this.entries.set(entry.key, entry);
+    while (this.entries.size > this.maxEntries) {
+      this.entries.delete(this.entries.keys().next().value!);
+    }
+  }
+}
+
+function isExpired(entry: CachedSummary): boolean {
+  return entry.expiresAt !== null && entry.expiresAt.getTime() <= Date.now();
+}
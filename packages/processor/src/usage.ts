@@ -0,0 +1,50 @@
+/** Token counts from a Messages API response's `usage`. */
+export interface TokenUsage {
+  input_tokens: number;
+  output_tokens: number;
+  // Only present when the prompt has a cache breakpoint
+  cache_creation_input_tokens?: number | null;
+  cache_read_input_tokens?: number | null;
+}
+
+export interface UsageTotals {
+  calls: number;
+  // Prompt tokens after the last cache breakpoint, or not cached at all, at full price
+  inputTokens: number;
+  // Prompt tokens written to the prompt cache (1.25x) and read from it (0.1x)
+  cacheWriteTokens: number;
+  cacheReadTokens: number;
+  outputTokens: number;
+  // Share of prompt tokens read from the cache
+  cacheReadRatio: number;
+}
+
+function emptyTotals(): UsageTotals {
+  return { calls: 0, inputTokens: 0, cacheWriteTokens: 0, cacheReadTokens: 0, outputTokens: 0, cacheReadRatio: 0 };
+}
+
+/**
+ * Adds up token usage per kind of call (e.g. detail level), to show how
+ * much of each prompt was written to, read from or missed the prompt cache.
+ */
+export class TokenUsageMeter {
+  private totals = new Map<string, UsageTotals>();
+
+  record(kind: string, usage: TokenUsage | null | undefined): void {
+    if (!usage) return;
+    const totals = this.totals.get(kind) ?? emptyTotals();
+    totals.calls++;
+    totals.inputTokens += usage.input_tokens;
+    totals.cacheWriteTokens += usage.cache_creation_input_tokens ?? 0;
+    totals.cacheReadTokens += usage.cache_read_input_tokens ?? 0;
+    totals.outputTokens += usage.output_tokens;
+    const prompt = totals.inputTokens + totals.cacheWriteTokens + totals.cacheReadTokens;
+    totals.cacheReadRatio = prompt > 0 ? totals.cacheReadTokens / prompt : 0;
+    this.totals.set(kind, totals);
+  }
+
+  /** Totals by kind. Plain JSON, so it can be returned from a job step. */
+  report(): Record<string, UsageTotals> {
+    return Object.fromEntries([...this.totals].map(([kind, totals]) => [kind, { ...totals }]));
+  }
+}
@@ -0,0 +1,247 @@
+import { KeywordAutomaton } from "./keyword-automaton";
+import { HardFilterIndex } from "./hard-filters";
+import { buildSearchText, hardFilterRejection, scoreTender } from "./matcher";
+import type { MatchConfig, MatchResult, TenderForMatching } from "./matcher";
+
+export interface WatchMatch extends MatchResult {
+  watchId: string;
+}
+
+export interface RefilterResult {
+  // Already matched watches that still pass the hard filters
+  kept: string[];
+  // Already matched watches that no longer do
+  dropped: string[];
+  // Watches not matched before that match now
+  added: WatchMatch[];
+}
+
+/**
+ * All active watches compiled into one keyword automaton, so a tender's text
+ * is scanned once no matter how many watches there are. Scores are identical
+ * to calling matchTender for each watch.
+ *
+ * Before any text is scanned, watches are pruned with a reverse index over
+ * the hard filters, so most watch/tender pairs cost a few bitset operations.
+ *
+ * The index is maintained incrementally: upsert() on watch create/edit,
+ * remove() on deactivate/delete. The automaton is only recompiled (lazily,
+ * on the next match) when a keyword no other watch uses is added.
+ */
+export class WatchIndex {
+  private watches = new Map<string, MatchConfig>();
+  private filters = new HardFilterIndex();
+  private slotOf = new Map<string, number>();
+  private slotIds: (string | undefined)[] = [];
+  private freeSlots: number[] = [];
+  // Lowercased keyword -> number of watches using it
+  private keywordRefs = new Map<string, number>();
+  private automaton: KeywordAutomaton | null = null;
+  private automatonKeywords: string[] = [];
+  private compiledKeywords = new Set<string>();
+  private stale = true;
+
+  get size(): number {
+    return this.watches.size;
+  }
+
+  has(watchId: string): boolean {
+    return this.watches.has(watchId);
+  }
+
+  get(watchId: string): MatchConfig | undefined {
+    return this.watches.get(watchId);
+  }
+
+  watchIds(): IterableIterator<string> {
+    return this.watches.keys();
+  }
+
+  upsert(watchId: string, config: MatchConfig): void {
+    const previous = this.watches.get(watchId);
+    let slot = this.slotOf.get(watchId);
+    if (previous && slot !== undefined) {
+      this.release(previous);
+      this.filters.remove(slot, previous);
+    } else {
+      slot = this.freeSlots.pop() ?? this.slotIds.length;
+      this.slotOf.set(watchId, slot);
+      this.slotIds[slot] = watchId;
+    }
+    this.watches.set(watchId, config);
+    this.filters.add(slot, config);
+
+    for (const keyword of keywordsOf(config)) {
+      const refs = this.keywordRefs.get(keyword) ?? 0;
+      if (refs === 0 && !this.compiledKeywords.has(keyword)) {
+        this.stale = true;
+      }
+      this.keywordRefs.set(keyword, refs + 1);
+    }
+  }
+
+  remove(watchId: string): boolean {
+    const config = this.watches.get(watchId);
+    if (!config) return false;
+    const slot = this.slotOf.get(watchId)!;
+    this.release(config);
+    this.filters.remove(slot, config);
+    this.watches.delete(watchId);
+    this.slotOf.delete(watchId);
+    this.slotIds[slot] = undefined;
+    this.freeSlots.push(slot);
+    return true;
+  }
+
+  clear(): void {
+    this.watches.clear();
+    this.filters = new HardFilterIndex();
+    this.slotOf.clear();
+    this.slotIds = [];
+    this.freeSlots = [];
+    this.keywordRefs.clear();
+    this.automaton = null;
+    this.automatonKeywords = [];
+    this.compiledKeywords.clear();
+    this.stale = true;
+  }
+
+  /**
+   * Match one tender against every watch in the index. Only non-rejected
+   * matches are returned.
+   */
+  match(tender: TenderForMatching): WatchMatch[] {
+    return this.matchWatches(tender, this.candidates(tender));
+  }
+
+  /**
+   * Ids of watches that may pass the hard filters for this tender. Every
+   * watch that would match is included; a few that won't may be too.
+   */
+  candidates(tender: TenderForMatching, now = Date.now()): string[] {
+    const ids: string[] = [];
+    for (const slot of this.filters.candidates(tender, now)) {
+      const watchId = this.slotIds[slot];
+      if (watchId !== undefined) ids.push(watchId);
+    }
+    return ids;
+  }
+
+  /**
+   * Key under which candidates() results can be shared between tenders.
+   */
+  filterKey(tender: TenderForMatching, now = Date.now()): string {
+    return this.filters.filterKey(tender, now);
+  }
+
+  /**
+   * Match a tender against a subset of the indexed watches.
+   */
+  matchWatches(tender: TenderForMatching, watchIds: Iterable<string>): WatchMatch[] {
+    const results: WatchMatch[] = [];
+    let hits: Set<string> | null = null;
+
+    for (const watchId of watchIds) {
+      const config = this.watches.get(watchId);
+      if (!config) continue;
+
+      // Defer the text scan until there is at least one watch to score
+      if (!hits) hits = this.scan(tender);
+      const found = hits;
+
+      const result = scoreTender(tender, config, keyword => found.has(keyword.toLowerCase()));
+      if (result.tier !== "reject") {
+        results.push({ watchId, ...result });
+      }
+    }
+
+    return results;
+  }
+
+  /**
+   * Re-check a tender whose text, buyer, categories and certifications are
+   * unchanged but whose regions, value or closing date may not be. Scores of
+   * already matched watches can't have changed, so they are only re-checked
+   * against the hard filters; other candidates are scored, and the text is
+   * only scanned if there are any.
+   */
+  refilter(tender: TenderForMatching, matched: Iterable<string>, now = Date.now()): RefilterResult {
+    const result: RefilterResult = { kept: [], dropped: [], added: [] };
+    const seen = new Set<string>();
+
+    for (const watchId of matched) {
+      const config = this.watches.get(watchId);
+      if (!config) continue;
+      seen.add(watchId);
+      (hardFilterRejection(tender, config, now) ? result.dropped : result.kept).push(watchId);
+    }
+
+    result.added = this.matchWatches(tender, this.candidates(tender, now).filter(id => !seen.has(id)));
+    return result;
+  }
+
+  /**
+   * Lowercased keywords (from any indexed watch) that occur in the tender text.
+   */
+  scan(tender: TenderForMatching): Set<string> {
+    const automaton = this.compile();
+    const found = new Set<string>();
+    for (const id of automaton.search(buildSearchText(tender))) {
+      found.add(this.automatonKeywords[id]);
+    }
+    return found;
+  }
+
+  private compile(): KeywordAutomaton {
+    if (this.stale || !this.automaton) {
+      // Keywords whose last watch went away are dropped here
+      this.automatonKeywords = [...this.keywordRefs.keys()];
+      this.compiledKeywords = new Set(this.automatonKeywords);
+      this.automaton = new KeywordAutomaton(this.automatonKeywords);
+      this.stale = false;
+    }
+    return this.automaton;
+  }
+
+  private release(config: MatchConfig): void {
+    for (const keyword of keywordsOf(config)) {
+      const refs = (this.keywordRefs.get(keyword) ?? 1) - 1;
+      if (refs <= 0) {
+        // Still compiled into the automaton, which is harmless: lookups only
+        // ever ask about keywords belonging to indexed watches
+        this.keywordRefs.delete(keyword);
+      } else {
+        this.keywordRefs.set(keyword, refs);
+      }
+    }
+  }
+}
+
+function keywordsOf(config: MatchConfig): Set<string> {
+  return new Set(
+    [...config.keywordsMust, ...config.keywordsBonus, ...config.keywordsExclude].map(k => k.toLowerCase())
+  );
+}
+
+/**
+ * Match a batch of tenders (e.g. everything from one sync run) against the
+ * index. results[i] holds the non-rejected matches for tenders[i].
+ *
+ * Candidate watches are pruned by hard filter first and only computed once
+ * per distinct region/value/close-date bucket, since tenders from one portal
+ * mostly share them. Keyword scoring only runs for surviving pairs.
+ */
+export function matchTenders(tenders: TenderForMatching[], watchIndex: WatchIndex): WatchMatch[][] {
+  const now = Date.now();
+  const candidatesByKey = new Map<string, string[]>();
+
+  return tenders.map(tender => {
+    const key = watchIndex.filterKey(tender, now);
+    let candidates = candidatesByKey.get(key);
+    if (!candidates) {
+      candidates = watchIndex.candidates(tender, now);
+      candidatesByKey.set(key, candidates);
+    }
+    return watchIndex.matchWatches(tender, candidates);
+  });
+}
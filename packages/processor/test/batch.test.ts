@@ -0,0 +1,141 @@
+import { afterEach, beforeEach, describe, expect, it } from "vitest";
+import { MessageBatchClient } from "../src/batch/client";
+import { MockBatchServer } from "../src/batch/mock-server";
+import type { MockBatchServerOptions } from "../src/batch/mock-server";
+import { collectSummaryBatch, pendingSummaries, submitSummaryBatch } from "../src/batch/summaries";
+import { buildSummaryRequest } from "../src/summarizer";
+import type { SummaryContext, SummaryTender } from "../src/summarizer";
+import { SummaryCache } from "../src/summary-cache";
+import type { CachedSummary, SummaryStore } from "../src/summary-cache";
+
+/** The summaries table, in memory. */
+class MemoryStore implements SummaryStore {
+  rows = new Map<string, CachedSummary>();
+
+  async get(key: string) {
+    return this.rows.get(key) ?? null;
+  }
+
+  async set(entry: CachedSummary) {
+    this.rows.set(entry.key, entry);
+  }
+
+  async deleteForTenders(tenderIds: string[]) {
+    for (const [key, row] of this.rows) {
+      if (row.tenderId && tenderIds.includes(row.tenderId)) this.rows.delete(key);
+    }
+  }
+}
+
+const tender = (title: string): SummaryTender => ({
+  title,
+  description: `${title}, for three years with an option to extend`,
+  buyerOrg: "Transport for NSW",
+  closesAt: new Date("2026-12-01T05:00:00Z"),
+  valueLow: 250_000,
+  valueHigh: 400_000,
+});
+
+const context = (companyName: string): SummaryContext => ({
+  watchName: "Civil works",
+  companyName,
+  keywordsMust: ["roads"],
+  keywordsBonus: ["bridges"],
+  preferredSectors: ["construction"],
+  certificationsHeld: ["ISO 9001"],
+});
+
+// Two matches of one tender and one company share a request; the third differs
+const items = [
+  { target: "match-1", request: buildSummaryRequest(tender("Road resurfacing"), context("Acme Civil"), "standard"), tenderId: "t1" },
+  { target: "match-2", request: buildSummaryRequest(tender("Road resurfacing"), context("Acme Civil"), "standard"), tenderId: "t1" },
+  { target: "match-3", request: buildSummaryRequest(tender("Bridge inspection"), context("Acme Civil"), "deep"), tenderId: "t2" },
+];
+
+describe("summary batches", () => {
+  let server: MockBatchServer;
+  let client: MessageBatchClient;
+
+  const start = async (options: MockBatchServerOptions = {}) => {
+    server = new MockBatchServer(options);
+    client = new MessageBatchClient({ apiKey: "test", baseUrl: await server.start() });
+  };
+
+  beforeEach(() => start());
+
+  afterEach(() => server.close());
+
+  it("sends one request per key and writes its summary to every target", async () => {
+    const submitted = await submitSummaryBatch(items, { client });
+    expect(submitted.batched).toBe(2);
+    expect(server.submitted().map((r) => r.custom_id).sort()).toEqual([items[0].request.key, items[2].request.key].sort());
+
+    const batch = await client.retrieve(submitted.batchId!);
+    expect(batch.processing_status).toBe("ended");
+    const collected = await collectSummaryBatch(batch, pendingSummaries(items), { client });
+
+    expect(collected.failed).toEqual([]);
+    expect(collected.written).toHaveLength(2);
+    expect(collected.written.find((w) => w.targets.includes("match-1"))).toEqual({
+      targets: ["match-1", "match-2"],
+      summary: `Summary of ${items[0].request.key}`,
+    });
+  });
+
+  it("answers cached requests without a batch, and caches what the batch returns", async () => {
+    const cache = new SummaryCache({ store: new MemoryStore() });
+    await cache.put(items[2].request.key, { tenderId: "t2", detailLevel: "deep", model: "test" }, "Already summarised");
+
+    const submitted = await submitSummaryBatch(items, { client, cache });
+    expect(submitted.cached).toEqual([{ targets: ["match-3"], summary: "Already summarised" }]);
+    expect(server.submitted().map((r) => r.custom_id)).toEqual([items[0].request.key]);
+
+    const batch = await client.retrieve(submitted.batchId!);
+    await collectSummaryBatch(batch, pendingSummaries(items), { client, cache });
+    expect(await cache.lookup(items[0].request.key)).toBe(`Summary of ${items[0].request.key}`);
+
+    // Everything is cached now, so there is nothing left to batch
+    const again = await submitSummaryBatch(items, { client, cache });
+    expect(again.batchId).toBeNull();
+    expect(again.cached).toHaveLength(2);
+  });
+
+  it("reports errored requests as failed", async () => {
+    await server.close();
+    await start({ respond: (request) => (request.custom_id === items[2].request.key ? null : "Fine") });
+
+    const submitted = await submitSummaryBatch(items, { client });
+    const batch = await client.retrieve(submitted.batchId!);
+    const collected = await collectSummaryBatch(batch, pendingSummaries(items), { client });
+
+    expect(collected.written).toEqual([{ targets: ["match-1", "match-2"], summary: "Fine" }]);
+    expect(collected.failed).toEqual([{ targets: ["match-3"], tenderId: "t2", detailLevel: "deep" }]);
+  });
+
+  it("reports every request of a canceled batch as failed", async () => {
+    await server.close();
+    await start({ processingMs: 60_000 });
+
+    const submitted = await submitSummaryBatch(items, { client });
+    expect((await client.retrieve(submitted.batchId!)).processing_status).toBe("in_progress");
+
+    const batch = await client.cancel(submitted.batchId!);
+    expect(batch.processing_status).toBe("ended");
+    expect(batch.request_counts.canceled).toBe(2);
+    const collected = await collectSummaryBatch(batch, pendingSummaries(items), { client });
+
+    expect(collected.written).toEqual([]);
+    expect(collected.failed.map((f) => f.tenderId).sort()).toEqual(["t1", "t2"]);
+  });
+
+  it("ignores pending requests that weren't in the batch", async () => {
+    const submitted = await submitSummaryBatch(items.slice(0, 2), { client });
+    const batch = await client.retrieve(submitted.batchId!);
+
+    // Rebuilt at collect time, when a newer match has come in
+    const collected = await collectSummaryBatch(batch, pendingSummaries(items), { client });
+
+    expect(collected.written.map((w) => w.targets)).toEqual([["match-1", "match-2"]]);
+    expect(collected.failed).toEqual([]);
+  });
+});
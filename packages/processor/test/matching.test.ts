@@ -0,0 +1,205 @@
+import { describe, expect, it } from "vitest";
+import { hardFilterRejection, matchTender } from "../src/matcher";
+import type { MatchConfig, TenderForMatching } from "../src/matcher";
+import { WatchIndex, matchTenders } from "../src/watch-index";
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+/** Small seeded PRNG, so a failing case can be reproduced. */
+function random(seed: number) {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+const WORDS = ["roads", "bridge", "cleaning", "software", "security", "catering", "asbestos", "fencing", "design", "audit"];
+const REGIONS = ["NSW", "VIC", "QLD", "WA", "Sydney NSW", "Regional VIC", "Brisbane QLD"];
+const WATCH_REGIONS = ["nsw", "VIC", "qld", "WA", "Sydney"];
+// Values on and around the index's bucket bounds
+const VALUES = [0, 5_000, 10_000, 24_999, 25_000, 60_000, 100_000, 250_000, 999_999, 1_000_000, 7_500_000];
+const RESPONSE_DAYS = [0, 1, 3, 4, 7, 14, 20, 30, 60];
+
+function generator(seed: number) {
+  const next = random(seed);
+  const pick = <T>(items: T[]): T => items[Math.floor(next() * items.length)];
+  const some = <T>(items: T[], max: number): T[] => {
+    const count = Math.floor(next() * (max + 1));
+    return [...new Set(Array.from({ length: count }, () => pick(items)))];
+  };
+
+  const watch = (): MatchConfig => ({
+    keywordsMust: some(WORDS, 2),
+    keywordsBonus: some(WORDS, 2),
+    keywordsExclude: some(WORDS, 1),
+    regions: some(WATCH_REGIONS, 2),
+    valueMin: next() < 0.5 ? pick(VALUES) : undefined,
+    valueMax: next() < 0.5 ? pick(VALUES) : undefined,
+    includeUnspecifiedValue: next() < 0.5,
+    minResponseDays: next() < 0.5 ? pick(RESPONSE_DAYS) : undefined,
+    preferredSectors: some(["construction", "it", "facilities"], 1),
+    preferredBuyers: some(["Transport", "Health"], 1),
+    certificationsHeld: some(["ISO 9001", "ISO 27001"], 1),
+    sensitivity: pick(["strict", "balanced", "adventurous"] as const),
+  });
+
+  const tender = (now: number): TenderForMatching => {
+    const valueLow = next() < 0.7 ? pick(VALUES) : undefined;
+    return {
+      title: some(WORDS, 2).join(" "),
+      description: some(WORDS, 3).join(", "),
+      regions: some(REGIONS, 2),
+      categories: some(["construction", "it", "facilities"], 2),
+      buyerOrg: pick(["Transport for NSW", "Health Victoria", "City of Perth"]),
+      valueLow,
+      valueHigh: valueLow !== undefined && next() < 0.7 ? valueLow + pick(VALUES) : undefined,
+      // Half a day off the day boundary, so the clock moving during a test
+      // never changes how many days are left
+      closesAt: next() < 0.8 ? new Date(now + (pick(RESPONSE_DAYS) + 0.5) * DAY_MS) : undefined,
+      certificationsRequired: some(["ISO 9001", "ISO 27001"], 1),
+    };
+  };
+
+  return { next, pick, watch, tender };
+}
+
+function indexOf(watches: MatchConfig[]): WatchIndex {
+  const index = new WatchIndex();
+  watches.forEach((config, i) => index.upsert(`w${i}`, config));
+  return index;
+}
+
+/** Non-rejected matchTender results for each watch, by watch id. */
+function expectedMatches(tender: TenderForMatching, watches: MatchConfig[]) {
+  const expected = new Map<string, ReturnType<typeof matchTender>>();
+  watches.forEach((config, i) => {
+    const result = matchTender(tender, config);
+    if (result.tier !== "reject") expected.set(`w${i}`, result);
+  });
+  return expected;
+}
+
+describe("matchTenders", () => {
+  it("gives the same matches as matchTender for every watch", () => {
+    const gen = generator(2);
+    const watches = Array.from({ length: 300 }, gen.watch);
+    const index = indexOf(watches);
+    const now = Date.now();
+    const tenders = Array.from({ length: 200 }, () => gen.tender(now));
+
+    const results = matchTenders(tenders, index);
+
+    tenders.forEach((tender, i) => {
+      expect(new Map(results[i].map(({ watchId, ...match }) => [watchId, match]))).toEqual(expectedMatches(tender, watches));
+    });
+  });
+
+  it("keeps agreeing as watches are edited and removed", () => {
+    const gen = generator(3);
+    const watches = Array.from({ length: 100 }, gen.watch);
+    const index = indexOf(watches);
+    const now = Date.now();
+
+    for (let round = 0; round < 20; round++) {
+      const i = Math.floor(gen.next() * watches.length);
+      watches[i] = gen.watch();
+      index.upsert(`w${i}`, watches[i]);
+
+      const tender = gen.tender(now);
+      const [results] = matchTenders([tender], index);
+      expect(new Map(results.map(({ watchId, ...match }) => [watchId, match]))).toEqual(expectedMatches(tender, watches));
+    }
+
+    index.remove("w0");
+    const tender = gen.tender(now);
+    const [results] = matchTenders([tender], index);
+    const expected = expectedMatches(tender, watches);
+    expected.delete("w0");
+    expect(new Map(results.map(({ watchId, ...match }) => [watchId, match]))).toEqual(expected);
+  });
+});
+
+describe("HardFilterIndex", () => {
+  it("never leaves out a watch that passes the hard filters", () => {
+    const gen = generator(4);
+    const watches = Array.from({ length: 300 }, gen.watch);
+    const index = indexOf(watches);
+    const now = Date.now();
+
+    let pruned = 0;
+    for (let i = 0; i < 200; i++) {
+      const tender = gen.tender(now);
+      const candidates = new Set(index.candidates(tender, now));
+      watches.forEach((config, w) => {
+        if (hardFilterRejection(tender, config, now) === null) {
+          expect(candidates.has(`w${w}`)).toBe(true);
+        }
+      });
+      pruned += watches.length - candidates.size;
+    }
+    // It does prune, or the check above would prove nothing
+    expect(pruned).toBeGreaterThan(0);
+  });
+});
+
+describe("WatchIndex.refilter", () => {
+  it("agrees with matchTender after a tender's regions, value or closing date change", () => {
+    const gen = generator(21);
+    const watches = Array.from({ length: 200 }, gen.watch);
+    const index = indexOf(watches);
+    const now = Date.now();
+
+    for (let i = 0; i < 100; i++) {
+      const before = gen.tender(now);
+      const matched = [...expectedMatches(before, watches).keys()];
+
+      // An amendment that leaves the text alone
+      const next = gen.tender(now);
+      const after = { ...before, regions: next.regions, valueLow: next.valueLow, valueHigh: next.valueHigh, closesAt: next.closesAt };
+      const expected = expectedMatches(after, watches);
+
+      const result = index.refilter(after, matched, now);
+
+      expect(result.kept.sort()).toEqual(matched.filter((id) => expected.has(id)).sort());
+      expect(result.dropped.sort()).toEqual(matched.filter((id) => !expected.has(id)).sort());
+      expect(new Map(result.added.map(({ watchId, ...match }) => [watchId, match]))).toEqual(
+        new Map([...expected].filter(([id]) => !matched.includes(id)))
+      );
+    }
+  });
+
+  it("drops a matched watch once the tender fails its hard filters", () => {
+    const now = Date.now();
+    const config: MatchConfig = {
+      keywordsMust: ["roads"],
+      keywordsBonus: [],
+      keywordsExclude: [],
+      regions: ["NSW"],
+      valueMin: 50_000,
+      includeUnspecifiedValue: false,
+      minResponseDays: 7,
+      preferredSectors: [],
+      preferredBuyers: [],
+      certificationsHeld: [],
+      sensitivity: "balanced",
+    };
+    const index = indexOf([config]);
+    const tender: TenderForMatching = {
+      title: "Roads maintenance",
+      description: "Resurfacing of regional roads",
+      regions: ["NSW"],
+      categories: [],
+      valueLow: 100_000,
+      closesAt: new Date(now + 20.5 * DAY_MS),
+      certificationsRequired: [],
+    };
+    expect(matchTender(tender, config).tier).not.toBe("reject");
+
+    // Closing date brought forward past the watch's minimum response time
+    const amended = { ...tender, closesAt: new Date(now + 3.5 * DAY_MS) };
+    expect(hardFilterRejection(amended, config, now)).not.toBeNull();
+    expect(index.refilter(amended, ["w0"], now)).toEqual({ kept: [], dropped: ["w0"], added: [] });
+  });
+});
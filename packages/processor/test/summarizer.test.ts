@@ -0,0 +1,41 @@
+import { describe, expect, it } from "vitest";
+import { buildSummaryRequest, cacheablePrefix, summaryMessageParams } from "../src/summarizer";
+import type { SummaryContext, SummaryTender } from "../src/summarizer";
+
+const context = (companyName: string): SummaryContext => ({
+  watchName: "Civil works",
+  companyName,
+  keywordsMust: ["roads"],
+  keywordsBonus: [],
+  preferredSectors: ["construction"],
+  certificationsHeld: [],
+});
+
+const tender = (fullText?: string): SummaryTender => ({
+  title: "Road resurfacing",
+  description: "Resurfacing of regional roads",
+  fullText,
+  buyerOrg: "Transport for NSW",
+});
+
+describe("summary prompt prefixes", () => {
+  it("puts the tender in a prefix shared by every company's request", () => {
+    const first = buildSummaryRequest(tender(), context("Acme Civil"), "standard");
+    const second = buildSummaryRequest(tender(), context("Other Pty Ltd"), "standard");
+
+    expect(first.prefix).toBe(second.prefix);
+    expect(first.key).not.toBe(second.key);
+    expect(summaryMessageParams(first).messages[0].content).toEqual([
+      { type: "text", text: first.prefix, cache_control: { type: "ephemeral" } },
+      { type: "text", text: first.prompt },
+    ]);
+  });
+
+  it("counts only prefixes past the model's minimum as cacheable", () => {
+    expect(cacheablePrefix(buildSummaryRequest(tender(), context("Acme Civil"), "standard"))).toBe(false);
+    expect(cacheablePrefix(buildSummaryRequest(tender(), context("Acme Civil"), "headlines"))).toBe(false);
+
+    const longText = "The contractor shall resurface and line-mark the listed roads. ".repeat(200);
+    expect(cacheablePrefix(buildSummaryRequest(tender(longText), context("Acme Civil"), "deep"))).toBe(true);
+  });
+});
@@ -1,8 +1,13 @@
+// publicListings / publicDetails: whether search results and tender detail
+// pages can be read without logging in. Public pages are crawled once per
+// portal rather than once per linked account.
 export const SITES = {
   austender: {
     name: "AusTender",
     url: "https://www.tenders.gov.au",
     hasApi: true,
+    publicListings: true,
+    publicDetails: true,
     description: "Federal government tenders and contracts",
     region: "National" as const,
     registrationUrl: "https://www.tenders.gov.au/RegisteredUser/Register",
@@ -12,6 +17,8 @@ export const SITES = {
     name: "NSW eTendering",
     url: "https://buy.nsw.gov.au",
     hasApi: true,
+    publicListings: true,
+    publicDetails: true,
     description: "New South Wales government procurement",
     region: "New South Wales" as const,
     registrationUrl: "https://suppliers.buy.nsw.gov.au/login/signup/supplier",
@@ -21,6 +28,8 @@ export const SITES = {
     name: "QLD QTenders",
     url: "https://qtenders.hpw.qld.gov.au",
     hasApi: false,
+    publicListings: false,
+    publicDetails: false,
     description: "Queensland government tenders",
     region: "Queensland" as const,
     registrationUrl: "https://www.supply.qld.gov.au/",
@@ -30,6 +39,8 @@ export const SITES = {
     name: "VIC Tenders",
     url: "https://www.tenders.vic.gov.au",
     hasApi: false,
+    publicListings: true,
+    publicDetails: true,
     description: "Victorian government purchasing and tenders",
     region: "Victoria" as const,
     registrationUrl: "https://www.tenders.vic.gov.au/register",
@@ -39,6 +50,8 @@ export const SITES = {
     name: "SA Tenders",
     url: "https://www.tenders.sa.gov.au",
     hasApi: false,
+    publicListings: false,
+    publicDetails: false,
     description: "South Australian government tenders",
     region: "South Australia" as const,
     registrationUrl: "https://www.tenders.sa.gov.au/register",
@@ -48,6 +61,8 @@ export const SITES = {
     name: "WA Tenders",
     url: "https://www.tenders.wa.gov.au",
     hasApi: false,
+    publicListings: false,
+    publicDetails: false,
     description: "Western Australian government tenders",
     region: "Western Australia" as const,
     registrationUrl: "https://www.tenders.wa.gov.au/watenders/business/create.action?type=respondent",
@@ -57,6 +72,8 @@ export const SITES = {
     name: "TenderLink",
     url: "https://illion.tenderlink.com",
     hasApi: false,
+    publicListings: false,
+    publicDetails: false,
     description: "Australia's largest tender notification service",
     region: "National" as const,
     registrationUrl: "https://illion.tenderlink.com/subscribe-online/",